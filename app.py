@@ -1,29 +1,39 @@
 # app.py
 
-import json
-from pathlib import Path
-from typing import Any, Tuple
+from typing import Any, Iterator, Tuple
 
 import streamlit as st
 from dotenv import load_dotenv
 
-from langchain_openai import ChatOpenAI
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain.prompts import PromptTemplate
-
+from core.assessment import (
+    CONTEXT_PACKS_PATH,
+    CONTEXT_TOKEN_BUDGET,
+    EMBEDDING_CACHE_PATH,
+    PERMENPAN_INDEX_DIR,
+    PERMENPAN_RAW_DIR,
+    RETRIEVAL_MODE,
+    SKJ_INDEX_DIR,
+    AssessmentCore,
+)
 from core.data import SKJ_DATA, QUESTIONS_DATA
-from core.llm import llm
+from core.context_packs import ContextPackStore
+from core.embeddings import CachedEmbeddings
+from core.index_health import IndexRebuildJob, check_index
+from core.index_store import load_index
+from core.lexical import load_lexical_index
+from core.llm import build_embeddings
+from core.rate_limit import rate_limit_stats
+from core.result_parser import AssessmentResult, parse_assessment
+from core.streaming import GENERATION_METRICS, GenerationStats
+from src.data_loader import iter_pdf_documents
 
 # ================== CONFIG & SETUP ==================
+# Konfigurasi (path index, RETRIEVAL_MODE, EMBED_QUERY_TIMEOUT, CONTEXT_TOKEN_BUDGET,
+# ASSESSMENT_OUTPUT) ada di core/assessment.py; logika asesmen juga di sana,
+# app.py hanya memuat resource (cache Streamlit) dan UI.
 
 load_dotenv()
 
-ROOT_DIR = Path(__file__).resolve().parent
-INDEX_DIR = ROOT_DIR / "data" / "index"
-PERMENPAN_INDEX_DIR = INDEX_DIR / "permenpan_index"
-SKJ_INDEX_DIR = INDEX_DIR / "skj_index"
-
 st.set_page_config(
     page_title="Demo Penilaian Kompetensi ASN",
     page_icon="🧭",
@@ -37,318 +47,222 @@ st.markdown(
 st.caption("Mode Asesmen: Soal terstruktur & kasus/jawaban bebas")
 
 
-# ================== PROMPT DEFINITIONS ==================
-
-PROMPT_STRUCTURED = PromptTemplate(
-    template="""
-ANDA ADALAH ASESOR KOMPETENSI ASN BERDASARKAN:
-- PERMENPAN RB No. 38 Tahun 2017
-- STANDAR KOMPETENSI JABATAN (SKJ) UNTUK JABATAN TERKAIT
-
-KONTEKS PERMENPAN (STRUKTUR KOMPETENSI & LEVEL 1–5):
-{context_permenpan}
-
-KONTEKS SKJ (UNTUK JABATAN & KOMPETENSI INI):
-{context_skj}
-
-DATA KASUS:
-- Nama: {nama}
-- Jabatan: {jabatan}
-- Kompetensi yang Dinilai: {kompetensi}
-- Level Target Jabatan: {level_target}
-- Soal: {soal}
-- Jawaban Peserta: {jawaban}
-
-TUGAS ANDA:
-1. Baca konteks PermenPAN dan SKJ di atas.
-2. Petakan perilaku dalam jawaban peserta ke LEVEL KOMPETENSI 1–5.
-3. Bandingkan level aktual dengan level target jabatan.
-4. Berikan rekomendasi pengembangan yang spesifik.
-
-ATURAN PENILAIAN (RINGKAS):
-- Level 1: Perilaku dasar, belum konsisten.
-- Level 2: Mulai konsisten, masih butuh banyak arahan.
-- Level 3: Kompeten & cukup mandiri pada situasi umum.
-- Level 4: Menjadi rujukan/teladan di unitnya.
-- Level 5: Role model organisasi, dampak luas.
-
-FORMAT OUTPUT (WAJIB, JANGAN TAMBAH LABEL LAIN):
-LEVEL_PREDIKSI: [1-5] /n
-RINGKASAN_PERILAKU: [...]
-ALASAN: [...]
-GAP: [di bawah / sesuai / di atas level_target + alasan singkat]
-REKOMENDASI: [...]
-
-HASIL PENILAIAN:
-""",
-    input_variables=[
-        "context_permenpan",
-        "context_skj",
-        "nama",
-        "jabatan",
-        "kompetensi",
-        "level_target",
-        "soal",
-        "jawaban",
-    ],
-)
+# ================== HELPER: LOAD RETRIEVERS ==================
 
-PROMPT_FREE = PromptTemplate(
-    template="""
-ANDA ADALAH ASESOR KOMPETENSI ASN BERDASARKAN:
-- PERMENPAN RB No. 38 Tahun 2017
-- STANDAR KOMPETENSI JABATAN (SKJ) UNTUK JABATAN TERKAIT
-
-KONTEKS PERMENPAN (STRUKTUR KOMPETENSI & LEVEL 1–5):
-{context_permenpan}
-
-KONTEKS SKJ (UNTUK JABATAN & KOMPETENSI INI):
-{context_skj}
-
-DATA KASUS BEBAS:
-- Nama: {nama}
-- Jabatan: {jabatan}
-- Kompetensi yang Dinilai: {kompetensi}
-- Level Target Jabatan: {level_target}
-- Deskripsi Situasi/Kasus: {kasus}
-- Jawaban/Perilaku Peserta: {jawaban}
-
-TUGAS ANDA:
-1. Baca konteks resmi dan data kasus bebas di atas.
-2. Identifikasi perilaku utama peserta.
-3. Petakan perilaku peserta ke LEVEL KOMPETENSI 1–5.
-4. Bandingkan level aktual dengan level target jabatan.
-5. Berikan rekomendasi pengembangan yang spesifik dan realistis.
-
-FORMAT OUTPUT (WAJIB, JANGAN TAMBAH LABEL LAIN):
-LEVEL_PREDIKSI: [1-5]
-RINGKASAN_PERILAKU: [...]
-ALASAN: [...]
-GAP: [di bawah / sesuai / di atas level_target + alasan singkat]
-REKOMENDASI: [...]
-
-HASIL PENILAIAN:
-""",
-    input_variables=[
-        "context_permenpan",
-        "context_skj",
-        "nama",
-        "jabatan",
-        "kompetensi",
-        "level_target",
-        "kasus",
-        "jawaban",
-    ],
-)
+@st.cache_resource(show_spinner=False)
+def get_embeddings() -> CachedEmbeddings:
+    """Model embedding (dengan cache query) yang dipakai bersama oleh index & rebuild."""
+    return build_embeddings(str(EMBEDDING_CACHE_PATH))
 
 
-# ================== HELPER: LOAD RETRIEVERS ==================
+@st.cache_resource(show_spinner=False)
+def get_rebuild_jobs() -> dict[str, IndexRebuildJob]:
+    """Job rebuild index yang sedang/baru berjalan di proses ini (per nama index)."""
+    return {}
+
+
+def _iter_permenpan_pages():
+    for pdf_path in sorted(PERMENPAN_RAW_DIR.glob("*.pdf")):
+        yield from iter_pdf_documents(str(pdf_path))
+
+
+def _start_permenpan_rebuild() -> IndexRebuildJob | None:
+    """Mulai rebuild index PermenPAN dari data/raw/permenpan/*.pdf (sekali per proses, ulang kalau gagal)."""
+    jobs = get_rebuild_jobs()
+    if "permenpan" in jobs and jobs["permenpan"].retry_due():
+        jobs.pop("permenpan")
+    if "permenpan" not in jobs:
+        if not any(PERMENPAN_RAW_DIR.glob("*.pdf")):
+            return None
+        # Index PermenPAN asli dibangun dari teks PDF apa adanya (tanpa _preprocess_text)
+        jobs["permenpan"] = IndexRebuildJob(
+            "permenpan", PERMENPAN_INDEX_DIR, _iter_permenpan_pages, get_embeddings()
+        ).start()
+    return jobs["permenpan"]
+
 
 @st.cache_resource(show_spinner="Memuat index vektor (PermenPAN & SKJ)...")
 def load_retrievers() -> Tuple[Any | None, Any | None]:
     """
-    Load FAISS index untuk PermenPAN dan SKJ (kalau ada).
+    Load index untuk PermenPAN dan SKJ (kalau ada).
+    Format aman (vectors.npy + docstore.sqlite, tanpa pickle) dipakai kalau tersedia,
+    selain itu fallback ke index FAISS lama.
+    Index yang tidak lolos cek integritas dilewati (asesmen jalan dengan index yang sehat);
+    index PermenPAN dibangun ulang di background.
     Mengembalikan retriever (atau None kalau gagal).
     """
-    import os
-
-    OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "qwen/qwen3-embedding-8b")
-
-    embeddings = OpenAIEmbeddings(
-        api_key=OPENROUTER_API_KEY,
-        base_url="https://openrouter.ai/api/v1",
-        model=EMBEDDING_MODEL,
-    )
+    embeddings = get_embeddings()
 
     permenpan_retriever = None
     skj_retriever = None
 
     # Load PermenPAN index
-    if PERMENPAN_INDEX_DIR.exists():
+    health = check_index(PERMENPAN_INDEX_DIR)
+    if health["status"] == "ok":
         try:
-            permenpan_vs = FAISS.load_local(
-                str(PERMENPAN_INDEX_DIR),
-                embeddings,
-                allow_dangerous_deserialization=True,
-            )
+            permenpan_vs = load_index(PERMENPAN_INDEX_DIR, embeddings)
             permenpan_retriever = permenpan_vs.as_retriever(search_kwargs={"k": 4})
         except Exception as e:
             st.warning(f"Gagal load index PermenPAN: {e}")
+    elif _start_permenpan_rebuild() is not None:
+        st.info(f"Index PermenPAN tidak lengkap ({health['detail']}); dibangun ulang di background.")
     else:
-        st.info(f"Index PermenPAN belum ditemukan di {PERMENPAN_INDEX_DIR}")
+        st.warning(f"Index PermenPAN tidak tersedia ({health['detail']}) dan PDF sumber tidak ditemukan.")
 
     # Load SKJ index
-    if SKJ_INDEX_DIR.exists():
+    health = check_index(SKJ_INDEX_DIR)
+    if health["status"] == "ok":
         try:
-            skj_vs = FAISS.load_local(
-                str(SKJ_INDEX_DIR),
-                embeddings,
-                allow_dangerous_deserialization=True,
-            )
+            skj_vs = load_index(SKJ_INDEX_DIR, embeddings)
             skj_retriever = skj_vs.as_retriever(search_kwargs={"k": 4})
         except Exception as e:
             st.warning(f"Gagal load index SKJ: {e}")
     else:
-        st.info(f"Index SKJ belum ditemukan di {SKJ_INDEX_DIR}")
+        st.warning(f"Index SKJ tidak tersedia: {health['detail']}")
 
     return permenpan_retriever, skj_retriever
 
 
-def _join_docs(docs) -> str:
-    return "\n\n---\n\n".join(d.page_content for d in docs)
-
-
-# ================== RAG ASSESSMENT FUNCTIONS ==================
-
-def _build_contexts(
-    jabatan_name: str,
-    kompetensi_name: str,
-    query: str,
-    permenpan_retriever: Any | None,
-    skj_retriever: Any | None,
-    komp_info: dict,
-) -> tuple[str, str]:
-    """Ambil konteks PermenPAN & SKJ dari retriever, dengan fallback ke SKJ_DATA."""
-    context_permenpan = ""
-    context_skj = ""
-
-    if permenpan_retriever is not None:
-        docs_p = permenpan_retriever.invoke(query)
-        context_permenpan = _join_docs(docs_p)
-
-    if skj_retriever is not None:
-        docs_s = skj_retriever.invoke(query)
-        context_skj = _join_docs(docs_s)
-
-    # Safety fallback kalau dua-duanya kosong
-    if not context_permenpan and not context_skj:
-        context_skj = json.dumps(
-            {
-                "jabatan": jabatan_name,
-                "kompetensi": kompetensi_name,
-                "deskripsi": komp_info["deskripsi"],
-                "level_target": komp_info["level_target"],
-            },
-            ensure_ascii=False,
-        )
-
-    return context_permenpan, context_skj
-
-
-def assess_answer_rag_structured(
-    jabatan_name: str,
-    kompetensi_name: str,
-    soal_id: str,
-    jawaban_peserta: str,
-    nama_peserta: str,
-    permenpan_retriever: Any | None,
-    skj_retriever: Any | None,
-) -> tuple[str, str, str]:
-    """Mode 1: Soal terstruktur (ambil soal dari QUESTIONS_DATA)."""
-
-    if jabatan_name not in SKJ_DATA:
-        raise ValueError(f"Jabatan '{jabatan_name}' tidak dikenal.")
-
-    skj_info = SKJ_DATA[jabatan_name]
-    if kompetensi_name not in skj_info["kompetensi"]:
-        raise ValueError(f"Kompetensi '{kompetensi_name}' tidak ada di jabatan '{jabatan_name}'.")
-
-    komp = skj_info["kompetensi"][kompetensi_name]
-    level_target = komp["level_target"]
-
-    # Ambil soal
-    soal_list = QUESTIONS_DATA.get(jabatan_name, {}).get(kompetensi_name, [])
-    if not soal_list:
-        raise ValueError(f"Tidak ada soal untuk jabatan '{jabatan_name}', kompetensi '{kompetensi_name}'.")
-
-    try:
-        soal_obj = next(s for s in soal_list if s["id_soal"] == soal_id)
-    except StopIteration:
-        raise ValueError(f"Soal dengan id '{soal_id}' tidak ditemukan.")
-
-    soal_text = soal_obj["teks"]
-
-    # Query untuk RAG
-    query = (
-        f"Jabatan: {jabatan_name}. Kompetensi: {kompetensi_name}. "
-        f"Soal: {soal_text}. Jawaban: {jawaban_peserta}."
-    )
-
-    context_permenpan, context_skj = _build_contexts(
-        jabatan_name, kompetensi_name, query, permenpan_retriever, skj_retriever, komp
-    )
-
-    chain = PROMPT_STRUCTURED | llm
-
-    result = chain.invoke(
-        {
-            "context_permenpan": context_permenpan,
-            "context_skj": context_skj,
-            "nama": nama_peserta,
-            "jabatan": jabatan_name,
-            "kompetensi": kompetensi_name,
-            "level_target": str(level_target),
-            "soal": soal_text,
-            "jawaban": jawaban_peserta,
-        }
+@st.cache_resource(show_spinner=False)
+def load_lexical_indexes() -> dict[str, Any]:
+    """
+    Index BM25 lokal untuk PermenPAN & SKJ (dari docstore, tidak butuh index.faiss
+    atau endpoint embedding). Index yang tidak bisa dimuat bernilai None.
+    """
+    indexes = {}
+    for name, folder in (("permenpan", PERMENPAN_INDEX_DIR), ("skj", SKJ_INDEX_DIR)):
+        try:
+            indexes[name] = load_lexical_index(folder)
+        except Exception as e:
+            print(f"⚠️ Index BM25 {name} tidak tersedia: {e}")
+            indexes[name] = None
+    return indexes
+
+
+@st.cache_resource(show_spinner=False)
+def get_context_packs() -> ContextPackStore:
+    """Context pack per (jabatan, kompetensi, level_target); isi dengan `python -m core.context_packs`."""
+    return ContextPackStore(
+        CONTEXT_PACKS_PATH,
+        {"permenpan": PERMENPAN_INDEX_DIR, "skj": SKJ_INDEX_DIR},
+        max_tokens=CONTEXT_TOKEN_BUDGET,
+        retrieval_mode=RETRIEVAL_MODE,
     )
 
-    return result.content, context_permenpan, context_skj
-
 
-def assess_answer_rag_free(
-    jabatan_name: str,
-    kompetensi_name: str,
-    kasus_text: str,
-    jawaban_peserta: str,
-    nama_peserta: str,
-    permenpan_retriever: Any | None,
-    skj_retriever: Any | None,
-) -> tuple[str, str, str]:
-    """Mode 2: Kasus / jawaban bebas (user isi sendiri kasus & jawaban)."""
+@st.fragment(run_every="3s")
+def render_index_status() -> None:
+    """Status index & progress rebuild (refresh otomatis tanpa memblokir UI)."""
+    st.markdown("### 🗂️ Status Index")
+    st.caption(f"🔎 Mode retrieval: {RETRIEVAL_MODE}")
+    for label, folder in (("PermenPAN", PERMENPAN_INDEX_DIR), ("SKJ", SKJ_INDEX_DIR)):
+        health = check_index(folder)
+        icon = "🟢" if health["status"] == "ok" else "🔴"
+        st.caption(f"{icon} {label}: {health['detail']}")
+
+    pack_stats = get_context_packs().stats()
+    st.caption(f"📦 Context pack: {pack_stats['valid']} valid, {pack_stats['stale']} basi")
+
+    gen_stats = GENERATION_METRICS.stats()
+    if gen_stats["requests"]:
+        st.caption(
+            f"⏱️ LLM ({gen_stats['requests']} request): token pertama p50 {gen_stats['ttft_p50_s']} dtk, "
+            f"total p50 {gen_stats['total_p50_s']} dtk / p95 {gen_stats['total_p95_s']} dtk"
+        )
 
-    if jabatan_name not in SKJ_DATA:
-        raise ValueError(f"Jabatan '{jabatan_name}' tidak dikenal.")
+    for name, limits in rate_limit_stats().items():
+        rpm = f"{limits['rpm']:g}/mnt" if limits["rpm"] else "tanpa batas"
+        line = (f"🚦 {name}: {rpm}, konkurensi {limits['in_flight']}/{limits['concurrency_limit']}, "
+                f"429: {limits['throttled']}")
+        if limits["blocked_for_s"]:
+            line += f", tertahan {limits['blocked_for_s']} dtk"
+        st.caption(line)
+
+    jobs = get_rebuild_jobs()
+    for name, job in list(jobs.items()):
+        status = job.status()
+        if status["state"] in ("pending", "running", "waiting"):
+            st.caption(
+                f"🔧 Rebuild {name}: {status['state']} — "
+                f"{status['documents_read']} halaman dibaca, {status['chunks_indexed']} chunk terindeks"
+            )
+        elif status["state"] == "done":
+            # Index baru siap: buang cache retriever lalu jalankan ulang app
+            jobs.pop(name)
+            load_retrievers.clear()
+            load_lexical_indexes.clear()
+            st.rerun(scope="app")
+        elif job.retry_due():
+            # Coba lagi: load_retrievers akan memulai job rebuild baru
+            jobs.pop(name)
+            load_retrievers.clear()
+            st.rerun(scope="app")
+        else:
+            st.caption(f"❌ Rebuild {name} gagal: {status['error']} (dicoba lagi otomatis)")
 
-    skj_info = SKJ_DATA[jabatan_name]
-    if kompetensi_name not in skj_info["kompetensi"]:
-        raise ValueError(f"Kompetensi '{kompetensi_name}' tidak ada di jabatan '{jabatan_name}'.")
 
-    komp = skj_info["kompetensi"][kompetensi_name]
-    level_target = komp["level_target"]
+# ================== RAG ASSESSMENT ==================
 
-    # Query untuk RAG
-    query = (
-        f"Jabatan: {jabatan_name}. Kompetensi: {kompetensi_name}. "
-        f"Kasus: {kasus_text}. Jawaban: {jawaban_peserta}."
+def get_assessment_core(permenpan_retriever: Any | None, skj_retriever: Any | None) -> AssessmentCore:
+    """Inti asesmen (core/assessment.py) di atas resource yang di-cache Streamlit."""
+    return AssessmentCore(
+        permenpan_retriever,
+        skj_retriever,
+        lexical=load_lexical_indexes(),
+        context_packs=get_context_packs(),
     )
 
-    context_permenpan, context_skj = _build_contexts(
-        jabatan_name, kompetensi_name, query, permenpan_retriever, skj_retriever, komp
-    )
 
-    chain = PROMPT_FREE | llm
-
-    result = chain.invoke(
-        {
-            "context_permenpan": context_permenpan,
-            "context_skj": context_skj,
-            "nama": nama_peserta,
-            "jabatan": jabatan_name,
-            "kompetensi": kompetensi_name,
-            "level_target": str(level_target),
-            "kasus": kasus_text,
-            "jawaban": jawaban_peserta,
-        }
-    )
+# ================== UI STREAMLIT (2 TAB) ==================
 
-    return result.content, context_permenpan, context_skj
+def render_assessment(hasil: AssessmentResult, level_target: Any) -> None:
+    """Tampilkan field hasil yang sudah di-parse; output mentah di expander."""
+    if not hasil.parsed:
+        st.write(hasil.raw)
+        return
+
+    col_level, col_target, col_gap = st.columns(3)
+    col_level.metric("Level Prediksi", hasil.level if hasil.level is not None else "-")
+    col_target.metric("Level Target", level_target)
+    gap = hasil.gap_levels(level_target)
+    col_gap.metric("Selisih", f"{gap:+d}" if gap is not None else "-")
+
+    for title, value in (
+        ("Ringkasan Perilaku", hasil.ringkasan),
+        ("Alasan", hasil.alasan),
+        ("Gap", hasil.gap),
+        ("Rekomendasi", hasil.rekomendasi),
+    ):
+        if value:
+            st.markdown(f"**{title}:**")
+            st.write(value)
+
+    with st.expander("📄 Output LLM (mentah)"):
+        st.text(hasil.raw)
+
+
+def render_streamed_assessment(stream: Iterator[str], stats: GenerationStats, level_target: Any) -> bool:
+    """
+    Tampilkan token selagi dihasilkan, lalu ganti dengan hasil yang sudah di-parse.
+    Return False kalau generasi gagal di tengah jalan.
+    """
+    placeholder = st.empty()
+    try:
+        with placeholder.container():
+            text = st.write_stream(stream)
+    except Exception as e:
+        st.error(f"Terjadi error saat penilaian: {e}")
+        return False
 
+    placeholder.empty()
+    st.success("Penilaian selesai.")
+    render_assessment(parse_assessment(text if isinstance(text, str) else "".join(map(str, text))), level_target)
+    st.caption(f"⏱️ Token pertama {stats.ttft or 0:.2f} dtk · total {stats.total or 0:.2f} dtk")
+    return True
 
-# ================== UI STREAMLIT (2 TAB) ==================
 
 permenpan_retriever, skj_retriever = load_retrievers()
+assessment_core = get_assessment_core(permenpan_retriever, skj_retriever)
 
 # Pilihan jabatan & kompetensi (global untuk kedua tab)
 col_side, col_main = st.columns([1.1, 3])
@@ -390,24 +304,21 @@ with col_main:
                 if not jawaban_peserta.strip():
                     st.error("Jawaban tidak boleh kosong.")
                 else:
-                    with st.spinner("Menilai jawaban dengan RAG (PermenPAN + SKJ)..."):
+                    with st.spinner("Mengambil konteks RAG (PermenPAN + SKJ)..."):
                         try:
-                            hasil, ctx_perm, ctx_skj = assess_answer_rag_structured(
+                            stream, gen_stats, ctx_perm, ctx_skj = assessment_core.stream_structured(
                                 jabatan_name=jabatan,
                                 kompetensi_name=kompetensi,
                                 soal_id=soal["id_soal"],
                                 jawaban_peserta=jawaban_peserta,
                                 nama_peserta=nama_peserta,
-                                permenpan_retriever=permenpan_retriever,
-                                skj_retriever=skj_retriever,
                             )
                         except Exception as e:
                             st.error(f"Terjadi error saat penilaian: {e}")
-                        else:
-                            st.success("Penilaian selesai.")
-                            st.markdown("#### 🎯 Hasil Penilaian")
-                            st.write(hasil)
-
+                            stream = None
+                    if stream is not None:
+                        st.markdown("#### 🎯 Hasil Penilaian")
+                        if render_streamed_assessment(stream, gen_stats, komp_info["level_target"]):
                             with st.expander("📁 Konteks RAG yang digunakan (PermenPAN + SKJ)"):
                                 st.markdown("**Konteks PermenPAN (potongan):**")
                                 st.text((ctx_perm or "")[:1500] or "[kosong]")
@@ -435,24 +346,21 @@ with col_main:
             if not kasus_text.strip() or not jawaban_bebas.strip():
                 st.error("Deskripsi kasus dan jawaban tidak boleh kosong.")
             else:
-                with st.spinner("Menilai kasus & jawaban dengan RAG (PermenPAN + SKJ)..."):
+                with st.spinner("Mengambil konteks RAG (PermenPAN + SKJ)..."):
                     try:
-                        hasil2, ctx_perm2, ctx_skj2 = assess_answer_rag_free(
+                        stream2, gen_stats2, ctx_perm2, ctx_skj2 = assessment_core.stream_free(
                             jabatan_name=jabatan,
                             kompetensi_name=kompetensi,
                             kasus_text=kasus_text,
                             jawaban_peserta=jawaban_bebas,
                             nama_peserta=nama_peserta2,
-                            permenpan_retriever=permenpan_retriever,
-                            skj_retriever=skj_retriever,
                         )
                     except Exception as e:
                         st.error(f"Terjadi error saat penilaian: {e}")
-                    else:
-                        st.success("Penilaian selesai.")
-                        st.markdown("#### 🎯 Hasil Penilaian (Mode Kasus Bebas)")
-                        st.write(hasil2)
-
+                        stream2 = None
+                if stream2 is not None:
+                    st.markdown("#### 🎯 Hasil Penilaian (Mode Kasus Bebas)")
+                    if render_streamed_assessment(stream2, gen_stats2, komp_info["level_target"]):
                         with st.expander("📁 Konteks RAG yang digunakan (PermenPAN + SKJ)"):
                             st.markdown("**Konteks PermenPAN (potongan):**")
                             st.text((ctx_perm2 or "")[:1500] or "[kosong]")
@@ -469,3 +377,5 @@ with st.sidebar:
     st.markdown(f"**Kompetensi:** {kompetensi}")
     st.markdown(f"**Deskripsi:** {komp_info['deskripsi']}")
     st.markdown(f"**Level Target:** {komp_info['level_target']}")
+    st.markdown("---")
+    render_index_status()
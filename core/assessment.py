@@ -0,0 +1,416 @@
+# core/assessment.py
+"""
+Inti asesmen RAG tanpa Streamlit: konteks PermenPAN & SKJ -> LLM -> AssessmentResult.
+
+Dipakai bersama oleh app.py (UI), core/service.py (HTTP service) dan job batch,
+sehingga index, BM25, context pack dan client LLM cukup dimuat sekali per proses
+(`load_assessment_core`) lalu dipakai ulang untuk semua request.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from langchain.prompts import PromptTemplate
+
+from core.context import assemble_context
+from core.context_packs import (
+    DEFAULT_PACKS_PATH, ROOT_DIR, ContextPackStore, aretrieve_pack_contexts, retrieve_pack_contexts,
+)
+from core.data import QUESTIONS_DATA, SKJ_DATA
+from core.index_health import check_index
+from core.index_store import load_index
+from core.lexical import load_lexical_index
+from core.prompt import PROMPT_FREE, PROMPT_FREE_JSON, PROMPT_STRUCTURED, PROMPT_STRUCTURED_JSON
+from core.rag import MultiIndexRetriever
+from core.result_parser import AssessmentResult, JSON_RESPONSE_FORMAT, parse_assessment
+from core.streaming import (
+    GENERATION_METRICS, GenerationStats, ainvoke_text, astream_text, invoke_text, stream_text,
+)
+
+INDEX_DIR = ROOT_DIR / "data" / "index"
+PERMENPAN_INDEX_DIR = INDEX_DIR / "permenpan_index"
+SKJ_INDEX_DIR = INDEX_DIR / "skj_index"
+PERMENPAN_RAW_DIR = ROOT_DIR / "data" / "raw" / "permenpan"
+EMBEDDING_CACHE_PATH = ROOT_DIR / "data" / "cache" / "embeddings.sqlite"
+CONTEXT_PACKS_PATH = DEFAULT_PACKS_PATH
+# dense | hybrid (FAISS + BM25) | lexical (BM25 saja, tanpa panggilan embedding)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+# Embedding query lebih lama dari ini (detik) -> konteks diambil dari BM25
+EMBED_QUERY_TIMEOUT = float(os.getenv("EMBED_QUERY_TIMEOUT", "5"))
+# Anggaran token konteks per sumber (PermenPAN, SKJ) setelah dedup overlap antar chunk
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "800"))
+# text (label LEVEL_PREDIKSI: ...) | json (response_format JSON, model harus mendukung)
+ASSESSMENT_OUTPUT = os.getenv("ASSESSMENT_OUTPUT", "text")
+
+INDEX_DIRS = {"permenpan": PERMENPAN_INDEX_DIR, "skj": SKJ_INDEX_DIR}
+
+
+def get_komp_info(jabatan_name: str, kompetensi_name: str) -> dict:
+    """Validasi jabatan & kompetensi, kembalikan info kompetensi dari SKJ_DATA."""
+    if jabatan_name not in SKJ_DATA:
+        raise ValueError(f"Jabatan '{jabatan_name}' tidak dikenal.")
+
+    skj_info = SKJ_DATA[jabatan_name]
+    if kompetensi_name not in skj_info["kompetensi"]:
+        raise ValueError(f"Kompetensi '{kompetensi_name}' tidak ada di jabatan '{jabatan_name}'.")
+
+    return skj_info["kompetensi"][kompetensi_name]
+
+
+def fallback_context(jabatan_name: str, kompetensi_name: str, komp_info: dict) -> str:
+    """Konteks minimal dari SKJ_DATA kalau semua retriever kosong/tidak tersedia."""
+    return json.dumps(
+        {
+            "jabatan": jabatan_name,
+            "kompetensi": kompetensi_name,
+            "deskripsi": komp_info["deskripsi"],
+            "level_target": komp_info["level_target"],
+        },
+        ensure_ascii=False,
+    )
+
+
+def skj_filters(jabatan_name: str, kompetensi_name: str) -> dict[str, dict]:
+    """Chunk SKJ hanya dari jabatan & kompetensi yang dinilai (PermenPAN tidak difilter)."""
+    return {"skj": {"jabatan": jabatan_name, "kompetensi": kompetensi_name}}
+
+
+def prepare_structured(
+    jabatan_name: str,
+    kompetensi_name: str,
+    soal_id: str,
+    jawaban_peserta: str,
+    nama_peserta: str,
+) -> tuple[dict, str, dict]:
+    """Validasi input mode terstruktur; kembalikan (komp, query RAG, variabel prompt tanpa konteks)."""
+    komp = get_komp_info(jabatan_name, kompetensi_name)
+
+    # Ambil soal
+    soal_list = QUESTIONS_DATA.get(jabatan_name, {}).get(kompetensi_name, [])
+    if not soal_list:
+        raise ValueError(f"Tidak ada soal untuk jabatan '{jabatan_name}', kompetensi '{kompetensi_name}'.")
+
+    try:
+        soal_obj = next(s for s in soal_list if s["id_soal"] == soal_id)
+    except StopIteration:
+        raise ValueError(f"Soal dengan id '{soal_id}' tidak ditemukan.")
+
+    soal_text = soal_obj["teks"]
+
+    # Query untuk RAG
+    query = (
+        f"Jabatan: {jabatan_name}. Kompetensi: {kompetensi_name}. "
+        f"Soal: {soal_text}. Jawaban: {jawaban_peserta}."
+    )
+
+    variables = {
+        "nama": nama_peserta,
+        "jabatan": jabatan_name,
+        "kompetensi": kompetensi_name,
+        "level_target": str(komp["level_target"]),
+        "soal": soal_text,
+        "jawaban": jawaban_peserta,
+    }
+    return komp, query, variables
+
+
+def prepare_free(
+    jabatan_name: str,
+    kompetensi_name: str,
+    kasus_text: str,
+    jawaban_peserta: str,
+    nama_peserta: str,
+) -> tuple[dict, str, dict]:
+    """Validasi input mode kasus bebas; kembalikan (komp, query RAG, variabel prompt tanpa konteks)."""
+    komp = get_komp_info(jabatan_name, kompetensi_name)
+
+    # Query untuk RAG
+    query = (
+        f"Jabatan: {jabatan_name}. Kompetensi: {kompetensi_name}. "
+        f"Kasus: {kasus_text}. Jawaban: {jawaban_peserta}."
+    )
+
+    variables = {
+        "nama": nama_peserta,
+        "jabatan": jabatan_name,
+        "kompetensi": kompetensi_name,
+        "level_target": str(komp["level_target"]),
+        "kasus": kasus_text,
+        "jawaban": jawaban_peserta,
+    }
+    return komp, query, variables
+
+
+class AssessmentCore:
+    """
+    Asesmen mode terstruktur (soal dari QUESTIONS_DATA, konteks dari context pack)
+    dan mode kasus bebas (retrieval per jawaban). Setiap mode punya versi sync,
+    async, dan streaming; hasil non-streaming berupa (AssessmentResult, konteks
+    PermenPAN, konteks SKJ).
+
+    `permenpan_retriever` / `skj_retriever`: retriever LangChain (atau None kalau index
+    tidak tersedia), `lexical`: index BM25 per nama, `context_packs`: ContextPackStore.
+    """
+
+    def __init__(self, permenpan_retriever: Any | None, skj_retriever: Any | None,
+                 lexical: dict[str, Any] | None = None, context_packs: ContextPackStore | None = None,
+                 llm: Any = None, retrieval_mode: str = RETRIEVAL_MODE,
+                 embed_timeout: float | None = EMBED_QUERY_TIMEOUT, context_tokens: int = CONTEXT_TOKEN_BUDGET,
+                 output_mode: str = ASSESSMENT_OUTPUT):
+        if llm is None:
+            from core.llm import llm
+        self.permenpan_retriever = permenpan_retriever
+        self.skj_retriever = skj_retriever
+        self.lexical = lexical or {}
+        self.context_packs = context_packs
+        self.llm = llm
+        self.retrieval_mode = retrieval_mode
+        self.embed_timeout = embed_timeout or None
+        self.context_tokens = context_tokens
+        self.output_mode = output_mode
+
+    # ---------- konteks ----------
+
+    def make_retriever(self) -> MultiIndexRetriever:
+        """Retriever PermenPAN + SKJ sesuai `retrieval_mode` (dense/hybrid/lexical)."""
+        return MultiIndexRetriever.from_retrievers(
+            {"permenpan": self.permenpan_retriever, "skj": self.skj_retriever},
+            lexical=self.lexical,
+            mode=self.retrieval_mode,
+            embed_timeout=self.embed_timeout,
+        )
+
+    def _assemble(self, docs: dict, jabatan_name: str, kompetensi_name: str, komp_info: dict) -> tuple[str, str]:
+        contexts = (
+            assemble_context(docs.get("permenpan", []), self.context_tokens),
+            assemble_context(docs.get("skj", []), self.context_tokens),
+        )
+        return self._with_fallback(contexts, jabatan_name, kompetensi_name, komp_info)
+
+    def build_contexts(self, jabatan_name: str, kompetensi_name: str, query: str,
+                       komp_info: dict) -> tuple[str, str]:
+        """Ambil konteks PermenPAN & SKJ dari retriever, dengan fallback ke SKJ_DATA."""
+        # Query di-embed sekali, lalu dipakai untuk search di kedua index (+ BM25 di mode hybrid)
+        docs = self.make_retriever().search(query, filters=skj_filters(jabatan_name, kompetensi_name))
+        return self._assemble(docs, jabatan_name, kompetensi_name, komp_info)
+
+    async def abuild_contexts(self, jabatan_name: str, kompetensi_name: str, query: str,
+                              komp_info: dict) -> tuple[str, str]:
+        """Versi async `build_contexts`: satu embedding query, search kedua index bersamaan."""
+        docs = await self.make_retriever().asearch(query, filters=skj_filters(jabatan_name, kompetensi_name))
+        return self._assemble(docs, jabatan_name, kompetensi_name, komp_info)
+
+    def _cached_pack(self, jabatan_name: str, kompetensi_name: str, komp_info: dict) -> tuple[str, str] | None:
+        if self.context_packs is None:
+            return None
+        pack = self.context_packs.get(jabatan_name, kompetensi_name, komp_info["level_target"],
+                                      komp_info.get("deskripsi", ""))
+        return (pack["context_permenpan"], pack["context_skj"]) if pack is not None else None
+
+    def _store_pack(self, jabatan_name: str, kompetensi_name: str, komp_info: dict,
+                    contexts: tuple[str, str], retriever: MultiIndexRetriever) -> None:
+        """Simpan hasil retrieval sebagai pack hanya kalau semua index tersedia & tanpa fallback."""
+        complete = self.permenpan_retriever is not None and self.skj_retriever is not None
+        if self.context_packs is not None and complete and not retriever.last_fallback and any(contexts):
+            self.context_packs.put(jabatan_name, kompetensi_name, komp_info["level_target"], *contexts,
+                                   deskripsi=komp_info.get("deskripsi", ""))
+            self.context_packs.save()
+
+    async def _astore_pack(self, jabatan_name: str, kompetensi_name: str, komp_info: dict,
+                           contexts: tuple[str, str], retriever: MultiIndexRetriever) -> None:
+        # save() memegang lock file + fsync: jangan di event loop (service / batch)
+        await asyncio.to_thread(self._store_pack, jabatan_name, kompetensi_name, komp_info, contexts, retriever)
+
+    def _with_fallback(self, contexts: tuple[str, str], jabatan_name: str, kompetensi_name: str,
+                       komp_info: dict) -> tuple[str, str]:
+        # Safety fallback kalau dua-duanya kosong
+        context_permenpan, context_skj = contexts
+        if not context_permenpan and not context_skj:
+            context_skj = fallback_context(jabatan_name, kompetensi_name, komp_info)
+        return context_permenpan, context_skj
+
+    def structured_contexts(self, jabatan_name: str, kompetensi_name: str, komp_info: dict) -> tuple[str, str]:
+        """
+        Konteks mode terstruktur dari context pack (tanpa retrieval); kalau pack belum ada
+        atau basi karena index berubah, retrieve sekali lalu simpan untuk peserta berikutnya.
+        """
+        contexts = self._cached_pack(jabatan_name, kompetensi_name, komp_info)
+        if contexts is None:
+            retriever = self.make_retriever()
+            contexts = retrieve_pack_contexts(
+                retriever, jabatan_name, kompetensi_name, komp_info["level_target"], komp_info["deskripsi"],
+                self.context_tokens,
+            )
+            self._store_pack(jabatan_name, kompetensi_name, komp_info, contexts, retriever)
+        return self._with_fallback(contexts, jabatan_name, kompetensi_name, komp_info)
+
+    async def astructured_contexts(self, jabatan_name: str, kompetensi_name: str,
+                                   komp_info: dict) -> tuple[str, str]:
+        """Versi async `structured_contexts`."""
+        contexts = self._cached_pack(jabatan_name, kompetensi_name, komp_info)
+        if contexts is None:
+            retriever = self.make_retriever()
+            contexts = await aretrieve_pack_contexts(
+                retriever, jabatan_name, kompetensi_name, komp_info["level_target"], komp_info["deskripsi"],
+                self.context_tokens,
+            )
+            await self._astore_pack(jabatan_name, kompetensi_name, komp_info, contexts, retriever)
+        return self._with_fallback(contexts, jabatan_name, kompetensi_name, komp_info)
+
+    # ---------- LLM ----------
+
+    def chain(self, prompt: PromptTemplate, prompt_json: PromptTemplate):
+        if self.output_mode == "json":
+            return prompt_json | self.llm.bind(response_format=JSON_RESPONSE_FORMAT)
+        return prompt | self.llm
+
+    def _structured_request(self, jabatan_name: str, kompetensi_name: str, soal_id: str,
+                            jawaban_peserta: str, nama_peserta: str) -> tuple[Any, dict]:
+        komp, _, variables = prepare_structured(
+            jabatan_name, kompetensi_name, soal_id, jawaban_peserta, nama_peserta
+        )
+        # Konteks sama untuk semua peserta di (jabatan, kompetensi, level) ini -> context pack
+        context_permenpan, context_skj = self.structured_contexts(jabatan_name, kompetensi_name, komp)
+        inputs = {"context_permenpan": context_permenpan, "context_skj": context_skj, **variables}
+        return self.chain(PROMPT_STRUCTURED, PROMPT_STRUCTURED_JSON), inputs
+
+    async def _astructured_request(self, jabatan_name: str, kompetensi_name: str, soal_id: str,
+                                   jawaban_peserta: str, nama_peserta: str) -> tuple[Any, dict]:
+        komp, _, variables = prepare_structured(
+            jabatan_name, kompetensi_name, soal_id, jawaban_peserta, nama_peserta
+        )
+        context_permenpan, context_skj = await self.astructured_contexts(jabatan_name, kompetensi_name, komp)
+        inputs = {"context_permenpan": context_permenpan, "context_skj": context_skj, **variables}
+        return self.chain(PROMPT_STRUCTURED, PROMPT_STRUCTURED_JSON), inputs
+
+    def _free_request(self, jabatan_name: str, kompetensi_name: str, kasus_text: str,
+                      jawaban_peserta: str, nama_peserta: str) -> tuple[Any, dict]:
+        komp, query, variables = prepare_free(
+            jabatan_name, kompetensi_name, kasus_text, jawaban_peserta, nama_peserta
+        )
+        context_permenpan, context_skj = self.build_contexts(jabatan_name, kompetensi_name, query, komp)
+        inputs = {"context_permenpan": context_permenpan, "context_skj": context_skj, **variables}
+        return self.chain(PROMPT_FREE, PROMPT_FREE_JSON), inputs
+
+    async def _afree_request(self, jabatan_name: str, kompetensi_name: str, kasus_text: str,
+                             jawaban_peserta: str, nama_peserta: str) -> tuple[Any, dict]:
+        komp, query, variables = prepare_free(
+            jabatan_name, kompetensi_name, kasus_text, jawaban_peserta, nama_peserta
+        )
+        context_permenpan, context_skj = await self.abuild_contexts(jabatan_name, kompetensi_name, query, komp)
+        inputs = {"context_permenpan": context_permenpan, "context_skj": context_skj, **variables}
+        return self.chain(PROMPT_FREE, PROMPT_FREE_JSON), inputs
+
+    # ---------- API publik ----------
+
+    def assess_structured(self, jabatan_name: str, kompetensi_name: str, soal_id: str,
+                          jawaban_peserta: str, nama_peserta: str) -> tuple[AssessmentResult, str, str]:
+        """Mode 1: Soal terstruktur (ambil soal dari QUESTIONS_DATA)."""
+        chain, inputs = self._structured_request(jabatan_name, kompetensi_name, soal_id, jawaban_peserta, nama_peserta)
+        text = invoke_text(chain, inputs, GENERATION_METRICS.start("structured", streamed=False))
+        return parse_assessment(text), inputs["context_permenpan"], inputs["context_skj"]
+
+    async def aassess_structured(self, jabatan_name: str, kompetensi_name: str, soal_id: str,
+                                 jawaban_peserta: str, nama_peserta: str) -> tuple[AssessmentResult, str, str]:
+        """Versi async mode 1: konteks dari context pack, LLM via `ainvoke`."""
+        chain, inputs = await self._astructured_request(
+            jabatan_name, kompetensi_name, soal_id, jawaban_peserta, nama_peserta
+        )
+        text = await ainvoke_text(chain, inputs, GENERATION_METRICS.start("structured", streamed=False))
+        return parse_assessment(text), inputs["context_permenpan"], inputs["context_skj"]
+
+    def assess_free(self, jabatan_name: str, kompetensi_name: str, kasus_text: str,
+                    jawaban_peserta: str, nama_peserta: str) -> tuple[AssessmentResult, str, str]:
+        """Mode 2: Kasus / jawaban bebas (user isi sendiri kasus & jawaban)."""
+        chain, inputs = self._free_request(jabatan_name, kompetensi_name, kasus_text, jawaban_peserta, nama_peserta)
+        text = invoke_text(chain, inputs, GENERATION_METRICS.start("free", streamed=False))
+        return parse_assessment(text), inputs["context_permenpan"], inputs["context_skj"]
+
+    async def aassess_free(self, jabatan_name: str, kompetensi_name: str, kasus_text: str,
+                           jawaban_peserta: str, nama_peserta: str) -> tuple[AssessmentResult, str, str]:
+        """Versi async mode 2: retrieval paralel, LLM via `ainvoke`."""
+        chain, inputs = await self._afree_request(
+            jabatan_name, kompetensi_name, kasus_text, jawaban_peserta, nama_peserta
+        )
+        text = await ainvoke_text(chain, inputs, GENERATION_METRICS.start("free", streamed=False))
+        return parse_assessment(text), inputs["context_permenpan"], inputs["context_skj"]
+
+    def stream_structured(self, jabatan_name: str, kompetensi_name: str, soal_id: str, jawaban_peserta: str,
+                          nama_peserta: str) -> tuple[Iterator[str], GenerationStats, str, str]:
+        """
+        Mode 1 versi streaming: konteks diambil dulu, lalu generator potongan teks
+        (untuk `st.write_stream`). TTFT & total waktu terisi di `GenerationStats`
+        setelah generator habis. Prompt yang sama persis diputar ulang dari cache
+        respons model (lihat core/streaming.py), tanpa memanggil LLM lagi.
+        """
+        chain, inputs = self._structured_request(jabatan_name, kompetensi_name, soal_id, jawaban_peserta, nama_peserta)
+        stats = GENERATION_METRICS.start("structured")
+        return stream_text(chain, inputs, stats), stats, inputs["context_permenpan"], inputs["context_skj"]
+
+    async def astream_structured(self, jabatan_name: str, kompetensi_name: str, soal_id: str, jawaban_peserta: str,
+                                 nama_peserta: str) -> tuple[AsyncIterator[str], GenerationStats, str, str]:
+        """Versi async dari `stream_structured` (async generator potongan teks)."""
+        chain, inputs = await self._astructured_request(
+            jabatan_name, kompetensi_name, soal_id, jawaban_peserta, nama_peserta
+        )
+        stats = GENERATION_METRICS.start("structured")
+        return astream_text(chain, inputs, stats), stats, inputs["context_permenpan"], inputs["context_skj"]
+
+    def stream_free(self, jabatan_name: str, kompetensi_name: str, kasus_text: str, jawaban_peserta: str,
+                    nama_peserta: str) -> tuple[Iterator[str], GenerationStats, str, str]:
+        """Mode 2 versi streaming (lihat `stream_structured`)."""
+        chain, inputs = self._free_request(jabatan_name, kompetensi_name, kasus_text, jawaban_peserta, nama_peserta)
+        stats = GENERATION_METRICS.start("free")
+        return stream_text(chain, inputs, stats), stats, inputs["context_permenpan"], inputs["context_skj"]
+
+    async def astream_free(self, jabatan_name: str, kompetensi_name: str, kasus_text: str, jawaban_peserta: str,
+                           nama_peserta: str) -> tuple[AsyncIterator[str], GenerationStats, str, str]:
+        chain, inputs = await self._afree_request(
+            jabatan_name, kompetensi_name, kasus_text, jawaban_peserta, nama_peserta
+        )
+        stats = GENERATION_METRICS.start("free")
+        return astream_text(chain, inputs, stats), stats, inputs["context_permenpan"], inputs["context_skj"]
+
+
+def load_assessment_core(embeddings: Any = None, llm: Any = None,
+                         index_dirs: dict[str, Path] | None = None,
+                         on_warning: Callable[[str], None] = print, **kwargs: Any) -> AssessmentCore:
+    """
+    Muat index yang lolos cek integritas + BM25 + context pack sekali, untuk proses
+    yang hidup lama (service, CLI batch). Index yang rusak/tidak ada dilewati
+    (retriever None) dan dilaporkan lewat `on_warning`.
+    """
+    if embeddings is None:
+        from core.llm import build_embeddings
+        embeddings = build_embeddings(str(EMBEDDING_CACHE_PATH))
+    index_dirs = index_dirs or INDEX_DIRS
+
+    retrievers: dict[str, Any] = {}
+    lexical: dict[str, Any] = {}
+    for name, folder in index_dirs.items():
+        retrievers[name] = None
+        health = check_index(folder)
+        if health["status"] == "ok":
+            try:
+                retrievers[name] = load_index(folder, embeddings).as_retriever(search_kwargs={"k": 4})
+            except Exception as e:
+                on_warning(f"⚠️ Gagal load index {name}: {e}")
+        else:
+            on_warning(f"⚠️ Index {name} tidak tersedia: {health['detail']}")
+        try:
+            lexical[name] = load_lexical_index(folder)
+        except Exception as e:
+            on_warning(f"⚠️ Index BM25 {name} tidak tersedia: {e}")
+            lexical[name] = None
+
+    context_packs = ContextPackStore(
+        CONTEXT_PACKS_PATH, index_dirs, max_tokens=kwargs.get("context_tokens", CONTEXT_TOKEN_BUDGET),
+        retrieval_mode=kwargs.get("retrieval_mode", RETRIEVAL_MODE),
+    )
+    return AssessmentCore(
+        retrievers.get("permenpan"), retrievers.get("skj"),
+        lexical=lexical, context_packs=context_packs, llm=llm, **kwargs,
+    )
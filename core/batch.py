@@ -0,0 +1,254 @@
+# core/batch.py
+"""
+Penilaian massal offline (satu sesi ujian) dari file JSONL / CSV:
+
+    python -m core.batch jawaban.csv -o hasil.jsonl --concurrency 8
+
+Kolom / key per baris: nama, nip, jabatan, kompetensi, jawaban, dan salah satu
+dari id_soal (mode terstruktur) atau kasus (mode bebas).
+
+- input dibaca baris per baris (tidak dimuat seluruhnya ke memori)
+- paling banyak `concurrency` asesmen berjalan bersamaan (API async AssessmentCore)
+- setiap hasil langsung di-append ke output JSONL + flush, jadi output sekaligus
+  checkpoint: menjalankan ulang perintah yang sama melewati baris yang sudah
+  "ok" / "invalid" dan hanya menilai baris yang belum selesai atau "error"
+- `--service-url` (atau env ASSESSMENT_SERVICE_URL) mengirim asesmen ke
+  `python -m core.service` yang sudah berjalan, bukan memuat index di proses ini
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from core.assessment import AssessmentCore, get_komp_info, load_assessment_core
+from core.clients import aclose_async_http_client
+from core.result_parser import AssessmentResult, summarize_results
+from core.service import ServiceClient
+
+REQUIRED_FIELDS = ("jabatan", "kompetensi", "jawaban")
+KEY_FIELDS = ("nama", "nip", "jabatan", "kompetensi", "id_soal", "kasus", "jawaban")
+
+# Status yang tidak dinilai ulang saat resume; "error" (LLM/jaringan) selalu dicoba lagi
+DONE_STATUSES = ("ok", "invalid")
+
+PROGRESS_EVERY = 50
+
+
+def read_rows(path: Path) -> Iterator[tuple[int, dict | None, str | None]]:
+    """(nomor baris, row, pesan error) dari .jsonl / .csv; baris rusak -> row None."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            # Baris 1 = header
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, {k.strip(): (v or "").strip() for k, v in row.items() if k}, None
+            return
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"JSON tidak valid: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, None, "Baris harus objek JSON"
+                continue
+            yield line_no, row, None
+
+
+def row_key(row: dict) -> str:
+    """Hash isi baris; stabil walau urutan file berubah atau file ditambah."""
+    material = "\x1f".join(str(row.get(field) or "").strip() for field in KEY_FIELDS)
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()[:16]
+
+
+def load_checkpoint(output_path: Path) -> set[str]:
+    """Key baris yang sudah selesai di output sebelumnya (baris terakhir yang terpotong diabaikan)."""
+    done: set[str] = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict) or not record.get("key"):
+                continue
+            if record.get("status") in DONE_STATUSES:
+                done.add(str(record["key"]))
+    return done
+
+
+def validate_row(row: dict) -> str | None:
+    missing = [field for field in REQUIRED_FIELDS if not str(row.get(field) or "").strip()]
+    if not str(row.get("id_soal") or "").strip() and not str(row.get("kasus") or "").strip():
+        missing.append("id_soal/kasus")
+    if missing:
+        return f"Field wajib kosong: {', '.join(missing)}"
+    try:
+        get_komp_info(row["jabatan"], row["kompetensi"])
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+class BatchRunner:
+    """Antrean terbatas + `concurrency` worker yang menulis hasil ke satu file JSONL."""
+
+    def __init__(self, core: AssessmentCore | ServiceClient, output_path: Path, concurrency: int = 8,
+                 row_timeout: float | None = 180.0):
+        if concurrency <= 0:
+            raise ValueError("concurrency harus > 0")
+        self.core = core
+        self.output_path = Path(output_path)
+        self.concurrency = concurrency
+        self.row_timeout = row_timeout
+        self.counts = {"ok": 0, "invalid": 0, "error": 0, "skipped": 0}
+        self.results: list[AssessmentResult] = []
+        self._out = None
+        self._started = 0.0
+
+    async def run(self, input_path: Path) -> dict:
+        done = load_checkpoint(self.output_path)
+        if done:
+            print(f"⏩ Resume: {len(done)} baris sudah selesai di {self.output_path}")
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._open_output()
+        self._started = time.perf_counter()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        seen: set[str] = set()
+        try:
+            for line_no, row, error in read_rows(Path(input_path)):
+                if row is None:
+                    # Baris rusak dikunci per nomor baris; jangan ditulis ulang setiap resume
+                    if f"line-{line_no}" in done:
+                        self.counts["skipped"] += 1
+                    else:
+                        self._write({"key": f"line-{line_no}", "line": line_no, "status": "invalid", "error": error})
+                    continue
+                key = row_key(row)
+                if key in done or key in seen:
+                    self.counts["skipped"] += 1
+                    continue
+                seen.add(key)
+                await queue.put((line_no, key, row))
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._out.close()
+            await aclose_async_http_client()
+
+        return {
+            **self.counts,
+            "elapsed_s": round(time.perf_counter() - self._started, 1),
+            "ringkasan": summarize_results(self.results),
+        }
+
+    def _open_output(self) -> None:
+        # Baris terakhir bisa terpotong kalau run sebelumnya mati di tengah write
+        needs_newline = False
+        if self.output_path.exists() and self.output_path.stat().st_size:
+            with open(self.output_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._out = open(self.output_path, "a", encoding="utf-8")
+        if needs_newline:
+            self._out.write("\n")
+
+    def _write(self, record: dict) -> None:
+        # Dipanggil hanya dari event loop, jadi satu baris utuh per write
+        self._out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._out.flush()
+        self.counts[record["status"]] += 1
+        processed = self.counts["ok"] + self.counts["invalid"] + self.counts["error"]
+        if processed % PROGRESS_EVERY == 0:
+            elapsed = time.perf_counter() - self._started
+            print(f"📊 {processed} baris dinilai ({processed / elapsed:.2f}/s) {self.counts}")
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            line_no, key, row = await queue.get()
+            try:
+                self._write(await self._score(line_no, key, row))
+            finally:
+                queue.task_done()
+
+    async def _score(self, line_no: int, key: str, row: dict) -> dict[str, Any]:
+        record: dict[str, Any] = {
+            "key": key,
+            "line": line_no,
+            "nama": row.get("nama") or "",
+            "nip": row.get("nip") or "",
+            "jabatan": row.get("jabatan") or "",
+            "kompetensi": row.get("kompetensi") or "",
+        }
+        error = validate_row(row)
+        if error:
+            return {**record, "status": "invalid", "error": error}
+
+        if str(row.get("id_soal") or "").strip():
+            record["mode"], record["id_soal"] = "structured", str(row["id_soal"]).strip()
+            call = self.core.aassess_structured(
+                row["jabatan"], row["kompetensi"], record["id_soal"], row["jawaban"], row.get("nama") or "Peserta"
+            )
+        else:
+            record["mode"] = "free"
+            call = self.core.aassess_free(
+                row["jabatan"], row["kompetensi"], row["kasus"], row["jawaban"], row.get("nama") or "Peserta"
+            )
+
+        started = time.perf_counter()
+        try:
+            hasil, _, _ = await asyncio.wait_for(call, self.row_timeout)
+        except ValueError as e:  # soal tidak ditemukan, dsb.
+            return {**record, "status": "invalid", "error": str(e)}
+        except Exception as e:
+            print(f"❌ Baris {line_no} gagal: {type(e).__name__}: {e}")
+            return {**record, "status": "error", "error": f"{type(e).__name__}: {e}"}
+        self.results.append(hasil)
+        return {
+            **record,
+            "status": "ok",
+            "elapsed_s": round(time.perf_counter() - started, 3),
+            "hasil": hasil.to_dict(include_raw=True),
+        }
+
+
+def _main() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Bulk-score a JSONL/CSV cohort of answers")
+    parser.add_argument("input", type=Path, help="File .jsonl atau .csv")
+    parser.add_argument("-o", "--output", type=Path, help="Output JSONL (default: <input>.hasil.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "8")))
+    parser.add_argument("--row-timeout", type=float, default=float(os.getenv("BATCH_ROW_TIMEOUT", "180")))
+    parser.add_argument("--service-url", default=os.getenv("ASSESSMENT_SERVICE_URL"),
+                        help="URL core.service yang sudah berjalan (default: muat AssessmentCore di proses ini)")
+    args = parser.parse_args()
+
+    output = args.output or args.input.with_suffix(".hasil.jsonl")
+    core = ServiceClient(args.service_url) if args.service_url else load_assessment_core()
+    runner = BatchRunner(core, output, concurrency=args.concurrency,
+                         row_timeout=args.row_timeout or None)
+    try:
+        summary = asyncio.run(runner.run(args.input))
+    except KeyboardInterrupt:
+        print(f"⏸️ Dihentikan; jalankan ulang perintah yang sama untuk melanjutkan ({output})")
+        return
+    print(f"✅ Selesai: {json.dumps(summary, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    _main()
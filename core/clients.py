@@ -0,0 +1,198 @@
+# core/clients.py
+"""
+Satu factory untuk client OpenAI-compatible (OpenRouter) dengan koneksi HTTP bersama.
+
+Semua ChatOpenAI / OpenAIEmbeddings yang dibuat lewat modul ini memakai SATU
+`httpx.Client` dan satu pool async per event loop (keep-alive, pool terbatas,
+HTTP/2 kalau paket `h2` terpasang), sehingga asesmen paralel memakai ulang
+koneksi TLS alih-alih handshake baru per panggilan. Timeout & retry juga seragam:
+
+    LLM_CONNECT_TIMEOUT (10 s), LLM_READ_TIMEOUT (60 s), LLM_MAX_RETRIES (2)
+    HTTP_MAX_CONNECTIONS (32), HTTP_MAX_KEEPALIVE (16), HTTP_KEEPALIVE_EXPIRY (60 s)
+
+Retry memakai backoff bawaan SDK openai (menghormati Retry-After untuk 429/5xx).
+Transport kedua client dibungkus rate limiter bersama (core/rate_limit.py):
+request/menit, token/menit dan konkurensi AIMD per endpoint chat / embedding.
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Any
+
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from .rate_limit import AsyncRateLimitedTransport, RateLimitedTransport
+
+load_dotenv()
+
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+DEFAULT_HEADERS = {
+    "HTTP-Referer": "http://localhost:3000",
+    "X-Title": "RAG Assessment System",
+}
+
+CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+TIMEOUT = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "32")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "16")),
+    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60")),
+)
+# HTTP/2 (multiplexing banyak request di satu koneksi) butuh `pip install httpx[http2]`
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+_lock = threading.Lock()
+_sync_client: httpx.Client | None = None
+_async_client: "LoopBoundAsyncClient | None" = None
+
+
+def normalize_base_url(base_url: str | None) -> str:
+    """SDK openai menambahkan /chat/completions sendiri; buang kalau ikut tertulis di env."""
+    base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+    for suffix in ("/chat/completions", "/embeddings"):
+        if base_url.endswith(suffix):
+            base_url = base_url[: -len(suffix)]
+    return base_url
+
+
+def get_http_client() -> httpx.Client:
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            transport = RateLimitedTransport(httpx.HTTPTransport(http2=HTTP2, limits=LIMITS))
+            _sync_client = httpx.Client(transport=transport, timeout=TIMEOUT)
+        return _sync_client
+
+
+def _new_async_client() -> httpx.AsyncClient:
+    transport = AsyncRateLimitedTransport(httpx.AsyncHTTPTransport(http2=HTTP2, limits=LIMITS))
+    return httpx.AsyncClient(transport=transport, timeout=TIMEOUT)
+
+
+class LoopBoundAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient yang meneruskan setiap request ke AsyncClient milik event loop
+    yang sedang berjalan. Koneksi httpx terikat ke loop tempat dibuka, jadi
+    `asyncio.run` kedua di proses yang sama (notebook, batch setelah service)
+    mendapat pool baru, bukan koneksi dari loop yang sudah ditutup.
+    """
+
+    def __init__(self):
+        super().__init__(timeout=TIMEOUT)
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._clients_lock = threading.Lock()
+
+    def for_running_loop(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                # Pool milik loop yang sudah selesai tidak bisa di-aclose lagi; lepas referensinya
+                for old_loop in [old for old in self._clients if old.is_closed()]:
+                    del self._clients[old_loop]
+                client = self._clients[loop] = _new_async_client()
+            return client
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        return await self.for_running_loop().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        """Tutup pool milik loop yang sedang berjalan (pool loop lain tidak disentuh)."""
+        with self._clients_lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def open_loops(self) -> int:
+        with self._clients_lock:
+            return sum(1 for loop, client in self._clients.items()
+                       if not loop.is_closed() and not client.is_closed)
+
+
+def get_async_http_client() -> LoopBoundAsyncClient:
+    """AsyncClient bersama; pool koneksi sebenarnya dibuat per event loop (lihat LoopBoundAsyncClient)."""
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            _async_client = LoopBoundAsyncClient()
+        return _async_client
+
+
+async def aclose_async_http_client() -> None:
+    """
+    Tutup pool async milik loop ini; panggil sebelum loop berakhir (akhir
+    `AssessmentService.stop`, `BatchRunner.run`). Tidak bisa dilakukan di atexit
+    karena loop-nya sudah tertutup.
+    """
+    if _async_client is not None:
+        await _async_client.aclose()
+
+
+def http_client_stats() -> dict:
+    """Ringkasan konfigurasi pool (untuk status/metrics)."""
+    return {
+        "http2": HTTP2,
+        "max_connections": LIMITS.max_connections,
+        "max_keepalive_connections": LIMITS.max_keepalive_connections,
+        "keepalive_expiry": LIMITS.keepalive_expiry,
+        "connect_timeout": CONNECT_TIMEOUT,
+        "read_timeout": READ_TIMEOUT,
+        "max_retries": MAX_RETRIES,
+        "async_pools": _async_client.open_loops() if _async_client is not None else 0,
+    }
+
+
+@atexit.register
+def close_http_clients() -> None:
+    global _sync_client
+    with _lock:
+        if _sync_client is not None and not _sync_client.is_closed:
+            _sync_client.close()
+        _sync_client = None
+
+
+def build_chat_model(model: str, api_key: str | None, base_url: str | None = None,
+                     temperature: float = 0.7, max_tokens: int = 256, streaming: bool = True,
+                     cache: Any = None, **kwargs: Any) -> ChatOpenAI:
+    """ChatOpenAI dengan pool HTTP, timeout, retry dan header yang sama di semua modul."""
+    return ChatOpenAI(
+        base_url=normalize_base_url(base_url),
+        api_key=api_key,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        streaming=streaming,
+        timeout=TIMEOUT,
+        max_retries=MAX_RETRIES,
+        default_headers=DEFAULT_HEADERS,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        cache=cache,
+        **kwargs,
+    )
+
+
+def build_openai_embeddings(model: str, api_key: str | None, base_url: str | None = None,
+                            **kwargs: Any) -> OpenAIEmbeddings:
+    return OpenAIEmbeddings(
+        base_url=normalize_base_url(base_url),
+        api_key=api_key,
+        model=model,
+        timeout=TIMEOUT,
+        max_retries=MAX_RETRIES,
+        default_headers=DEFAULT_HEADERS,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        **kwargs,
+    )
@@ -0,0 +1,173 @@
+# core/context.py
+"""
+Perakitan konteks prompt dari chunk hasil retrieval.
+
+- teks overlap antar chunk (chunk_overlap=200) dan kalimat/baris panjang yang
+  sudah ada di konteks dibuang
+- chunk yang hampir sama (Jaccard shingle kata >= `near_duplicate`) dilewati
+- chunk dimasukkan sesuai urutan relevansi sampai anggaran token per sumber habis;
+  chunk terakhir dipotong di batas kalimat (atau batas kata kalau kalimat
+  pertamanya saja sudah melebihi sisa anggaran), bukan di tengah kata
+"""
+
+import re
+from typing import Iterable
+
+from langchain_core.documents import Document
+
+# Perkiraan kasar (sama dengan src/embedding_pipeline.py): ~4 karakter per token
+CHARS_PER_TOKEN = 4
+DEFAULT_SEPARATOR = "\n\n---\n\n"
+
+# Pemisah segmen: akhir kalimat atau baris baru (ikut ditangkap supaya format asli terjaga)
+_SEGMENT_SPLIT = re.compile(r"((?<=[.!?;:])\s+|\n+)")
+_WORD = re.compile(r"\w+")
+
+
+def approx_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ContextAssembler:
+    """
+    `max_tokens`: anggaran token konteks untuk SATU sumber (None = tanpa batas).
+    `min_segment_chars`: segmen lebih pendek dari ini (judul seperti "Indikator Perilaku:")
+    tidak pernah dibuang sebagai duplikat supaya struktur tiap chunk tetap terbaca.
+    """
+
+    def __init__(self, max_tokens: int | None = 800, separator: str = DEFAULT_SEPARATOR,
+                 near_duplicate: float = 0.8, min_segment_chars: int = 40):
+        self.max_tokens = max_tokens
+        self.separator = separator
+        self.near_duplicate = near_duplicate
+        self.min_segment_chars = min_segment_chars
+        self.last_stats: dict = {}
+
+    def _overlap_length(self, text: str, previous: list[str], suffix: bool = False) -> int:
+        """
+        Panjang awalan (atau akhiran) terpanjang `text` yang identik dengan potongan chunk
+        lain yang sudah masuk, dicari dengan binary search: kalau potongan sepanjang L
+        ada di chunk lain, potongan yang lebih pendek pasti juga ada.
+        """
+        best = 0
+        for other in previous:
+            low, high = best, min(len(text), len(other))
+            while low < high:
+                mid = (low + high + 1) // 2
+                if (text[-mid:] if suffix else text[:mid]) in other:
+                    low = mid
+                else:
+                    high = mid - 1
+            best = low
+        return best
+
+    def _strip_overlap(self, text: str, previous: list[str]) -> str:
+        """Buang overlap text splitter: awalan/akhiran chunk yang sudah ada di chunk tetangganya."""
+        head = self._overlap_length(text, previous)
+        if head >= self.min_segment_chars:
+            text = text[head:].strip()
+        tail = self._overlap_length(text, previous, suffix=True)
+        if tail >= self.min_segment_chars:
+            text = text[:-tail].strip()
+        return text
+
+    def _dedupe(self, text: str, seen: str) -> str:
+        """Buang segmen yang (setelah normalisasi) sudah ada di teks konteks sebelumnya."""
+        parts = _SEGMENT_SPLIT.split(text)
+        kept = []
+        # parts = [segmen, pemisah, segmen, pemisah, ...]
+        for i in range(0, len(parts), 2):
+            segment = parts[i]
+            separator = parts[i + 1] if i + 1 < len(parts) else ""
+            normalized = _normalize(segment)
+            if not normalized:
+                continue
+            if len(normalized) >= self.min_segment_chars and normalized in seen:
+                continue
+            kept.append(segment + separator)
+        return "".join(kept).strip()
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Potong ke anggaran token di batas segmen terakhir yang muat. Kalau segmen
+        pertama saja sudah melebihi anggaran, potong paksa di batas kata terakhir
+        (atau di karakter ke-`limit` kalau tidak ada spasi) supaya chunk tidak hilang.
+        """
+        limit = max_tokens * CHARS_PER_TOKEN
+        if limit <= 0:
+            return ""
+        parts = _SEGMENT_SPLIT.split(text)
+        out = ""
+        for i in range(0, len(parts), 2):
+            candidate = out + parts[i]
+            if len(candidate) > limit:
+                break
+            out = candidate + (parts[i + 1] if i + 1 < len(parts) else "")
+        if not out.strip():
+            head = text[:limit]
+            if len(text) > limit and not text[limit].isspace():
+                head = head.rsplit(None, 1)[0] if len(head.split()) > 1 else head
+            out = head
+        return out.strip()
+
+    def assemble(self, docs: Iterable[Document]) -> str:
+        """Gabungkan chunk (urut relevansi, terbaik dulu) menjadi satu konteks."""
+        pieces: list[str] = []
+        shingles: list[set] = []
+        included: list[str] = []
+        seen = ""
+        used = 0
+        stats = {"chunks": 0, "used_chunks": 0, "input_tokens": 0, "output_tokens": 0}
+
+        for doc in docs:
+            stats["chunks"] += 1
+            stats["input_tokens"] += approx_tokens(doc.page_content)
+            raw = doc.page_content.strip()
+            doc_shingles = _shingles(raw)
+            if any(_jaccard(doc_shingles, other) >= self.near_duplicate for other in shingles):
+                continue
+            text = self._dedupe(self._strip_overlap(raw, included), seen)
+            if not text:
+                continue
+
+            separator_cost = approx_tokens(self.separator) if pieces else 0
+            cost = approx_tokens(text) + separator_cost
+            if self.max_tokens is not None and used + cost > self.max_tokens:
+                text = self._truncate(text, self.max_tokens - used - separator_cost)
+                if text:
+                    pieces.append(text)
+                    stats["used_chunks"] += 1
+                break
+
+            pieces.append(text)
+            shingles.append(doc_shingles)
+            included.append(raw)
+            seen += " " + _normalize(text)
+            used += cost
+            stats["used_chunks"] += 1
+
+        context = self.separator.join(pieces)
+        stats["output_tokens"] = approx_tokens(context)
+        self.last_stats = stats
+        return context
+
+
+def assemble_context(docs: Iterable[Document], max_tokens: int | None = 800) -> str:
+    return ContextAssembler(max_tokens=max_tokens).assemble(docs)
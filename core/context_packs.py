@@ -0,0 +1,269 @@
+# core/context_packs.py
+"""
+Context pack: konteks PermenPAN & SKJ yang sudah dihitung untuk setiap
+kombinasi (jabatan, kompetensi, level_target) di SKJ_DATA.
+
+Konteks mode terstruktur hampir sama untuk semua peserta, jadi cukup di-retrieve
+sekali (offline) lalu dipakai ulang di jalur asesmen tanpa embedding/search.
+
+Key pack mencakup mode retrieval dan hash deskripsi kompetensi (isi query), dan
+setiap pack menyimpan fingerprint index (nama, ukuran, mtime file index) saat
+dibangun; kalau index berubah (rebuild, re-ingest), pack otomatis dianggap basi.
+File JSON dipakai bersama beberapa proses (app, service, batch): `save()` menulis
+di bawah lock file, menggabungkan pack yang ditulis proses lain, lalu `os.replace`.
+
+Precompute (offline, sebelum sesi asesmen):
+    python -m core.context_packs
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from core.index_store import DOCSTORE_FILE, FAISS_FILE, VECTORS_FILE
+from core.lexical import BM25_FILE
+from core.context import assemble_context
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_PACKS_PATH = ROOT_DIR / "data" / "cache" / "context_packs.json"
+DEFAULT_INDEX_DIRS = {
+    "permenpan": ROOT_DIR / "data" / "index" / "permenpan_index",
+    "skj": ROOT_DIR / "data" / "index" / "skj_index",
+}
+INDEX_FILES = (FAISS_FILE, "index.pkl", VECTORS_FILE, DOCSTORE_FILE, BM25_FILE)
+DEFAULT_RETRIEVAL_MODE = "hybrid"
+# Lock file save(): tunggu paling lama SAVE_LOCK_TIMEOUT, anggap basi setelah SAVE_LOCK_STALE detik
+SAVE_LOCK_TIMEOUT = 5.0
+SAVE_LOCK_STALE = 30.0
+
+
+def index_fingerprint(folder: str | Path) -> str:
+    """Hash (nama, ukuran, mtime) file index; berubah setiap kali index ditulis ulang."""
+    folder = Path(folder)
+    h = hashlib.sha1()
+    for name in INDEX_FILES:
+        path = folder / name
+        if path.exists():
+            stat = path.stat()
+            h.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+
+def deskripsi_hash(deskripsi: str) -> str:
+    return hashlib.sha1((deskripsi or "").strip().encode("utf-8")).hexdigest()[:12]
+
+
+def pack_key(jabatan: str, kompetensi: str, level_target: Any, deskripsi: str = "",
+             retrieval_mode: str = DEFAULT_RETRIEVAL_MODE) -> str:
+    """Semua input query & retrieval: deskripsi / mode yang berubah -> key baru (pack lama tidak terpakai)."""
+    return f"{jabatan}|{kompetensi}|{level_target}|{retrieval_mode}|{deskripsi_hash(deskripsi)}"
+
+
+@contextmanager
+def _save_lock(path: Path):
+    """Lock antar proses (O_EXCL) untuk read-merge-write; lock basi (proses mati) diambil alih."""
+    lock_path = path.with_name(f"{path.name}.lock")
+    deadline = time.monotonic() + SAVE_LOCK_TIMEOUT
+    acquired = False
+    while not acquired:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            acquired = True
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > SAVE_LOCK_STALE:
+                    lock_path.unlink(missing_ok=True)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() >= deadline:
+                # Tetap tulis (atomic); paling buruk pack proses lain hilang & dibangun ulang
+                print(f"⚠️ Lock {lock_path} tidak didapat, menyimpan tanpa lock")
+                break
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        if acquired:
+            lock_path.unlink(missing_ok=True)
+
+
+def pack_query(jabatan: str, kompetensi: str, level_target: Any, deskripsi: str = "") -> str:
+    """Query RAG per kombinasi (tanpa soal/jawaban peserta, supaya bisa dipakai bersama)."""
+    return (
+        f"Jabatan: {jabatan}. Kompetensi: {kompetensi}. {deskripsi} "
+        f"Level {level_target} indikator perilaku."
+    )
+
+
+def skj_combinations(skj_data: dict) -> list[tuple[str, str, Any, str]]:
+    """(jabatan, kompetensi, level_target, deskripsi) untuk semua kompetensi di SKJ_DATA."""
+    return [
+        (jabatan, kompetensi, komp["level_target"], komp.get("deskripsi", ""))
+        for jabatan, info in skj_data.items()
+        for kompetensi, komp in info["kompetensi"].items()
+    ]
+
+
+def retrieve_pack_contexts(retriever: Any, jabatan: str, kompetensi: str, level_target: Any,
+                           deskripsi: str = "", max_tokens: int | None = 800) -> tuple[str, str]:
+    """Retrieve konteks (PermenPAN, SKJ) satu kombinasi dengan MultiIndexRetriever."""
+    docs = retriever.search(
+        pack_query(jabatan, kompetensi, level_target, deskripsi),
+        filters={"skj": {"jabatan": jabatan, "kompetensi": kompetensi}},
+    )
+    return (
+        assemble_context(docs.get("permenpan", []), max_tokens),
+        assemble_context(docs.get("skj", []), max_tokens),
+    )
+
+
+async def aretrieve_pack_contexts(retriever: Any, jabatan: str, kompetensi: str, level_target: Any,
+                                  deskripsi: str = "", max_tokens: int | None = 800) -> tuple[str, str]:
+    docs = await retriever.asearch(
+        pack_query(jabatan, kompetensi, level_target, deskripsi),
+        filters={"skj": {"jabatan": jabatan, "kompetensi": kompetensi}},
+    )
+    return (
+        assemble_context(docs.get("permenpan", []), max_tokens),
+        assemble_context(docs.get("skj", []), max_tokens),
+    )
+
+
+class ContextPackStore:
+    """Penyimpanan context pack (JSON) + validasi terhadap fingerprint index saat ini."""
+
+    def __init__(self, path: str | Path = DEFAULT_PACKS_PATH, index_dirs: dict[str, Path] | None = None,
+                 max_tokens: int | None = 800, retrieval_mode: str = DEFAULT_RETRIEVAL_MODE):
+        self.path = Path(path)
+        self.index_dirs = index_dirs or DEFAULT_INDEX_DIRS
+        # Anggaran token konteks per sumber; pack dengan anggaran berbeda dianggap basi
+        self.max_tokens = max_tokens
+        self.retrieval_mode = retrieval_mode
+        self._lock = threading.Lock()
+        self.packs: dict[str, dict] = self._read()
+
+    def _read(self) -> dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("packs", {})
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️ Context pack tidak bisa dibaca ({e}), mulai dari kosong")
+            return {}
+
+    def _key(self, jabatan: str, kompetensi: str, level_target: Any, deskripsi: str) -> str:
+        return pack_key(jabatan, kompetensi, level_target, deskripsi, self.retrieval_mode)
+
+    def fingerprints(self) -> dict[str, str]:
+        return {name: index_fingerprint(folder) for name, folder in self.index_dirs.items()}
+
+    def _is_valid(self, pack: dict, fingerprints: dict[str, str]) -> bool:
+        return pack.get("fingerprints") == fingerprints and pack.get("max_tokens") == self.max_tokens
+
+    def get(self, jabatan: str, kompetensi: str, level_target: Any, deskripsi: str = "") -> dict | None:
+        """Pack yang masih valid untuk index saat ini, atau None (belum ada / basi)."""
+        pack = self.packs.get(self._key(jabatan, kompetensi, level_target, deskripsi))
+        if pack is None or not self._is_valid(pack, self.fingerprints()):
+            return None
+        return pack
+
+    def put(self, jabatan: str, kompetensi: str, level_target: Any,
+            context_permenpan: str, context_skj: str, deskripsi: str = "") -> dict:
+        pack = {
+            "jabatan": jabatan,
+            "kompetensi": kompetensi,
+            "level_target": level_target,
+            "deskripsi_sha": deskripsi_hash(deskripsi),
+            "retrieval_mode": self.retrieval_mode,
+            "context_permenpan": context_permenpan,
+            "context_skj": context_skj,
+            "fingerprints": self.fingerprints(),
+            "max_tokens": self.max_tokens,
+            "built_at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self.packs[self._key(jabatan, kompetensi, level_target, deskripsi)] = pack
+        return pack
+
+    def save(self) -> None:
+        """Gabungkan dengan isi file saat ini (per key, `built_at` terbaru menang) lalu tulis atomic."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with self._lock, _save_lock(self.path):
+            merged = self._read()
+            for key, pack in self.packs.items():
+                other = merged.get(key)
+                if other is None or str(pack.get("built_at", "")) >= str(other.get("built_at", "")):
+                    merged[key] = pack
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"packs": merged}, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self.packs = merged
+
+    def stats(self) -> dict:
+        fingerprints = self.fingerprints()
+        valid = sum(1 for pack in self.packs.values() if self._is_valid(pack, fingerprints))
+        return {"packs": len(self.packs), "valid": valid, "stale": len(self.packs) - valid}
+
+    def build(self, retriever: Any, combinations: list[tuple[str, str, Any, str]], force: bool = False) -> int:
+        """Hitung pack untuk semua kombinasi yang belum ada/basi; kembalikan jumlah yang dibangun."""
+        built = 0
+        for jabatan, kompetensi, level_target, deskripsi in combinations:
+            if not force and self.get(jabatan, kompetensi, level_target, deskripsi) is not None:
+                continue
+            context_permenpan, context_skj = retrieve_pack_contexts(
+                retriever, jabatan, kompetensi, level_target, deskripsi, self.max_tokens
+            )
+            self.put(jabatan, kompetensi, level_target, context_permenpan, context_skj, deskripsi)
+            built += 1
+            print(f"📦 {jabatan} / {kompetensi} (level {level_target})")
+        self.save()
+        return built
+
+
+def _main(argv: list[str]) -> None:
+    from dotenv import load_dotenv
+
+    from core.data import SKJ_DATA
+    from core.index_health import check_index
+    from core.index_store import load_index
+    from core.lexical import load_lexical_index
+    from core.llm import build_embeddings
+    from core.rag import MultiIndexRetriever
+
+    load_dotenv()
+    embeddings = build_embeddings(str(ROOT_DIR / "data" / "cache" / "embeddings.sqlite"))
+    stores = {}
+    lexical = {}
+    for name, folder in DEFAULT_INDEX_DIRS.items():
+        if check_index(folder)["status"] == "ok":
+            stores[name] = load_index(folder, embeddings)
+        try:
+            lexical[name] = load_lexical_index(folder)
+        except FileNotFoundError:
+            pass
+    if set(stores) != set(DEFAULT_INDEX_DIRS):
+        # Pack dari index yang tidak lengkap akan tersimpan sampai index berubah
+        print(f"⚠️ Index tidak lengkap, hanya tersedia: {', '.join(stores) or '-'}")
+
+    retrieval_mode = os.getenv("RETRIEVAL_MODE", DEFAULT_RETRIEVAL_MODE)
+    retriever = MultiIndexRetriever(stores, k=4, lexical=lexical, mode=retrieval_mode)
+    store = ContextPackStore(max_tokens=int(os.getenv("CONTEXT_TOKEN_BUDGET", "800")),
+                             retrieval_mode=retrieval_mode)
+    built = store.build(retriever, skj_combinations(SKJ_DATA), force="--force" in argv)
+    print(f"✅ {built} context pack dibangun; {store.stats()}")
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -0,0 +1,222 @@
+# core/embeddings.py
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_text(text: str) -> str:
+    """Normalisasi teks untuk kunci cache: Unicode NFC + whitespace dirapikan."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Cache embedding 2 tingkat:
+    - memori: LRU dengan batas `max_entries`
+    - disk (opsional): SQLite di `disk_path`, persisten antar proses/restart,
+      dibatasi `max_disk_entries` baris (yang tertua dibuang) dan opsional
+      `disk_ttl` detik
+
+    Kunci = (nama model, sha256 teks ternormalisasi). Normalisasi hanya untuk
+    kunci; teks yang dikirim ke endpoint tetap teks asli.
+    """
+
+    def __init__(self, max_entries: int = 2048, disk_path: str | Path | None = None,
+                 max_disk_entries: int = 100_000, disk_ttl: float | None = None):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.disk_ttl = disk_ttl
+        self._disk_count = 0
+        self._memory: OrderedDict[tuple[str, str], List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_path is not None:
+            disk_path = Path(disk_path)
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+            if "created_at" not in columns:  # cache dari versi sebelumnya
+                self._db.execute("ALTER TABLE embeddings ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_created_at ON embeddings (created_at)")
+            self._db.commit()
+            self._disk_count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @property
+    def disk_enabled(self) -> bool:
+        return self._db is not None
+
+    @staticmethod
+    def make_key(model: str, text: str) -> tuple[str, str]:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return model, digest
+
+    def get(self, key: tuple[str, str]) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector, created_at FROM embeddings WHERE model = ? AND text_hash = ?", key
+                ).fetchone()
+                if row is not None and (self.disk_ttl is None or time.time() - row[1] <= self.disk_ttl):
+                    vector = array("f", row[0]).tolist()
+                    self._put_memory(key, vector)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put_many(self, items: List[tuple[tuple[str, str], List[float]]]) -> None:
+        with self._lock:
+            for key, vector in items:
+                self._put_memory(key, vector)
+            if self._db is not None and items:
+                now = time.time()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, created_at) VALUES (?, ?, ?, ?)",
+                    [(key[0], key[1], array("f", vector).tobytes(), now) for key, vector in items],
+                )
+                self._disk_count += len(items)
+                self._prune_disk(now)
+                self._db.commit()
+
+    def _prune_disk(self, now: float) -> None:
+        """Buang baris kedaluwarsa & yang tertua di atas `max_disk_entries` (dipanggil dengan lock)."""
+        # Hitungan hanya perkiraan (REPLACE tidak menambah baris): cek ulang saat lewat batas
+        if self._disk_count <= self.max_disk_entries and self.disk_ttl is None:
+            return
+        if self.disk_ttl is not None:
+            self._db.execute("DELETE FROM embeddings WHERE created_at < ?", (now - self.disk_ttl,))
+        self._disk_count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._disk_count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY created_at LIMIT ?)",
+                (excess,),
+            )
+            self._disk_count -= excess
+
+    def _put_memory(self, key: tuple[str, str], vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_enabled": self._db is not None,
+                "disk_entries": self._disk_count,
+                "max_disk_entries": self.max_disk_entries,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wrapper `Embeddings` yang menyimpan hasil embedding di `EmbeddingCache`.
+    Bisa dipakai langsung di `FAISS.load_local` / `FAISS.from_documents`.
+    Teks dikirim ke endpoint apa adanya (vektor sama dengan tanpa cache); teks
+    duplikat dalam satu batch hanya di-embed sekali. Di versi async, tier disk
+    (SQLite) dibaca/ditulis lewat `asyncio.to_thread` supaya event loop tidak terblokir.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: EmbeddingCache | None = None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache()
+
+    def _lookup(self, texts: List[str]) -> tuple[list, list, dict]:
+        """(keys, vectors, missing) dengan missing = {key: [indeks, ...]} untuk key yang belum ada."""
+        keys = [EmbeddingCache.make_key(self.model_name, t) for t in texts]
+        vectors = [self.cache.get(k) for k in keys]
+        missing: dict = {}
+        for i, (key, vector) in enumerate(zip(keys, vectors)):
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+        return keys, vectors, missing
+
+    @staticmethod
+    def _to_embed(texts: List[str], missing: dict) -> List[str]:
+        # Satu teks (asli, kemunculan pertama) per key yang belum ada
+        return [texts[indices[0]] for indices in missing.values()]
+
+    @staticmethod
+    def _fill(vectors: list, missing: dict, new_vectors: List[List[float]]) -> list:
+        items = []
+        for (key, indices), vector in zip(missing.items(), new_vectors):
+            for i in indices:
+                vectors[i] = vector
+            items.append((key, vector))
+        return items
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, vectors, missing = self._lookup(texts)
+        if missing:
+            new_vectors = self.embeddings.embed_documents(self._to_embed(texts, missing))
+            self.cache.put_many(self._fill(vectors, missing, new_vectors))
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, vectors, missing = self._lookup([text])
+        if missing:
+            self.cache.put_many(self._fill(vectors, missing, [self.embeddings.embed_query(text)]))
+        return vectors[0]
+
+    async def _run_cache(self, fn, *args):
+        # Tier memori cepat; tier disk (SQLite) jangan dijalankan di event loop
+        if self.cache.disk_enabled:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, vectors, missing = await self._run_cache(self._lookup, texts)
+        if missing:
+            new_vectors = await self.embeddings.aembed_documents(self._to_embed(texts, missing))
+            await self._run_cache(self.cache.put_many, self._fill(vectors, missing, new_vectors))
+        return vectors
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, vectors, missing = await self._run_cache(self._lookup, [text])
+        if missing:
+            new_vectors = [await self.embeddings.aembed_query(text)]
+            await self._run_cache(self.cache.put_many, self._fill(vectors, missing, new_vectors))
+        return vectors[0]
+
+    def stats(self) -> dict:
+        return self.cache.stats()
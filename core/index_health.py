@@ -0,0 +1,208 @@
+# core/index_health.py
+"""
+Cek integritas index saat startup + job rebuild di background.
+
+- check_index(folder): {"status": "ok" | "missing" | "corrupt" | "legacy", "detail": ...}
+- IndexRebuildJob: membangun ulang index dari dokumen sumber di thread terpisah
+  (tidak memblokir UI), dengan progress yang bisa ditampilkan di Streamlit.
+"""
+
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from core.index_store import (
+    DOCSTORE_FILE, FAISS_FILE, LEGACY_DOCSTORE_FILE, VECTORS_FILE, SQLiteDocstore, has_store,
+)
+from core.lexical import BM25_FILE
+# Lock rebuild di-touch setiap LOCK_REFRESH_SECONDS selama build berjalan, jadi lock
+# yang tidak diperbarui selama STALE_LOCK_SECONDS berarti proses pemegangnya mati
+LOCK_REFRESH_SECONDS = 30
+STALE_LOCK_SECONDS = 5 * 60
+# Job yang gagal boleh dicoba lagi setelah jeda ini
+FAILED_RETRY_SECONDS = 5 * 60
+
+
+def check_index(folder: str | Path) -> dict:
+    """Cek apakah index di `folder` lengkap dan bisa dibaca (tanpa unpickle)."""
+    folder = Path(folder)
+    if not folder.exists():
+        return {"status": "missing", "detail": f"Folder {folder} tidak ada"}
+
+    try:
+        if has_store(folder):
+            vectors = np.load(folder / VECTORS_FILE, mmap_mode="r")
+            n_docs = len(SQLiteDocstore(folder / DOCSTORE_FILE))
+            if vectors.ndim != 2 or len(vectors) != n_docs:
+                return {"status": "corrupt", "detail": f"{len(vectors)} vektor vs {n_docs} dokumen"}
+            return {"status": "ok", "detail": f"{n_docs} chunk (format aman)"}
+
+        missing = [name for name in (FAISS_FILE, LEGACY_DOCSTORE_FILE) if not (folder / name).exists()]
+        if len(missing) == 2:
+            return {"status": "missing", "detail": f"Index belum dibangun di {folder}"}
+        if missing:
+            return {"status": "corrupt", "detail": f"File hilang: {', '.join(missing)}"}
+
+        # Format lama (pickle) tidak dimuat saat serving
+        return {
+            "status": "legacy",
+            "detail": f"Format lama (index.pkl), konversi dulu: python -m core.index_store {folder}",
+        }
+    except Exception as e:
+        return {"status": "corrupt", "detail": f"Tidak bisa dibaca: {e}"}
+
+
+class IndexRebuildJob:
+    """
+    Rebuild satu index di background thread.
+
+    `load_documents` mengembalikan iterable Document (mis. halaman PDF), yang
+    di-split, di-embed dan ditulis ke folder sementara; setelah selesai file
+    dipindah ke `folder`. Antar proses dijaga lock file supaya hanya satu
+    worker yang membangun ulang; lock di-touch berkala selama build, dan job yang
+    gagal `retry_due()` setelah FAILED_RETRY_SECONDS supaya pemanggil bisa membuat
+    job baru.
+    """
+
+    def __init__(self, name: str, folder: str | Path, load_documents: Callable[[], Iterable[Document]],
+                 embedding_model: Any, preprocess: Optional[Callable[[str], str]] = None):
+        self.name = name
+        self.folder = Path(folder)
+        self.load_documents = load_documents
+        self.embedding_model = embedding_model
+        self.preprocess = preprocess
+
+        self.state = "pending"  # pending | running | waiting | done | failed
+        self.documents_read = 0
+        self.chunks_indexed = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self._finished_monotonic: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def lock_path(self) -> Path:
+        return self.folder.parent / f".{self.folder.name}.rebuild.lock"
+
+    def _lock_is_stale(self) -> bool:
+        try:
+            return time.time() - self.lock_path.stat().st_mtime > STALE_LOCK_SECONDS
+        except FileNotFoundError:
+            return False
+
+    def _acquire_lock(self) -> bool:
+        self.folder.parent.mkdir(parents=True, exist_ok=True)
+        if self._lock_is_stale():
+            self.lock_path.unlink(missing_ok=True)
+        try:
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+
+    def _refresh_lock(self, stop: threading.Event) -> None:
+        """Heartbeat: perbarui mtime lock selama build supaya worker lain tidak menganggapnya basi."""
+        while not stop.wait(LOCK_REFRESH_SECONDS):
+            try:
+                os.utime(self.lock_path)
+            except FileNotFoundError:
+                return
+
+    def start(self) -> "IndexRebuildJob":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"rebuild-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _count_documents(self, documents: Iterable[Document]) -> Iterator[Document]:
+        for doc in documents:
+            self.documents_read += 1
+            yield doc
+
+    def _on_progress(self, total: int) -> None:
+        self.chunks_indexed = total
+
+    def _run(self) -> None:
+        # Import di sini: modul ingest (src/) hanya dibutuhkan saat rebuild
+        from src.data_loader import iter_chunks
+        from src.embedding_pipeline import EmbeddingPipeline
+        from src.index_builder import stream_index
+
+        self.started_at = datetime.now().isoformat()
+        if not self._acquire_lock():
+            # Worker lain sedang rebuild; cukup tunggu index sehat
+            self.state = "waiting"
+            while (self.lock_path.exists() and not self._lock_is_stale()
+                   and check_index(self.folder)["status"] != "ok"):
+                time.sleep(5)
+            ok = check_index(self.folder)["status"] == "ok"
+            self.state = "done" if ok else "failed"
+            self.error = None if ok else "Rebuild oleh worker lain gagal atau berhenti"
+            self._finish()
+            return
+
+        self.state = "running"
+        tmp_folder = self.folder.with_name(self.folder.name + ".rebuild")
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._refresh_lock, args=(stop_heartbeat,),
+                                     name=f"rebuild-{self.name}-lock", daemon=True)
+        heartbeat.start()
+        try:
+            print(f"🔧 Rebuild index {self.name} -> {self.folder}")
+            shutil.rmtree(tmp_folder, ignore_errors=True)
+            chunks = iter_chunks(self._count_documents(self.load_documents()), preprocess=self.preprocess)
+            stream_index(
+                chunks,
+                self.embedding_model,
+                index_path=str(tmp_folder),
+                pipeline=EmbeddingPipeline(self.embedding_model, show_progress=False),
+                on_progress=self._on_progress,
+            )
+
+            # Pindahkan file; file format aman terakhir supaya has_store() baru True saat semua lengkap
+            self.folder.mkdir(parents=True, exist_ok=True)
+            for name in (FAISS_FILE, LEGACY_DOCSTORE_FILE, BM25_FILE, DOCSTORE_FILE, VECTORS_FILE):
+                (tmp_folder / name).replace(self.folder / name)
+            shutil.rmtree(tmp_folder, ignore_errors=True)
+
+            self.state = "done"
+            print(f"✅ Rebuild index {self.name} selesai: {self.chunks_indexed} chunks")
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            print(f"❌ Rebuild index {self.name} gagal: {e}")
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            self.lock_path.unlink(missing_ok=True)
+            self._finish()
+
+    def _finish(self) -> None:
+        self.finished_at = datetime.now().isoformat()
+        self._finished_monotonic = time.monotonic()
+
+    def retry_due(self) -> bool:
+        """True kalau job gagal dan jeda FAILED_RETRY_SECONDS sudah lewat (buang job, buat yang baru)."""
+        return (self.state == "failed" and self._finished_monotonic is not None
+                and time.monotonic() - self._finished_monotonic >= FAILED_RETRY_SECONDS)
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "documents_read": self.documents_read,
+            "chunks_indexed": self.chunks_indexed,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
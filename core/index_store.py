@@ -0,0 +1,395 @@
+# core/index_store.py
+"""
+Format index yang aman (tanpa pickle) untuk serving:
+
+    <folder>/vectors.npy       float32 [n, dim], dibuka dengan memory map
+    <folder>/docstore.sqlite   teks & metadata chunk, dibaca lazy per baris
+
+Tidak ada eksekusi pickle saat load, cold start cepat (hanya mmap + buka SQLite)
+dan memori residen hanya halaman vektor yang benar-benar disentuh.
+
+Kalau folder juga berisi index.faiss, index itu dibuka dengan mmap read-only
+(faiss.IO_FLAG_MMAP_IFC) dan dipakai untuk search: semua worker Streamlit di satu
+host berbagi page cache yang sama, bukan salinan index per proses. index.faiss
+hanya dipakai kalau checksum-nya sama dengan yang dicatat saat export (tabel
+`meta` di docstore.sqlite); selain itu search lewat numpy.
+
+Index LangChain lama (index.faiss + index.pkl) TIDAK dimuat saat serving; konversi
+dulu secara offline (satu-satunya tempat pickle dibuka, sumber tepercaya):
+    python -m core.index_store data/index/skj_index
+"""
+
+import hashlib
+
+import json
+import pickle
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+VECTORS_FILE = "vectors.npy"
+DOCSTORE_FILE = "docstore.sqlite"
+FAISS_FILE = "index.faiss"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+
+
+class LegacyIndexError(FileNotFoundError):
+    """Folder hanya berisi index LangChain lama (pickle) yang belum dikonversi."""
+
+    def __init__(self, folder: str | Path):
+        super().__init__(
+            f"Index {folder} masih format lama ({LEGACY_DOCSTORE_FILE}, pickle) dan tidak dimuat saat serving; "
+            f"konversi dulu: python -m core.index_store {folder}"
+        )
+
+
+def has_store(folder: str | Path) -> bool:
+    folder = Path(folder)
+    return (folder / VECTORS_FILE).exists() and (folder / DOCSTORE_FILE).exists()
+
+
+def read_faiss_mmap(path: str | Path):
+    """
+    Buka index FAISS dengan memory map read-only (page cache dipakai bersama antar proses).
+    JANGAN menambah/menghapus vektor pada index hasil fungsi ini (FAISS akan abort).
+    """
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    return faiss.read_index(str(path), flags)
+
+
+def match_metadata(metadata: dict, filter: dict | None) -> bool:
+    """
+    Cocokkan metadata chunk dengan filter {key: value}: tidak case-sensitive;
+    kalau metadata berupa list (mis. `level`), cukup salah satu elemennya sama.
+    Value filter berupa list = salah satu dari nilai tersebut.
+    """
+    if not filter:
+        return True
+    for key, wanted in filter.items():
+        wanted_set = {str(v).strip().lower() for v in (wanted if isinstance(wanted, (list, tuple, set)) else [wanted])}
+        value = metadata.get(key)
+        values = value if isinstance(value, list) else [value]
+        if not any(v is not None and str(v).strip().lower() in wanted_set for v in values):
+            return False
+    return True
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def filter_key(filter: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in filter.items()))
+
+
+def search_faiss(index: Any, query: np.ndarray, k: int, rows: np.ndarray | None = None) -> list[tuple[int, float]]:
+    """Search index FAISS, opsional hanya di baris `rows` (pre-filter lewat IDSelector, tanpa over-fetch)."""
+    params = None
+    if rows is not None:
+        if len(rows) == 0:
+            return []
+        k = min(k, len(rows))
+        params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(np.asarray(rows, dtype=np.int64)))
+    else:
+        k = min(k, index.ntotal)
+    if k <= 0:
+        return []
+    scores, found = index.search(query.reshape(1, -1), k, params=params)
+    return [(int(r), float(d)) for r, d in zip(found[0], scores[0]) if r != -1]
+
+
+class SQLiteDocstore:
+    """Docstore read-only: baris ke-i = vektor ke-i di vectors.npy."""
+
+    def __init__(self, path: str | Path):
+        self._conn = sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def meta(self) -> dict[str, str]:
+        """Isi tabel `meta` (fingerprint export); kosong untuk store lama tanpa tabel ini."""
+        with self._lock:
+            try:
+                return dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+            except sqlite3.OperationalError:
+                return {}
+
+    def get_rows(self, rows: List[int]) -> List[Document]:
+        if not rows:
+            return []
+        placeholders = ",".join("?" * len(rows))
+        with self._lock:
+            fetched = self._conn.execute(
+                f"SELECT row, doc_id, page_content, metadata FROM chunks WHERE row IN ({placeholders})",
+                [int(r) for r in rows],
+            ).fetchall()
+        by_row = {
+            row: Document(id=doc_id, page_content=content, metadata=json.loads(metadata))
+            for row, doc_id, content, metadata in fetched
+        }
+        return [by_row[int(r)] for r in rows]
+
+    def rows_matching(self, filter: dict) -> List[int]:
+        """Baris yang metadata-nya cocok dengan `filter` (lihat match_metadata)."""
+        with self._lock:
+            fetched = self._conn.execute("SELECT row, metadata FROM chunks ORDER BY row").fetchall()
+        return [row for row, metadata in fetched if match_metadata(json.loads(metadata), filter)]
+
+    def iter_documents(self) -> Iterable[Document]:
+        with self._lock:
+            fetched = self._conn.execute(
+                "SELECT doc_id, page_content, metadata FROM chunks ORDER BY row"
+            ).fetchall()
+        for doc_id, content, metadata in fetched:
+            yield Document(id=doc_id, page_content=content, metadata=json.loads(metadata))
+
+
+def save_store(folder: str | Path, vectors: np.ndarray, documents: List[Document], ids: Optional[List[str]] = None,
+               meta: Optional[dict] = None) -> None:
+    """
+    Tulis vectors.npy + docstore.sqlite (menimpa yang lama). `meta` tambahan
+    (mis. checksum index.faiss) disimpan di tabel `meta` bersama `ids_sha256`.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if len(vectors) != len(documents):
+        raise ValueError("Jumlah vektor dan dokumen tidak sama")
+
+    # Tulis ke file sementara lalu rename, supaya reader tidak pernah melihat file setengah jadi
+    tmp_vectors = folder / (VECTORS_FILE + ".tmp")
+    with open(tmp_vectors, "wb") as f:
+        np.save(f, vectors)
+
+    tmp_db = folder / (DOCSTORE_FILE + ".tmp")
+    tmp_db.unlink(missing_ok=True)
+    conn = sqlite3.connect(str(tmp_db))
+    conn.execute(
+        "CREATE TABLE chunks (row INTEGER PRIMARY KEY, doc_id TEXT, page_content TEXT NOT NULL, metadata TEXT NOT NULL)"
+    )
+    rows = [
+        (i, (ids[i] if ids else doc.id), doc.page_content, json.dumps(doc.metadata, ensure_ascii=False, default=str))
+        for i, doc in enumerate(documents)
+    ]
+    conn.executemany("INSERT INTO chunks (row, doc_id, page_content, metadata) VALUES (?, ?, ?, ?)", rows)
+    ids_sha256 = hashlib.sha256("\x00".join(str(row[1]) for row in rows).encode("utf-8")).hexdigest()
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.executemany(
+        "INSERT INTO meta (key, value) VALUES (?, ?)",
+        [(key, str(value)) for key, value in {"rows": len(rows), "ids_sha256": ids_sha256, **(meta or {})}.items()],
+    )
+    conn.commit()
+    conn.close()
+
+    tmp_vectors.replace(folder / VECTORS_FILE)
+    tmp_db.replace(folder / DOCSTORE_FILE)
+
+
+def export_faiss(vector_store: Any, folder: str | Path) -> None:
+    """
+    Simpan FAISS (LangChain) yang sudah ada di memori ke format aman. index.faiss
+    ditulis ulang dari index yang sama dan checksum-nya dicatat, supaya saat load
+    hanya index.faiss dari export ini yang dipakai (baris ke-i = dokumen ke-i).
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    index = vector_store.index
+    vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else np.zeros((0, index.d), dtype=np.float32)
+    ids = [vector_store.index_to_docstore_id[i] for i in range(index.ntotal)]
+    documents = [vector_store.docstore.search(doc_id) for doc_id in ids]
+
+    tmp_faiss = folder / (FAISS_FILE + ".tmp")
+    faiss.write_index(index, str(tmp_faiss))
+    save_store(folder, vectors, documents, ids=ids, meta={"faiss_sha256": file_sha256(tmp_faiss)})
+    tmp_faiss.replace(folder / FAISS_FILE)
+
+
+class MmapVectorStore(VectorStore):
+    """
+    Vector store read-only di atas vectors.npy (mmap) + docstore.sqlite.
+    Pencarian exact L2 (hasil & skor sama dengan IndexFlatL2 di FAISS); kalau
+    `mmap_faiss` dan index.faiss tersedia & sinkron, search lewat FAISS yang di-mmap.
+    """
+
+    def __init__(self, folder: str | Path, embedding: Embeddings, mmap_faiss: bool = True):
+        self.folder = Path(folder)
+        self.embedding_function = embedding
+        self.vectors = np.load(self.folder / VECTORS_FILE, mmap_mode="r")
+        self.docstore = SQLiteDocstore(self.folder / DOCSTORE_FILE)
+        self._norms: Optional[np.ndarray] = None
+        # filter metadata -> baris kandidat (metadata index read-only, jadi aman di-cache)
+        self._filter_rows: dict[tuple, np.ndarray] = {}
+
+        self.index = None
+        faiss_path = self.folder / FAISS_FILE
+        if mmap_faiss and faiss_path.exists():
+            # index.faiss harus berasal dari export yang sama (baris ke-i = dokumen ke-i):
+            # jumlah baris sama saja tidak cukup (index lama dengan urutan lain)
+            expected = self.docstore.meta().get("faiss_sha256")
+            if expected and expected == file_sha256(faiss_path):
+                index = read_faiss_mmap(faiss_path)
+                if index.ntotal == len(self.vectors):
+                    self.index = index
+            else:
+                print(f"⚠️ {faiss_path} tidak cocok dengan export {self.folder.name}; search lewat numpy")
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    def _squared_l2(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if self._norms is None:
+            self._norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        if rows is None:
+            return self._norms - 2.0 * (self.vectors @ query) + float(query @ query)
+        # Hanya vektor kandidat yang disentuh (halaman mmap lain tidak dibaca)
+        return self._norms[rows] - 2.0 * (self.vectors[rows] @ query) + float(query @ query)
+
+    def rows_matching(self, filter: dict) -> np.ndarray:
+        key = filter_key(filter)
+        if key not in self._filter_rows:
+            self._filter_rows[key] = np.asarray(self.docstore.rows_matching(filter), dtype=np.int64)
+        return self._filter_rows[key]
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """`filter` (mis. {"jabatan": ..., "kompetensi": ...}) menyaring kandidat SEBELUM search."""
+        n = len(self.vectors)
+        if n == 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        rows = self.rows_matching(filter) if filter else None
+
+        if self.index is not None:
+            hits = search_faiss(self.index, query, k, rows)
+            docs = self.docstore.get_rows([r for r, _ in hits])
+            return [(doc, d) for doc, (_, d) in zip(docs, hits)]
+
+        if rows is not None and len(rows) == 0:
+            return []
+        distances = self._squared_l2(query, rows)
+        k = min(k, len(distances))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        row_ids = top if rows is None else rows[top]
+        docs = self.docstore.get_rows(row_ids.tolist())
+        return [(doc, float(distances[i])) for doc, i in zip(docs, top)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding_function.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any) -> List[str]:
+        raise NotImplementedError("MmapVectorStore read-only; bangun ulang index lalu export_faiss/save_store")
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, **kwargs: Any):
+        raise NotImplementedError("Gunakan save_store() lalu MmapVectorStore(folder, embedding)")
+
+
+class ReadOnlyFAISS(FAISS):
+    """
+    FAISS di atas index mmap: operasi tulis ditolak (FAISS akan abort kalau dipaksa).
+    `filter` dict disaring sebelum search (IDSelector), bukan fetch_k lalu buang.
+    """
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        if not isinstance(filter, dict):
+            return super().similarity_search_with_score_by_vector(embedding, k, filter=filter, **kwargs)
+        if not hasattr(self, "_filter_rows"):
+            self._filter_rows: dict[tuple, np.ndarray] = {}
+        key = filter_key(filter)
+        if key not in self._filter_rows:
+            self._filter_rows[key] = np.asarray(
+                [row for row, doc_id in self.index_to_docstore_id.items()
+                 if match_metadata(self.docstore.search(doc_id).metadata, filter)],
+                dtype=np.int64,
+            )
+        query = np.asarray(embedding, dtype=np.float32)
+        hits = search_faiss(self.index, query, k, self._filter_rows[key])
+        return [(self.docstore.search(self.index_to_docstore_id[row]), d) for row, d in hits]
+
+    def _read_only(self, *args: Any, **kwargs: Any):
+        raise NotImplementedError("Index dibuka read-only (mmap); gunakan FAISS.load_local untuk update")
+
+    add_texts = add_embeddings = delete = merge_from = _read_only
+
+
+def load_faiss_mmap(folder: str | Path, embedding: Embeddings, allow_legacy_pickle: bool = False) -> VectorStore:
+    """
+    Seperti FAISS.load_local, tapi index.faiss dibuka dengan mmap read-only.
+    Docstore dari index.pkl (pickle): hanya dengan `allow_legacy_pickle=True`
+    secara eksplisit, untuk index milik sendiri.
+    """
+    folder = Path(folder)
+    if not allow_legacy_pickle:
+        raise LegacyIndexError(folder)
+    index = read_faiss_mmap(folder / FAISS_FILE)
+    with open(folder / LEGACY_DOCSTORE_FILE, "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return ReadOnlyFAISS(embedding, index, docstore, index_to_docstore_id)
+
+
+def load_index(folder: str | Path, embedding: Embeddings, allow_legacy_pickle: bool = False,
+               mmap: bool = True) -> VectorStore:
+    """
+    Load index dari `folder` dalam format aman (MmapVectorStore), tanpa pickle.
+    Folder yang belum dikonversi -> LegacyIndexError (jalankan convert_faiss_folder
+    dulu); `allow_legacy_pickle=True` hanya untuk index milik sendiri.
+    `mmap=True`: index.faiss dibuka dengan memory map read-only supaya
+    beberapa worker di satu host berbagi page cache yang sama.
+    """
+    if has_store(folder):
+        return MmapVectorStore(folder, embedding, mmap_faiss=mmap)
+    if (Path(folder) / LEGACY_DOCSTORE_FILE).exists() and not allow_legacy_pickle:
+        raise LegacyIndexError(folder)
+    if not allow_legacy_pickle:
+        raise FileNotFoundError(f"Index format aman tidak ditemukan di {folder}")
+    if mmap:
+        return load_faiss_mmap(folder, embedding, allow_legacy_pickle=True)
+    return FAISS.load_local(str(folder), embedding, allow_dangerous_deserialization=True)
+
+
+def convert_faiss_folder(folder: str | Path) -> None:
+    """Konversi index LangChain (index.faiss + index.pkl) di `folder` ke format aman, in place."""
+    from langchain_community.embeddings import FakeEmbeddings
+
+    # Satu-satunya tempat pickle dibuka: konversi offline dari index milik sendiri
+    vector_store = FAISS.load_local(str(folder), FakeEmbeddings(size=1), allow_dangerous_deserialization=True)
+    export_faiss(vector_store, folder)
+    print(f"✅ {folder}: {vector_store.index.ntotal} vektor -> {VECTORS_FILE} + {DOCSTORE_FILE}")
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or ["data/index/skj_index", "data/index/permenpan_index"]:
+        try:
+            convert_faiss_folder(path)
+        except Exception as e:
+            print(f"❌ {path}: {e}")
@@ -0,0 +1,139 @@
+# core/journal.py
+"""
+Jurnal hasil per item (append-only JSONL) untuk run asesmen yang panjang.
+
+Setiap hasil yang sudah dibayar (panggilan LLM) langsung di-append sebagai satu
+baris `{"key", "ts", "record"}` dan di-flush ke OS; `fsync` dilakukan per batch
+(`fsync_every` baris atau `fsync_interval` detik, mana yang lebih dulu) supaya
+tidak ada fsync per panggilan. Saat proses dibuka ulang, `replay()` membaca
+jurnal (baris terakhir yang terpotong diabaikan, key yang sama -> record terakhir)
+sehingga pemanggil hanya mengirim item yang belum ada.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+
+def journal_key(*parts: Any) -> str:
+    """Key stabil dari isi item (mis. nama, jabatan, kompetensi, level, jawaban)."""
+    material = "\x1f".join(str(part if part is not None else "").strip() for part in parts)
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()[:20]
+
+
+class ResultJournal:
+    """Append-only, aman lintas thread; dipakai sebagai context manager atau `close()` manual."""
+
+    def __init__(self, path: str | Path, fsync_every: int = 16, fsync_interval: float = 1.0,
+                 default: Callable[[Any], Any] | None = None):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.default = default
+        self._lock = threading.Lock()
+        self._records: dict[str, dict] = {}
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self.replayed = 0
+        self.appended = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._records = self._read()
+        self.replayed = len(self._records)
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self._ends_torn():
+            self._file.write("\n")
+
+    # ---------- baca ----------
+
+    def _read(self) -> dict[str, dict]:
+        records: dict[str, dict] = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    records[entry["key"]] = entry["record"]
+                except (ValueError, KeyError, TypeError):
+                    continue  # write terpotong saat crash
+        return records
+
+    def _ends_torn(self) -> bool:
+        if not self.path.stat().st_size:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def replay(self) -> dict[str, dict]:
+        """Salinan key -> record yang sudah tercatat (termasuk yang di-append di proses ini)."""
+        with self._lock:
+            return dict(self._records)
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            return self._records.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._records
+
+    def missing(self, keys: Iterable[str]) -> list[str]:
+        with self._lock:
+            return [key for key in keys if key not in self._records]
+
+    # ---------- tulis ----------
+
+    def append(self, key: str, record: dict) -> None:
+        line = json.dumps({"key": key, "ts": time.time(), "record": record},
+                          ensure_ascii=False, default=self.default)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._records[key] = json.loads(line)["record"]
+            self.appended += 1
+            self._pending += 1
+            if (self._pending >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._pending and not self._file.closed:
+                self._file.flush()
+                self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            if self._pending:
+                self._sync()
+            self._file.close()
+
+    def __enter__(self) -> "ResultJournal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "records": len(self._records),
+                "replayed": self.replayed,
+                "appended": self.appended,
+                "pending_fsync": self._pending,
+            }
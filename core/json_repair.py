@@ -0,0 +1,208 @@
+# core/json_repair.py
+"""
+Ambil JSON dari output LLM dengan perbaikan bertingkat, supaya output yang
+sedikit rusak tidak membuang seluruh panggilan (generate ulang dari dokumen penuh):
+
+1. direct   : blok JSON di output langsung valid
+2. repaired : perbaikan lokal tanpa LLM (code fence, kutip tunggal/miring, koma
+              berlebih, True/None Python, newline di dalam string, kurung/string
+              yang terpotong karena max_tokens)
+3. reprompt : satu prompt pendek "perbaiki JSON ini" berisi HANYA fragmen rusak
+4. failed   : pemanggil memakai fallback lamanya
+
+Jumlah tiap tier per task dicatat di `JSON_REPAIR_STATS`.
+"""
+
+import json
+import re
+import threading
+from typing import Any
+
+_FENCE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_OPEN = {"object": "{", "array": "["}
+_CLOSE = {"{": "}", "[": "]"}
+
+TIERS = ("direct", "repaired", "reprompt", "failed")
+
+# Output rusak yang lebih panjang dari ini dipotong sebelum dikirim ulang ke LLM
+REPROMPT_MAX_CHARS = 6000
+
+REPAIR_PROMPT = """Teks berikut seharusnya berupa JSON {kind} yang valid, tetapi rusak
+(mungkin terpotong, kutip salah, atau koma berlebih). Perbaiki sintaksnya saja
+tanpa mengubah isi. HANYA output JSON, tanpa penjelasan.
+
+{fragment}
+"""
+
+
+class JsonRepairStats:
+    """Hitungan tier per task (mis. "soal", "job_mapping"), aman dipakai lintas thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: dict[str, dict[str, int]] = {}
+
+    def record(self, task: str, tier: str) -> None:
+        with self._lock:
+            per_task = self.counts.setdefault(task, dict.fromkeys(TIERS, 0))
+            per_task[tier] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for task, per_task in self.counts.items():
+                total = sum(per_task.values())
+                out[task] = {
+                    **per_task,
+                    "total": total,
+                    # Output yang tetap terpakai tanpa generate ulang dari dokumen penuh
+                    "saved": per_task["repaired"] + per_task["reprompt"],
+                }
+            return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+
+JSON_REPAIR_STATS = JsonRepairStats()
+
+
+def extract_json_block(text: str, kind: str = "object") -> str | None:
+    """Potongan dari kurung pembuka pertama sampai kurung penutup terakhir (atau akhir teks kalau terpotong)."""
+    text = _FENCE.sub("", text or "")
+    opener = _OPEN[kind]
+    start = text.find(opener)
+    if start == -1:
+        return None
+    end = text.rfind(_CLOSE[opener])
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def repair_json(fragment: str) -> str:
+    """
+    Perbaikan sintaks satu kali jalan (tanpa LLM). Tidak menebak isi: string yang
+    terpotong ditutup, kurung yang belum tertutup ditutup sesuai urutan buka.
+    """
+    text = fragment.translate(_QUOTES).strip()
+    out: list[str] = []
+    stack: list[str] = []
+    quote = None  # karakter kutip string yang sedang terbuka
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quote is not None:
+            if ch == "\\" and i + 1 < len(text):
+                out.append(text[i:i + 2])
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':  # kutip ganda di dalam string berkutip tunggal
+                out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch in "\r\t":
+                out.append("\\t" if ch == "\t" else "")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                out.append(_CLOSE[stack.pop()])
+        elif ch.isalpha():
+            j = i
+            while j < len(text) and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            k = j
+            while k < len(text) and text[k] in " \t":
+                k += 1
+            if k < len(text) and text[k] == ":":  # key tanpa kutip
+                out.append(f'"{word}"')
+            else:
+                out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if quote is not None:
+        out.append('"')
+    _drop_trailing_comma(out)
+    # Pasangan key tanpa nilai di akhir potongan ("key": ) -> null
+    if "".join(out).rstrip().endswith(":"):
+        out.append(" null")
+    while stack:
+        _drop_trailing_comma(out)
+        out.append(_CLOSE[stack.pop()])
+    return "".join(out)
+
+
+def _drop_trailing_comma(out: list[str]) -> None:
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+
+
+def _parse(text: str, kind: str, repair: bool) -> Any:
+    block = extract_json_block(text, kind)
+    if block is None:
+        return None
+    try:
+        value = json.loads(repair_json(block) if repair else block)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict if kind == "object" else list) else None
+
+
+def parse_llm_json(text: str, kind: str = "object", llm: Any = None, task: str = "default",
+                   stats: JsonRepairStats = JSON_REPAIR_STATS) -> Any:
+    """
+    JSON (`kind` = "object" / "array") dari output LLM, atau None kalau semua tier gagal.
+    Re-prompt hanya dilakukan kalau `llm` diberikan, maksimal satu kali.
+    """
+    value = _parse(text, kind, repair=False)
+    if value is not None:
+        stats.record(task, "direct")
+        return value
+
+    value = _parse(text, kind, repair=True)
+    if value is not None:
+        print(f"🩹 JSON {task} diperbaiki lokal")
+        stats.record(task, "repaired")
+        return value
+
+    if llm is not None:
+        fragment = extract_json_block(text, kind) or (text or "")
+        try:
+            response = llm.invoke(REPAIR_PROMPT.format(kind=kind, fragment=fragment[:REPROMPT_MAX_CHARS]))
+            repaired_text = getattr(response, "content", response)
+        except Exception as e:
+            print(f"❌ Re-prompt perbaikan JSON {task} gagal: {e}")
+        else:
+            value = _parse(repaired_text, kind, repair=False)
+            if value is None:
+                value = _parse(repaired_text, kind, repair=True)
+            if value is not None:
+                print(f"🩹 JSON {task} diperbaiki lewat re-prompt")
+                stats.record(task, "reprompt")
+                return value
+
+    stats.record(task, "failed")
+    return None
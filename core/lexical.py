@@ -0,0 +1,189 @@
+# core/lexical.py
+"""
+Index leksikal (BM25) di atas chunk yang sama dengan index vektor.
+
+    <folder>/bm25.json   posting list {term: [[row, tf], ...]} + panjang dokumen
+
+Baris ke-i = vektor ke-i di index.faiss / vectors.npy, jadi hasil BM25 bisa
+digabung dengan hasil FAISS. Pencarian sepenuhnya lokal (tanpa panggilan
+embedding), sehingga bisa jadi fallback saat endpoint embedding lambat/mati.
+
+Token dibuat dari output `preprocess_text` (sama dengan `_preprocess_text` saat ingest).
+"""
+
+import json
+import math
+import pickle
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from langchain_core.documents import Document
+
+from core.index_store import (
+    DOCSTORE_FILE, LEGACY_DOCSTORE_FILE, LegacyIndexError, SQLiteDocstore, filter_key, has_store, match_metadata,
+)
+from src.text_normalizer import preprocess_text
+
+BM25_FILE = "bm25.json"
+
+_TOKEN = re.compile(r"\w+")
+# Kata fungsi Bahasa Indonesia yang sering muncul di query ("... level 3 indikator perilaku")
+STOPWORDS = frozenset(
+    """
+    dan atau yang di ke dari untuk dengan pada dalam adalah ini itu akan oleh sebagai
+    tidak juga dapat serta bagi secara telah tersebut setiap para agar karena maka
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    # Angka satu digit tetap dipakai: nomor level ("level 3") penting untuk SKJ
+    return [t for t in _TOKEN.findall(preprocess_text(text)) if (len(t) > 1 or t.isdigit()) and t not in STOPWORDS]
+
+
+class BM25Index:
+    """Inverted index Okapi BM25 (k1, b standar)."""
+
+    def __init__(self, postings: dict[str, list[list[int]]], doc_lengths: list[int],
+                 k1: float = 1.5, b: float = 0.75):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        n = len(doc_lengths)
+        self.avgdl = (sum(doc_lengths) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            for term, rows in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str]) -> "BM25Index":
+        postings: dict[str, list[list[int]]] = {}
+        doc_lengths = []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append([row, tf])
+        return cls(postings, doc_lengths)
+
+    def search(self, query: str, k: int = 4, rows: set[int] | None = None) -> list[tuple[int, float]]:
+        """Top-k (row, skor BM25), skor lebih besar = lebih relevan; `rows` = hanya baris kandidat ini."""
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for row, tf in self.postings[term]:
+                if rows is not None and row not in rows:
+                    continue
+                # avgdl 0 (korpus kosong / semua stopword): semua panjang dokumen juga 0
+                length_ratio = self.doc_lengths[row] / self.avgdl if self.avgdl else 0.0
+                norm = self.k1 * (1 - self.b + self.b * length_ratio)
+                scores[row] = scores.get(row, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"doc_lengths": self.doc_lengths, "postings": self.postings}, f, ensure_ascii=False)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["postings"], data["doc_lengths"])
+
+
+def faiss_documents(vector_store: Any) -> list[Document]:
+    """Dokumen FAISS (LangChain) urut baris index."""
+    return [
+        vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+        for i in range(len(vector_store.index_to_docstore_id))
+    ]
+
+
+def save_bm25(vector_store: Any, folder: str | Path) -> None:
+    """Bangun & simpan bm25.json untuk index FAISS yang baru dibangun (dipanggil saat ingest)."""
+    BM25Index.from_texts(doc.page_content for doc in faiss_documents(vector_store)).save(Path(folder) / BM25_FILE)
+
+
+def store_lexical_index(vector_store: Any) -> "LexicalIndex":
+    """Index leksikal untuk vector store yang sudah dimuat/dibangun (MmapVectorStore atau FAISS)."""
+    if isinstance(getattr(vector_store, "docstore", None), SQLiteDocstore):
+        return load_lexical_index(vector_store.folder)
+    documents = faiss_documents(vector_store)
+    return _documents_lexical_index(documents, BM25Index.from_texts(doc.page_content for doc in documents))
+
+
+def _documents_lexical_index(documents: list[Document], bm25: BM25Index) -> "LexicalIndex":
+    return LexicalIndex(
+        bm25,
+        lambda rows: [documents[r] for r in rows],
+        lambda filter: [row for row, doc in enumerate(documents) if match_metadata(doc.metadata, filter)],
+    )
+
+
+class LexicalIndex:
+    """BM25 + akses dokumen per baris (docstore.sqlite atau docstore index.pkl)."""
+
+    def __init__(self, bm25: BM25Index, get_rows: Callable[[list[int]], list[Document]],
+                 rows_matching: Callable[[dict], list[int]]):
+        self.bm25 = bm25
+        self.get_rows = get_rows
+        self.rows_matching = rows_matching
+        self._filter_rows: dict[tuple, set[int]] = {}
+
+    def search_with_scores(self, query: str, k: int = 4, filter: dict | None = None) -> list[tuple[Document, float]]:
+        rows = None
+        if filter:
+            key = filter_key(filter)
+            if key not in self._filter_rows:
+                self._filter_rows[key] = set(self.rows_matching(filter))
+            rows = self._filter_rows[key]
+        hits = self.bm25.search(query, k, rows)
+        docs = self.get_rows([row for row, _ in hits])
+        return [(doc, score) for doc, (_, score) in zip(docs, hits)]
+
+    def search(self, query: str, k: int = 4, filter: dict | None = None) -> list[Document]:
+        return [doc for doc, _ in self.search_with_scores(query, k, filter)]
+
+
+def load_lexical_index(folder: str | Path, allow_legacy_pickle: bool = False) -> LexicalIndex:
+    """
+    Load index leksikal untuk `folder`. Tidak butuh index.faiss maupun model embedding.
+    Kalau bm25.json belum ada / tidak sinkron, BM25 dibangun di memori dari docstore.
+    Docstore index.pkl (pickle) hanya dibaca dengan `allow_legacy_pickle=True`;
+    selain itu folder yang belum dikonversi -> LegacyIndexError.
+    """
+    folder = Path(folder)
+    if has_store(folder):
+        docstore = SQLiteDocstore(folder / DOCSTORE_FILE)
+        n_docs = len(docstore)
+        texts: Callable[[], Iterable[str]] = lambda: (doc.page_content for doc in docstore.iter_documents())
+    elif (folder / LEGACY_DOCSTORE_FILE).exists():
+        if not allow_legacy_pickle:
+            raise LegacyIndexError(folder)
+        with open(folder / LEGACY_DOCSTORE_FILE, "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        documents = [docstore.search(index_to_docstore_id[i]) for i in range(len(index_to_docstore_id))]
+        n_docs = len(documents)
+        texts = lambda: (doc.page_content for doc in documents)
+    else:
+        raise FileNotFoundError(f"Docstore tidak ditemukan di {folder}")
+
+    bm25_path = folder / BM25_FILE
+    bm25 = BM25Index.load(bm25_path) if bm25_path.exists() else None
+    if bm25 is None or len(bm25) != n_docs:
+        bm25 = BM25Index.from_texts(texts())
+    if isinstance(docstore, SQLiteDocstore):
+        return LexicalIndex(bm25, docstore.get_rows, docstore.rows_matching)
+    return _documents_lexical_index(documents, bm25)
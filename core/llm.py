@@ -4,9 +4,10 @@ import os
 import json
 from dotenv import load_dotenv
 
-from langchain_openai import ChatOpenAI
-from langchain_openai import OpenAIEmbeddings
+from .clients import build_chat_model, build_openai_embeddings
 from .data import SKJ_DATA
+from .embeddings import CachedEmbeddings, EmbeddingCache
+from .llm_cache import TTLResponseCache
 from prompt.prompt import MANAGERIAL_ASSESSMENT_PROMPT
 
 # load .env kalau ada
@@ -15,20 +16,44 @@ load_dotenv()
 LLM_MODEL = os.getenv("LLM_MODEL", "mistralai/mistral-7b-instruct-v0.2")
 API_KEY = os.getenv("OPENROUTER_API_KEY")
 BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1/chat/completions")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "qwen/qwen3-embedding-8b")
 
+# Cache respons LLM: prompt yang sama persis (+ model & temperature) tidak memanggil LLM lagi
+RESPONSE_CACHE = TTLResponseCache(
+    maxsize=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL", str(24 * 3600))),
+)
 
 
-
-llm = ChatOpenAI(
-    base_url =BASE_URL,
-    api_key = API_KEY,
+# Pool HTTP/timeout/retry bersama, lihat core/clients.py
+llm = build_chat_model(
     model=LLM_MODEL,
+    api_key=API_KEY,
+    base_url=BASE_URL,
     temperature=0.7,
     max_tokens=256,
     streaming=True,
     verbose=True,
+    cache=RESPONSE_CACHE,
 )
 
+def build_embeddings(cache_path: str | None = None) -> CachedEmbeddings:
+    """
+    Embedding OpenRouter (model sama dengan index) + cache query (LRU memori + SQLite),
+    supaya query yang sama tidak di-embed ulang.
+    """
+    return CachedEmbeddings(
+        build_openai_embeddings(model=EMBEDDING_MODEL, api_key=API_KEY),
+        model_name=EMBEDDING_MODEL,
+        cache=EmbeddingCache(
+            max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "2048")),
+            disk_path=os.getenv("EMBEDDING_CACHE_PATH", cache_path),
+            max_disk_entries=int(os.getenv("EMBEDDING_CACHE_MAX_DISK", "100000")),
+            disk_ttl=float(os.getenv("EMBEDDING_CACHE_TTL")) if os.getenv("EMBEDDING_CACHE_TTL") else None,
+        ),
+    )
+
+
 def assess_answer(jabatan_name: str, kompetensi_name: str, jawaban_peserta: str, nama_peserta: str = "Peserta Demo") -> str:
     """
     Menggunakan MANAGERIAL_ASSESSMENT_PROMPT untuk menilai jawaban peserta.
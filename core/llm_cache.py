@@ -0,0 +1,76 @@
+# core/llm_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+
+class TTLResponseCache(BaseCache):
+    """
+    Cache respons LLM untuk LangChain (dipasang lewat `ChatOpenAI(cache=...)`).
+
+    Kunci = hash dari prompt yang sudah dirender penuh + `llm_string`
+    (berisi nama model, temperature, max_tokens, dst.), sehingga jawaban yang
+    sama untuk soal/kompetensi yang sama tidak memanggil LLM lagi.
+    Entri kedaluwarsa setelah `ttl_seconds` dan dibuang LRU kalau melebihi `maxsize`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float | None = 24 * 3600):
+        if maxsize <= 0:
+            raise ValueError("maxsize harus > 0")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._cache: OrderedDict[str, tuple[float, RETURN_VAL_TYPE]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at < self.ttl_seconds:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._cache[key]
+            self.misses += 1
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            self._cache[key] = (time.monotonic(), return_val)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._cache),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+            }
@@ -1,6 +1,8 @@
 # prompt.py
 from langchain.prompts import PromptTemplate
 
+from core.result_parser import json_mode_prompt
+
 # Template untuk query dasar RAG
 BASIC_RAG_PROMPT = PromptTemplate(
     template="""
@@ -251,4 +253,113 @@ HASIL ANALISIS:
 # JAWABAN YANG MEMBANTU:
 # """,
 #     input_variables=["context_permenpan", "context_skj", "question"]
-# )
\ No newline at end of file
+# )
+
+
+# ================== PROMPT ASESMEN RAG (app.py, core/assessment.py) ==================
+
+PROMPT_STRUCTURED = PromptTemplate(
+    template="""
+ANDA ADALAH ASESOR KOMPETENSI ASN BERDASARKAN:
+- PERMENPAN RB No. 38 Tahun 2017
+- STANDAR KOMPETENSI JABATAN (SKJ) UNTUK JABATAN TERKAIT
+
+KONTEKS PERMENPAN (STRUKTUR KOMPETENSI & LEVEL 1–5):
+{context_permenpan}
+
+KONTEKS SKJ (UNTUK JABATAN & KOMPETENSI INI):
+{context_skj}
+
+DATA KASUS:
+- Nama: {nama}
+- Jabatan: {jabatan}
+- Kompetensi yang Dinilai: {kompetensi}
+- Level Target Jabatan: {level_target}
+- Soal: {soal}
+- Jawaban Peserta: {jawaban}
+
+TUGAS ANDA:
+1. Baca konteks PermenPAN dan SKJ di atas.
+2. Petakan perilaku dalam jawaban peserta ke LEVEL KOMPETENSI 1–5.
+3. Bandingkan level aktual dengan level target jabatan.
+4. Berikan rekomendasi pengembangan yang spesifik.
+
+ATURAN PENILAIAN (RINGKAS):
+- Level 1: Perilaku dasar, belum konsisten.
+- Level 2: Mulai konsisten, masih butuh banyak arahan.
+- Level 3: Kompeten & cukup mandiri pada situasi umum.
+- Level 4: Menjadi rujukan/teladan di unitnya.
+- Level 5: Role model organisasi, dampak luas.
+
+FORMAT OUTPUT (WAJIB, JANGAN TAMBAH LABEL LAIN):
+LEVEL_PREDIKSI: [1-5] /n
+RINGKASAN_PERILAKU: [...]
+ALASAN: [...]
+GAP: [di bawah / sesuai / di atas level_target + alasan singkat]
+REKOMENDASI: [...]
+
+HASIL PENILAIAN:
+""",
+    input_variables=[
+        "context_permenpan",
+        "context_skj",
+        "nama",
+        "jabatan",
+        "kompetensi",
+        "level_target",
+        "soal",
+        "jawaban",
+    ],
+)
+
+PROMPT_FREE = PromptTemplate(
+    template="""
+ANDA ADALAH ASESOR KOMPETENSI ASN BERDASARKAN:
+- PERMENPAN RB No. 38 Tahun 2017
+- STANDAR KOMPETENSI JABATAN (SKJ) UNTUK JABATAN TERKAIT
+
+KONTEKS PERMENPAN (STRUKTUR KOMPETENSI & LEVEL 1–5):
+{context_permenpan}
+
+KONTEKS SKJ (UNTUK JABATAN & KOMPETENSI INI):
+{context_skj}
+
+DATA KASUS BEBAS:
+- Nama: {nama}
+- Jabatan: {jabatan}
+- Kompetensi yang Dinilai: {kompetensi}
+- Level Target Jabatan: {level_target}
+- Deskripsi Situasi/Kasus: {kasus}
+- Jawaban/Perilaku Peserta: {jawaban}
+
+TUGAS ANDA:
+1. Baca konteks resmi dan data kasus bebas di atas.
+2. Identifikasi perilaku utama peserta.
+3. Petakan perilaku peserta ke LEVEL KOMPETENSI 1–5.
+4. Bandingkan level aktual dengan level target jabatan.
+5. Berikan rekomendasi pengembangan yang spesifik dan realistis.
+
+FORMAT OUTPUT (WAJIB, JANGAN TAMBAH LABEL LAIN):
+LEVEL_PREDIKSI: [1-5]
+RINGKASAN_PERILAKU: [...]
+ALASAN: [...]
+GAP: [di bawah / sesuai / di atas level_target + alasan singkat]
+REKOMENDASI: [...]
+
+HASIL PENILAIAN:
+""",
+    input_variables=[
+        "context_permenpan",
+        "context_skj",
+        "nama",
+        "jabatan",
+        "kompetensi",
+        "level_target",
+        "kasus",
+        "jawaban",
+    ],
+)
+
+# Varian JSON-mode: label yang sama sebagai key JSON, di-parse oleh core/result_parser.py
+PROMPT_STRUCTURED_JSON = json_mode_prompt(PROMPT_STRUCTURED)
+PROMPT_FREE_JSON = json_mode_prompt(PROMPT_FREE)
@@ -0,0 +1,202 @@
+# core/rag.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from langchain_core.documents import Document
+
+# FAISS melepas GIL saat search, jadi thread cukup untuk paralel antar index
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-search")
+# Embedding query (panggilan jaringan) dipisah supaya timeout tidak menahan slot search
+_EMBED_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-embed")
+
+RETRIEVAL_MODES = ("dense", "hybrid", "lexical")
+# Konstanta Reciprocal Rank Fusion (nilai standar dari literatur RRF)
+RRF_K = 60
+
+
+def _doc_key(doc: Document) -> str:
+    return doc.id or doc.page_content
+
+
+def fuse_results(result_lists: list[list[tuple[Document, float]]], k: int,
+                 rrf_k: int = RRF_K) -> list[tuple[Document, float]]:
+    """
+    Gabungkan beberapa daftar hasil (mis. FAISS & BM25) dengan Reciprocal Rank Fusion.
+    Hanya urutan yang dipakai, jadi skala skor (jarak L2 vs skor BM25) tidak perlu disamakan.
+    Skor hasil: lebih besar = lebih relevan.
+    """
+    fused: dict[str, float] = {}
+    docs: dict[str, Document] = {}
+    for results in result_lists:
+        for rank, (doc, _) in enumerate(results):
+            key = _doc_key(doc)
+            docs.setdefault(key, doc)
+            fused[key] = fused.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [(docs[key], score) for key, score in ranked]
+
+
+class MultiIndexRetriever:
+    """
+    Retriever gabungan untuk beberapa index FAISS (mis. PermenPAN & SKJ).
+
+    Query di-embed SEKALI per model embedding, lalu vektor yang sama dipakai
+    untuk mencari di semua index (opsional paralel di thread pool).
+    Hasil dikembalikan per sumber: {nama_sumber: [Document, ...]}.
+
+    Mode (`mode`):
+    - "dense":   hanya vektor (skor = jarak L2, lebih kecil = lebih mirip)
+    - "hybrid":  vektor + BM25 digabung dengan RRF (skor lebih besar = lebih relevan)
+    - "lexical": hanya BM25, tanpa panggilan jaringan sama sekali
+    Di mode dense/hybrid, kalau embedding gagal atau lebih lama dari `embed_timeout`
+    detik, index yang punya BM25 otomatis dilayani secara leksikal.
+    """
+
+    def __init__(self, stores: dict[str, Any], k: int | dict[str, int] = 4, parallel: bool = True,
+                 lexical: dict[str, Any] | None = None, mode: str = "dense",
+                 embed_timeout: float | None = None):
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Mode retrieval tidak dikenal: {mode} (pilih {', '.join(RETRIEVAL_MODES)})")
+        self.stores = stores
+        self.lexical = {name: index for name, index in (lexical or {}).items() if index is not None}
+        names = list(stores) + [name for name in self.lexical if name not in stores]
+        self.k = {name: (k.get(name, 4) if isinstance(k, dict) else k) for name in names}
+        self.parallel = parallel
+        self.mode = mode
+        self.embed_timeout = embed_timeout
+        # Sumber yang terakhir dilayani leksikal karena embedding gagal (untuk status/log)
+        self.last_fallback: list[str] = []
+
+    @classmethod
+    def from_retrievers(cls, retrievers: dict[str, Any | None], parallel: bool = True,
+                        lexical: dict[str, Any] | None = None, mode: str = "dense",
+                        embed_timeout: float | None = None) -> "MultiIndexRetriever":
+        """Bangun dari VectorStoreRetriever (hasil `as_retriever`); retriever None dilewati."""
+        stores = {}
+        k = {}
+        for name, retriever in retrievers.items():
+            if retriever is None:
+                continue
+            stores[name] = retriever.vectorstore
+            k[name] = retriever.search_kwargs.get("k", 4)
+        for name in lexical or {}:
+            k.setdefault(name, 4)
+        return cls(stores, k=k, parallel=parallel, lexical=lexical, mode=mode, embed_timeout=embed_timeout)
+
+    def _dense_names(self) -> list[str]:
+        return [] if self.mode == "lexical" else list(self.stores)
+
+    def _embedding_groups(self) -> list[tuple[Any, list[str]]]:
+        """Kelompokkan index berdasarkan objek embedding yang dipakai."""
+        groups: dict[int, tuple[Any, list[str]]] = {}
+        for name in self._dense_names():
+            embedding = self.stores[name].embedding_function
+            groups.setdefault(id(embedding), (embedding, []))[1].append(name)
+        return list(groups.values())
+
+    def _search_one(self, name: str, vector: list[float], filter: dict | None = None) -> list[tuple[Document, float]]:
+        store = self.stores[name]
+        if filter:
+            hits = store.similarity_search_with_score_by_vector(vector, k=self.k[name], filter=filter)
+            # Tidak ada chunk yang cocok (mis. index lama tanpa metadata) -> cari di seluruh index
+            if hits:
+                return hits
+        return store.similarity_search_with_score_by_vector(vector, k=self.k[name])
+
+    def _search_lexical(self, name: str, query: str, filter: dict | None = None) -> list[tuple[Document, float]]:
+        index = self.lexical[name]
+        if filter:
+            hits = index.search_with_scores(query, k=self.k[name], filter=filter)
+            if hits:
+                return hits
+        return index.search_with_scores(query, k=self.k[name])
+
+    def _combine(self, query: str, dense: dict[str, list[tuple[Document, float]]],
+                 failed: list[str], filters: dict[str, dict]) -> dict[str, list[tuple[Document, float]]]:
+        """Gabungkan hasil dense dengan BM25 sesuai mode (+ fallback leksikal)."""
+        self.last_fallback = [name for name in failed if name in self.lexical]
+        results = {}
+        for name in self.k:
+            if name in dense:
+                if self.mode == "hybrid" and name in self.lexical:
+                    lexical = self._search_lexical(name, query, filters.get(name))
+                    results[name] = fuse_results([dense[name], lexical], self.k[name])
+                else:
+                    results[name] = dense[name]
+            elif name in self.lexical and (self.mode != "dense" or name in failed):
+                results[name] = self._search_lexical(name, query, filters.get(name))
+        return results
+
+    def _embed_query(self, embedding: Any, query: str) -> list[float]:
+        if self.embed_timeout is None:
+            return embedding.embed_query(query)
+        return _EMBED_EXECUTOR.submit(embedding.embed_query, query).result(timeout=self.embed_timeout)
+
+    def search_with_scores(self, query: str,
+                           filters: dict[str, dict] | None = None) -> dict[str, list[tuple[Document, float]]]:
+        """
+        `filters`: filter metadata per sumber, mis. {"skj": {"jabatan": ..., "kompetensi": ...}};
+        hanya chunk yang cocok yang di-scan (fallback ke seluruh index kalau tidak ada yang cocok).
+        """
+        filters = filters or {}
+        jobs = []
+        failed = []
+        for embedding, names in self._embedding_groups():
+            try:
+                vector = self._embed_query(embedding, query)
+            except Exception as e:
+                if not any(name in self.lexical for name in names):
+                    raise
+                print(f"⚠️ Embedding query gagal/lambat ({type(e).__name__}), fallback BM25: {', '.join(names)}")
+                failed.extend(names)
+                continue
+            jobs.extend((name, vector) for name in names)
+
+        if self.parallel and len(jobs) > 1:
+            futures = {
+                name: _SEARCH_EXECUTOR.submit(self._search_one, name, vector, filters.get(name))
+                for name, vector in jobs
+            }
+            dense = {name: future.result() for name, future in futures.items()}
+        else:
+            dense = {name: self._search_one(name, vector, filters.get(name)) for name, vector in jobs}
+        return self._combine(query, dense, failed, filters)
+
+    async def asearch_with_scores(self, query: str,
+                                  filters: dict[str, dict] | None = None) -> dict[str, list[tuple[Document, float]]]:
+        filters = filters or {}
+        groups = self._embedding_groups()
+        vectors = await asyncio.gather(
+            *(asyncio.wait_for(embedding.aembed_query(query), self.embed_timeout) for embedding, _ in groups),
+            return_exceptions=True,
+        )
+
+        jobs = []
+        failed = []
+        for (_, names), vector in zip(groups, vectors):
+            if isinstance(vector, BaseException):
+                if not isinstance(vector, Exception) or not any(name in self.lexical for name in names):
+                    raise vector
+                print(f"⚠️ Embedding query gagal/lambat ({type(vector).__name__}), fallback BM25: {', '.join(names)}")
+                failed.extend(names)
+                continue
+            jobs.extend((name, vector) for name in names)
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(_SEARCH_EXECUTOR, self._search_one, name, vector, filters.get(name))
+                for name, vector in jobs
+            )
+        )
+        dense = {name: result for (name, _), result in zip(jobs, results)}
+        return await loop.run_in_executor(_SEARCH_EXECUTOR, self._combine, query, dense, failed, filters)
+
+    def search(self, query: str, filters: dict[str, dict] | None = None) -> dict[str, list[Document]]:
+        return {name: [doc for doc, _ in hits] for name, hits in self.search_with_scores(query, filters).items()}
+
+    async def asearch(self, query: str, filters: dict[str, dict] | None = None) -> dict[str, list[Document]]:
+        results = await self.asearch_with_scores(query, filters)
+        return {name: [doc for doc, _ in hits] for name, hits in results.items()}
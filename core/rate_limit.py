@@ -0,0 +1,336 @@
+# core/rate_limit.py
+"""
+Rate limiter sisi klien untuk panggilan OpenRouter (chat & embedding).
+
+Dipasang sebagai transport httpx di client bersama core/clients.py, jadi semua
+ChatOpenAI / OpenAIEmbeddings (core/llm.py, src/vector_store.py, app.py,
+service, batch) melewati limiter yang sama, sync maupun async. Per jenis
+endpoint ("chat" = /chat/completions, "embeddings" = /embeddings):
+
+- token bucket request/menit dan token/menit (token = estimasi dari body
+  request: panjang teks / 4 + max_tokens); 0 = tanpa batas
+- konkurensi AIMD: batas naik +1 per "jendela" request sukses, turun separuh
+  saat 429 (paling sering sekali per detik), di antara min & max
+- 429 / 503 dengan Retry-After (detik, tanggal HTTP, retry-after-ms atau
+  X-RateLimit-Reset) menahan SEMUA request jenis itu sampai waktunya lewat,
+  termasuk retry bawaan SDK openai
+
+Konfigurasi lewat env (prefix LLM_ untuk chat, EMBED_ untuk embedding):
+    *_RPM (60 / 120), *_TPM (0), *_CONCURRENCY (4 / 8), *_MAX_CONCURRENCY (16 / 32)
+"""
+
+import asyncio
+import email.utils
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator
+
+import httpx
+
+MIN_CONCURRENCY = 1
+# Turun separuh paling sering sekali per jendela ini (429 beruntun dari burst yang sama)
+DECREASE_COOLDOWN = 1.0
+# Jeda default kalau 429 tanpa header Retry-After
+DEFAULT_RETRY_AFTER = 1.0
+# Interval cek ulang saat menunggu slot konkurensi
+POLL_INTERVAL = 0.05
+THROTTLE_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """Kapasitas = `rate_per_min` (boleh burst satu menit penuh), isi ulang linear."""
+
+    def __init__(self, rate_per_min: float):
+        self.rate_per_min = rate_per_min
+        self.tokens = float(rate_per_min)
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_min > 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.rate_per_min, self.tokens + (now - self.updated) * self.rate_per_min / 60)
+        self.updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """Detik sampai `cost` tersedia (0 = tersedia sekarang). Cost > kapasitas dipotong ke kapasitas."""
+        if not self.enabled:
+            return 0.0
+        self._refill(now)
+        cost = min(cost, self.rate_per_min)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) * 60 / self.rate_per_min
+
+    def take(self, cost: float) -> None:
+        if self.enabled:
+            self.tokens -= min(cost, self.rate_per_min)
+
+
+class RateLimiter:
+    """Satu limiter per jenis endpoint; state dijaga `threading.Lock`, dipakai thread & event loop."""
+
+    def __init__(self, name: str, rpm: float = 60, tpm: float = 0, concurrency: int = 4,
+                 max_concurrency: int = 16, min_concurrency: int = MIN_CONCURRENCY):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max(max_concurrency, min_concurrency)
+        self.limit = float(min(max(concurrency, min_concurrency), self.max_concurrency))
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        # Counter untuk stats
+        self.sent = 0
+        self.throttled = 0
+        self.waited_s = 0.0
+
+    # ---------- acquire / release ----------
+
+    def _try_acquire(self, cost: float) -> float:
+        """0 = slot & token diambil; selain itu detik yang perlu ditunggu sebelum mencoba lagi."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.in_flight >= int(self.limit):
+                return POLL_INTERVAL
+            wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(cost, now))
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.tokens.take(cost)
+            self.in_flight += 1
+            self.sent += 1
+            return 0.0
+
+    def acquire(self, cost: float = 0) -> None:
+        started = time.monotonic()
+        while (wait := self._try_acquire(cost)) > 0:
+            time.sleep(wait)
+        self._record_wait(time.monotonic() - started)
+
+    async def aacquire(self, cost: float = 0) -> None:
+        started = time.monotonic()
+        while (wait := self._try_acquire(cost)) > 0:
+            await asyncio.sleep(wait)
+        self._record_wait(time.monotonic() - started)
+
+    def _record_wait(self, waited: float) -> None:
+        if waited > 0:
+            with self._lock:
+                self.waited_s += waited
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    # ---------- umpan balik dari response ----------
+
+    def on_response(self, status_code: int, headers: httpx.Headers) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if status_code in THROTTLE_STATUSES:
+                self.throttled += 1
+                retry_after = parse_retry_after(headers)
+                self.blocked_until = max(self.blocked_until, now + (retry_after or DEFAULT_RETRY_AFTER))
+                if now - self._last_decrease >= DECREASE_COOLDOWN:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self._last_decrease = now
+            elif status_code < 400:
+                # +1 setelah kira-kira `limit` request sukses
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "rpm": self.requests.rate_per_min or None,
+                "tpm": self.tokens.rate_per_min or None,
+                "concurrency_limit": int(self.limit),
+                "concurrency_range": [self.min_concurrency, self.max_concurrency],
+                "in_flight": self.in_flight,
+                "blocked_for_s": round(max(0.0, self.blocked_until - now), 2),
+                "requests_sent": self.sent,
+                "throttled": self.throttled,
+                "waited_s": round(self.waited_s, 2),
+            }
+
+
+def parse_retry_after(headers: httpx.Headers) -> float | None:
+    """Detik tunggu dari header 429 (retry-after-ms, Retry-After detik/tanggal, X-RateLimit-Reset)."""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    value = headers.get("x-ratelimit-reset")
+    if value:
+        try:
+            reset = float(value)
+        except ValueError:
+            return None
+        # OpenRouter: epoch milidetik
+        return max(0.0, (reset / 1000 if reset > 1e11 else reset) - time.time())
+    return None
+
+
+def estimate_tokens(body: bytes) -> int:
+    """Estimasi kasar token request (prompt/input ~4 karakter per token + max_tokens)."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return len(body) // 4
+    if not isinstance(payload, dict):
+        return len(body) // 4
+    chars = tokens = 0
+    for message in payload.get("messages") or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        chars += len(content) if isinstance(content, str) else len(json.dumps(content or ""))
+    inputs = payload.get("input")
+    for item in inputs if isinstance(inputs, list) else [inputs]:
+        if isinstance(item, str):
+            chars += len(item)
+        elif isinstance(item, list):  # OpenAIEmbeddings mengirim token id hasil tiktoken
+            tokens += len(item)
+        elif isinstance(item, int):
+            tokens += 1
+    return chars // 4 + tokens + int(payload.get("max_tokens") or 0)
+
+
+def _env_number(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _limiter_from_env(name: str, prefix: str, rpm: float, concurrency: int, max_concurrency: int) -> RateLimiter:
+    return RateLimiter(
+        name,
+        rpm=_env_number(f"{prefix}_RPM", rpm),
+        tpm=_env_number(f"{prefix}_TPM", 0),
+        concurrency=int(_env_number(f"{prefix}_CONCURRENCY", concurrency)),
+        max_concurrency=int(_env_number(f"{prefix}_MAX_CONCURRENCY", max_concurrency)),
+    )
+
+
+LIMITERS = {
+    "chat": _limiter_from_env("chat", "LLM", rpm=60, concurrency=4, max_concurrency=16),
+    "embeddings": _limiter_from_env("embeddings", "EMBED", rpm=120, concurrency=8, max_concurrency=32),
+}
+
+
+def limiter_for(url: httpx.URL) -> RateLimiter | None:
+    path = url.path.rstrip("/")
+    if path.endswith("/embeddings"):
+        return LIMITERS["embeddings"]
+    if path.endswith("/completions"):
+        return LIMITERS["chat"]
+    return None
+
+
+def rate_limit_stats() -> dict:
+    return {name: limiter.stats() for name, limiter in LIMITERS.items()}
+
+
+# ---------- transport httpx ----------
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Slot konkurensi dilepas saat body response (termasuk stream SSE) selesai dibaca/ditutup."""
+
+    def __init__(self, stream: httpx.SyncByteStream, limiter: RateLimiter):
+        self._stream = stream
+        self._limiter = limiter
+        self._released = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._limiter.release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, limiter: RateLimiter):
+        self._stream = stream
+        self._limiter = limiter
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._limiter.release()
+
+
+def _wrap_response(response: httpx.Response, stream: Any) -> httpx.Response:
+    return httpx.Response(
+        response.status_code, headers=response.headers, stream=stream,
+        extensions=response.extensions,
+    )
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = limiter_for(request.url)
+        if limiter is None:
+            return self._transport.handle_request(request)
+        limiter.acquire(estimate_tokens(request.read()))
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.on_response(response.status_code, response.headers)
+        return _wrap_response(response, _ReleasingStream(response.stream, limiter))
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = limiter_for(request.url)
+        if limiter is None:
+            return await self._transport.handle_async_request(request)
+        await limiter.aacquire(estimate_tokens(await request.aread()))
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.on_response(response.status_code, response.headers)
+        return _wrap_response(response, _AsyncReleasingStream(response.stream, limiter))
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,205 @@
+# core/result_parser.py
+"""
+Parser output LLM asesmen -> objek hasil bertipe (`AssessmentResult`).
+
+Mendukung:
+- format label app.py:      LEVEL_PREDIKSI / RINGKASAN_PERILAKU / ALASAN / GAP / REKOMENDASI
+- format assessment_engine: #### SKOR / #### LEVEL PENCAPAIAN / #### REKOMENDASI PENGEMBANGAN ...
+- output JSON (prompt varian JSON-mode, lihat `json_mode_prompt`)
+- artefak "/n" literal, header markdown (###), bold (**LABEL:**) dan bullet di depan label
+
+Parse sekali saat hasil dibuat; agregasi (rata-rata skor, distribusi level) cukup
+membaca atribut objek, tidak mem-parse ulang string.
+"""
+
+import json
+import re
+from typing import Any, Iterable
+
+from langchain.prompts import PromptTemplate
+
+# Label -> nama field. Alias dari kedua format prompt.
+_LABEL_FIELDS = {
+    "LEVEL PREDIKSI": "level",
+    "LEVEL PENCAPAIAN": "level",
+    "SKOR": "skor",
+    "GAP": "gap",
+    "REKOMENDASI": "rekomendasi",
+    "REKOMENDASI PENGEMBANGAN": "rekomendasi",
+    "RINGKASAN PERILAKU": "ringkasan",
+    "ALASAN": "alasan",
+    "ANALISIS INDIKATOR": "analisis",
+    "KEKUATAN": "kekuatan",
+    "AREA PERBAIKAN": "area_perbaikan",
+}
+_LABEL = re.compile(
+    r"^[ \t>*#-]*\**[ \t]*("
+    + "|".join(sorted((label.replace(" ", "[ _]") for label in _LABEL_FIELDS), key=len, reverse=True))
+    + r")[ \t]*\**[ \t]*:[ \t]*\**[ \t]*",
+    re.IGNORECASE | re.MULTILINE,
+)
+_NEWLINE_ARTIFACT = re.compile(r"[ \t]*(?:/n|\\n)[ \t]*")
+_FIRST_INT = re.compile(r"\d+")
+_JSON_BLOCK = re.compile(r"\{.*\}", re.DOTALL)
+
+_INT_FIELDS = ("level", "skor")
+_TEXT_FIELDS = ("gap", "rekomendasi", "ringkasan", "alasan", "analisis", "kekuatan", "area_perbaikan")
+
+
+class AssessmentResult:
+    """Hasil asesmen satu jawaban. `parsed` False kalau tidak ada label yang dikenali."""
+
+    __slots__ = ("level", "skor", "gap", "rekomendasi", "ringkasan", "alasan",
+                 "analisis", "kekuatan", "area_perbaikan", "raw", "parsed")
+
+    def __init__(self, level: int | None = None, skor: int | None = None, gap: str | None = None,
+                 rekomendasi: str | None = None, ringkasan: str | None = None, alasan: str | None = None,
+                 analisis: str | None = None, kekuatan: str | None = None, area_perbaikan: str | None = None,
+                 raw: str = "", parsed: bool = False):
+        self.level = level
+        self.skor = skor
+        self.gap = gap
+        self.rekomendasi = rekomendasi
+        self.ringkasan = ringkasan
+        self.alasan = alasan
+        self.analisis = analisis
+        self.kekuatan = kekuatan
+        self.area_perbaikan = area_perbaikan
+        self.raw = raw
+        self.parsed = parsed
+
+    def gap_levels(self, level_target: int | str) -> int | None:
+        """Selisih level prediksi terhadap level target (negatif = di bawah target)."""
+        try:
+            return self.level - int(level_target) if self.level is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def to_dict(self, include_raw: bool = False) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__ if name != "raw"}
+        if include_raw:
+            data["raw"] = self.raw
+        return data
+
+    def __repr__(self) -> str:
+        return f"AssessmentResult(level={self.level}, skor={self.skor}, parsed={self.parsed})"
+
+
+def _to_int(value: Any) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    match = _FIRST_INT.search(str(value)) if value is not None else None
+    return int(match.group()) if match else None
+
+
+def _to_text(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return "\n".join(f"- {item}" for item in value) or None
+    return str(value).strip() or None
+
+
+def _from_json(text: str) -> AssessmentResult | None:
+    match = _JSON_BLOCK.search(text)
+    if match is None:
+        return None
+    try:
+        data = json.loads(match.group())
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    fields = {}
+    for key, value in data.items():
+        field = _LABEL_FIELDS.get(key.upper().replace("_", " "))
+        if field is not None and fields.get(field) is None:
+            fields[field] = value
+    if not fields:
+        return None
+    result = AssessmentResult(raw=text, parsed=True)
+    for field in _INT_FIELDS:
+        setattr(result, field, _to_int(fields.get(field)))
+    for field in _TEXT_FIELDS:
+        setattr(result, field, _to_text(fields.get(field)))
+    return result
+
+
+def parse_assessment(text: str | None) -> AssessmentResult:
+    """Parse output LLM (teks berlabel atau JSON) menjadi AssessmentResult."""
+    raw = text or ""
+    stripped = raw.strip()
+    if stripped.startswith(("{", "```")):
+        result = _from_json(stripped)
+        if result is not None:
+            return result
+
+    cleaned = _NEWLINE_ARTIFACT.sub("\n", raw)
+    matches = list(_LABEL.finditer(cleaned))
+    result = AssessmentResult(raw=raw, parsed=bool(matches))
+    for i, match in enumerate(matches):
+        field = _LABEL_FIELDS[match.group(1).upper().replace("_", " ")]
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(cleaned)
+        value = cleaned[match.end():end].strip().strip("*").strip()
+        # Label pertama menang (mis. SKOR di ringkasan & di detail)
+        if getattr(result, field) is not None:
+            continue
+        if field in _INT_FIELDS:
+            setattr(result, field, _to_int(value))
+        else:
+            setattr(result, field, value or None)
+    return result
+
+
+def summarize_results(results: Iterable[AssessmentResult]) -> dict:
+    """Agregat dari atribut hasil yang sudah di-parse (tanpa parse string ulang)."""
+    count = parsed = 0
+    skor_total = skor_count = 0
+    level_total = level_count = 0
+    levels: dict[int, int] = {}
+    for result in results:
+        count += 1
+        if not result.parsed:
+            continue
+        parsed += 1
+        if result.skor is not None:
+            skor_total += result.skor
+            skor_count += 1
+        if result.level is not None:
+            level_total += result.level
+            level_count += 1
+            levels[result.level] = levels.get(result.level, 0) + 1
+    return {
+        "total": count,
+        "parsed": parsed,
+        "rata_rata_skor": round(skor_total / skor_count, 2) if skor_count else None,
+        "rata_rata_level": round(level_total / level_count, 2) if level_count else None,
+        "distribusi_level": dict(sorted(levels.items())),
+    }
+
+
+# ===== Varian prompt JSON-mode =====
+
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Blok "FORMAT OUTPUT ..." sampai baris kosong berikutnya
+_FORMAT_SECTION = re.compile(r"FORMAT OUTPUT.*?(?=\n[ \t]*\n|\Z)", re.DOTALL)
+
+# Escape {{ }}: dipakai sebagai bagian template PromptTemplate
+JSON_OUTPUT_FORMAT = """FORMAT OUTPUT (WAJIB): HANYA satu objek JSON valid, tanpa teks lain:
+{{"level_prediksi": <angka 1-5>, "ringkasan_perilaku": "...", "alasan": "...", "gap": "di bawah / sesuai / di atas level_target + alasan singkat", "rekomendasi": "..."}}"""
+
+
+def json_mode_prompt(prompt: PromptTemplate, output_format: str = JSON_OUTPUT_FORMAT) -> PromptTemplate:
+    """
+    Salinan prompt berformat label dengan blok FORMAT OUTPUT diganti instruksi JSON.
+    Pasangkan dengan `llm.bind(response_format=JSON_RESPONSE_FORMAT)` supaya model
+    (OpenAI-compatible) dipaksa mengeluarkan JSON valid dan tidak perlu tanya ulang.
+    """
+    template, replaced = _FORMAT_SECTION.subn(lambda _: output_format, prompt.template, count=1)
+    if not replaced:
+        template = prompt.template.rstrip() + "\n\n" + output_format + "\n"
+    return PromptTemplate(template=template, input_variables=list(prompt.input_variables))
@@ -0,0 +1,395 @@
+# core/service.py
+"""
+HTTP service asesmen (headless) di atas AssessmentCore: satu proses hangat yang
+memegang index, BM25, context pack dan pool koneksi LLM, dipakai bersama oleh UI
+dan job batch. Hanya asyncio stdlib (HTTP/1.1 + keep-alive, body JSON).
+
+    python -m core.service --host 127.0.0.1 --port 8080 --workers 4 --queue-size 64
+
+Endpoint:
+    POST /assess/structured  {"jabatan", "kompetensi", "id_soal", "jawaban", "nama"?, "include_context"?}
+    POST /assess/free        {"jabatan", "kompetensi", "kasus", "jawaban", "nama"?, "include_context"?}
+    GET  /metrics            antrean, worker, latensi, metrik LLM/cache/HTTP, rate limit
+    GET  /health
+
+Request masuk ke antrean terbatas yang dikerjakan `workers` worker. Antrean penuh
+-> 429 + Retry-After (backpressure), bukan menumpuk request di memori.
+
+`ServiceClient` memberi API `aassess_*` yang sama dengan AssessmentCore di atas
+HTTP, jadi job batch bisa memakai service yang sudah hangat
+(`python -m core.batch ... --service-url http://127.0.0.1:8080` atau env
+ASSESSMENT_SERVICE_URL) alih-alih memuat index sendiri.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Any
+
+import httpx
+
+from core.assessment import AssessmentCore, get_komp_info, load_assessment_core
+from core.clients import CONNECT_TIMEOUT, aclose_async_http_client, get_async_http_client
+from core.result_parser import AssessmentResult
+from core.streaming import GENERATION_METRICS, percentile
+
+MAX_BODY_BYTES = 256 * 1024
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+    503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+# mode -> (field wajib, method AssessmentCore, field payload -> argumen)
+MODES = {
+    "structured": (("jabatan", "kompetensi", "id_soal", "jawaban"), "aassess_structured", "id_soal"),
+    "free": (("jabatan", "kompetensi", "kasus", "jawaban"), "aassess_free", "kasus"),
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, headers: dict[str, str] | None = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class ServiceMetrics:
+    """Counter & latensi (queue wait, processing) untuk /metrics; hanya diakses dari event loop."""
+
+    def __init__(self, window: int = 1000):
+        self.started = time.time()
+        self.accepted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed: dict[int, int] = {}
+        self.busy_workers = 0
+        self.queue_wait: deque[float] = deque(maxlen=window)
+        self.processing: deque[float] = deque(maxlen=window)
+
+    def stats(self) -> dict:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "accepted": self.accepted,
+            "rejected_429": self.rejected,
+            "completed": self.completed,
+            "failed": {str(status): n for status, n in sorted(self.failed.items())},
+            "queue_wait_p50_s": percentile(list(self.queue_wait), 0.5),
+            "queue_wait_p95_s": percentile(list(self.queue_wait), 0.95),
+            "processing_p50_s": percentile(list(self.processing), 0.5),
+            "processing_p95_s": percentile(list(self.processing), 0.95),
+        }
+
+
+class AssessmentService:
+    """Antrean terbatas + worker pool di depan `AssessmentCore` (API async-nya)."""
+
+    def __init__(self, core: AssessmentCore, workers: int = 4, queue_size: int = 64,
+                 job_timeout: float | None = 120.0):
+        if workers <= 0 or queue_size <= 0:
+            raise ValueError("workers dan queue_size harus > 0")
+        self.core = core
+        self.workers = workers
+        self.queue_size = queue_size
+        self.job_timeout = job_timeout
+        self.metrics = ServiceMetrics()
+        self.queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._server: asyncio.Server | None = None
+
+    # ---------- antrean & worker ----------
+
+    async def start_workers(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await aclose_async_http_client()
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            mode, payload, future, enqueued_at = await self.queue.get()
+            started = time.perf_counter()
+            self.metrics.queue_wait.append(started - enqueued_at)
+            self.metrics.busy_workers += 1
+            try:
+                if not future.cancelled():
+                    result = await asyncio.wait_for(self._run(mode, payload), self.job_timeout)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self.metrics.busy_workers -= 1
+                self.metrics.processing.append(time.perf_counter() - started)
+                self.queue.task_done()
+
+    async def _run(self, mode: str, payload: dict) -> dict:
+        _, method, variant_field = MODES[mode]
+        hasil, context_permenpan, context_skj = await getattr(self.core, method)(
+            payload["jabatan"],
+            payload["kompetensi"],
+            payload[variant_field],
+            payload["jawaban"],
+            payload.get("nama") or "Peserta",
+        )
+        out = {
+            "mode": mode,
+            "jabatan": payload["jabatan"],
+            "kompetensi": payload["kompetensi"],
+            "hasil": hasil.to_dict(include_raw=True),
+        }
+        if payload.get("include_context"):
+            out["context_permenpan"] = context_permenpan
+            out["context_skj"] = context_skj
+        return out
+
+    def _retry_after(self) -> int:
+        """Perkiraan detik sampai antrean berkurang (dari latensi processing median)."""
+        p50 = percentile(list(self.metrics.processing), 0.5) or 1.0
+        return max(1, math.ceil(p50 * self.queue.qsize() / self.workers))
+
+    async def submit(self, mode: str, payload: Any) -> dict:
+        """Validasi, masukkan ke antrean (429 kalau penuh), tunggu hasil worker."""
+        if mode not in MODES:
+            raise HttpError(404, f"Mode tidak dikenal: {mode}")
+        if not isinstance(payload, dict):
+            raise HttpError(400, "Body harus objek JSON")
+        missing = [field for field in MODES[mode][0] if not str(payload.get(field) or "").strip()]
+        if missing:
+            raise HttpError(400, f"Field wajib kosong: {', '.join(missing)}")
+        try:
+            get_komp_info(payload["jabatan"], payload["kompetensi"])
+        except ValueError as e:
+            raise HttpError(400, str(e))
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((mode, payload, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            raise HttpError(429, "Antrean penuh, coba lagi nanti",
+                            {"Retry-After": str(self._retry_after())})
+        self.metrics.accepted += 1
+
+        try:
+            result = await future
+        except asyncio.TimeoutError:
+            raise HttpError(504, f"Asesmen melebihi {self.job_timeout} detik")
+        except ValueError as e:  # validasi soal/kompetensi di AssessmentCore
+            raise HttpError(400, str(e))
+        except Exception as e:
+            raise HttpError(500, f"{type(e).__name__}: {e}")
+        self.metrics.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        from core.clients import http_client_stats
+        from core.json_repair import JSON_REPAIR_STATS
+        from core.llm import RESPONSE_CACHE
+        from core.rate_limit import rate_limit_stats
+
+        return {
+            "queue": {"depth": self.queue.qsize() if self.queue else 0, "capacity": self.queue_size},
+            "workers": {"total": self.workers, "busy": self.metrics.busy_workers},
+            "requests": self.metrics.stats(),
+            "llm": GENERATION_METRICS.stats(),
+            "llm_cache": RESPONSE_CACHE.stats(),
+            "json_repair": JSON_REPAIR_STATS.stats(),
+            "http": http_client_stats(),
+            "rate_limits": rate_limit_stats(),
+            "indexes": {
+                "permenpan": self.core.permenpan_retriever is not None,
+                "skj": self.core.skj_retriever is not None,
+            },
+            "context_packs": self.core.context_packs.stats() if self.core.context_packs else None,
+        }
+
+    # ---------- HTTP ----------
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        await self.start_workers()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"🚀 Assessment service di http://{host}:{port} "
+              f"({self.workers} worker, antrean {self.queue_size})")
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, Any, dict]:
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/health":
+            return 200, {"status": "ok"}, {}
+        if path == "/metrics":
+            return 200, self.stats(), {}
+        if path.startswith("/assess/"):
+            if method != "POST":
+                raise HttpError(405, "Gunakan POST")
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise HttpError(400, "Body bukan JSON valid")
+            return 200, await self.submit(path[len("/assess/"):], payload), {}
+        raise HttpError(404, f"Endpoint tidak ada: {path}")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload, extra = await self._route(method, path, body)
+                except HttpError as e:
+                    self.metrics.failed[e.status] = self.metrics.failed.get(e.status, 0) + 1
+                    status, payload, extra = e.status, {"error": str(e)}, e.headers
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await _write_response(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except HttpError as e:  # request rusak / terlalu besar
+            await _write_response(writer, e.status, {"error": str(e)}, e.headers, keep_alive=False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict, bytes] | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Request line tidak valid")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "Content-Length tidak valid")
+    if length < 0:
+        raise HttpError(400, "Content-Length tidak valid")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, f"Body maksimal {MAX_BODY_BYTES} byte")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, payload: Any,
+                          headers: dict[str, str], keep_alive: bool) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    lines = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        *(f"{name}: {value}" for name, value in headers.items()),
+    ]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+class ServiceClient:
+    """
+    Pengganti AssessmentCore untuk job batch: `aassess_structured` /
+    `aassess_free` dikirim ke AssessmentService lewat pool httpx bersama.
+    429 dicoba ulang setelah Retry-After; 400 menjadi ValueError seperti di
+    AssessmentCore. Konteks tidak diminta, jadi dua elemen terakhir tuple kosong.
+    """
+
+    def __init__(self, base_url: str, max_retries: int = 5):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+
+    async def aassess_structured(self, jabatan_name: str, kompetensi_name: str, soal_id: str,
+                                 jawaban_peserta: str, nama_peserta: str) -> tuple[AssessmentResult, str, str]:
+        return await self._assess("structured", {
+            "jabatan": jabatan_name, "kompetensi": kompetensi_name, "id_soal": soal_id,
+            "jawaban": jawaban_peserta, "nama": nama_peserta,
+        })
+
+    async def aassess_free(self, jabatan_name: str, kompetensi_name: str, kasus_text: str,
+                           jawaban_peserta: str, nama_peserta: str) -> tuple[AssessmentResult, str, str]:
+        return await self._assess("free", {
+            "jabatan": jabatan_name, "kompetensi": kompetensi_name, "kasus": kasus_text,
+            "jawaban": jawaban_peserta, "nama": nama_peserta,
+        })
+
+    async def _assess(self, mode: str, payload: dict) -> tuple[AssessmentResult, str, str]:
+        client = get_async_http_client()
+        url = f"{self.base_url}/assess/{mode}"
+        for attempt in range(self.max_retries + 1):
+            # Batas waktu per asesmen diatur pemanggil (row_timeout) dan job_timeout service
+            response = await client.post(url, json=payload, timeout=httpx.Timeout(None, connect=CONNECT_TIMEOUT))
+            if response.status_code == 429 and attempt < self.max_retries:
+                await asyncio.sleep(_retry_after_seconds(response.headers.get("retry-after")))
+                continue
+            break
+        try:
+            data = response.json()
+        except ValueError:
+            data = {"error": response.text}
+        if response.status_code == 400:
+            raise ValueError(data.get("error") or "Request ditolak service")
+        if response.status_code != 200:
+            raise RuntimeError(f"Service {response.status_code}: {data.get('error')}")
+        return AssessmentResult(**data["hasil"]), "", ""
+
+
+def _retry_after_seconds(value: str | None) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _main() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Headless assessment HTTP service")
+    parser.add_argument("--host", default=os.getenv("SERVICE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVICE_PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVICE_WORKERS", "4")))
+    parser.add_argument("--queue-size", type=int, default=int(os.getenv("SERVICE_QUEUE_SIZE", "64")))
+    parser.add_argument("--job-timeout", type=float, default=float(os.getenv("SERVICE_JOB_TIMEOUT", "120")))
+    args = parser.parse_args()
+
+    service = AssessmentService(
+        load_assessment_core(), workers=args.workers, queue_size=args.queue_size,
+        job_timeout=args.job_timeout or None,
+    )
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("👋 Service dihentikan")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,229 @@
+# core/streaming.py
+"""
+Streaming output LLM + metrik waktu per request.
+
+- `stream_text` / `astream_text`: generator (sync / async) potongan teks dari
+  `chain.stream` / `chain.astream`, bisa langsung dipakai `st.write_stream`
+- setiap request dicatat di `GENERATION_METRICS`: time-to-first-token (TTFT)
+  dan total waktu generasi; untuk panggilan non-streaming (`invoke`) TTFT = total
+
+`stream()` LangChain tidak melewati cache respons LLM, jadi `stream_text` /
+`astream_text` sendiri yang mencari cache model (kunci sama dengan `invoke`:
+prompt yang dirender + `llm_string`): hit -> teks tersimpan diputar ulang sebagai
+satu potongan tanpa memanggil model; miss -> teks lengkap disimpan ke cache
+setelah stream selesai tanpa error.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.runnables import RunnableBinding
+
+
+class GenerationStats:
+    """Waktu satu request generasi (detik, time.perf_counter)."""
+
+    __slots__ = ("label", "started", "first_token_at", "finished", "chunks", "chars", "streamed", "error")
+
+    def __init__(self, label: str = "", streamed: bool = True):
+        self.label = label
+        self.started = time.perf_counter()
+        self.first_token_at: float | None = None
+        self.finished: float | None = None
+        self.chunks = 0
+        self.chars = 0
+        self.streamed = streamed
+        self.error: str | None = None
+
+    def on_chunk(self, text: str) -> None:
+        if self.first_token_at is None and text:
+            self.first_token_at = time.perf_counter()
+        self.chunks += 1
+        self.chars += len(text)
+
+    @property
+    def ttft(self) -> float | None:
+        if not self.streamed:
+            return self.total
+        return self.first_token_at - self.started if self.first_token_at is not None else None
+
+    @property
+    def total(self) -> float | None:
+        return self.finished - self.started if self.finished is not None else None
+
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "streamed": self.streamed,
+            "ttft_s": round(self.ttft, 3) if self.ttft is not None else None,
+            "total_s": round(self.total, 3) if self.total is not None else None,
+            "chunks": self.chunks,
+            "chars": self.chars,
+            "error": self.error,
+        }
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+class GenerationMetrics:
+    """Riwayat `maxlen` request terakhir + ringkasan p50/p95, aman lintas thread."""
+
+    def __init__(self, maxlen: int = 500):
+        self._lock = threading.Lock()
+        self.records: deque[GenerationStats] = deque(maxlen=maxlen)
+
+    def start(self, label: str = "", streamed: bool = True) -> GenerationStats:
+        return GenerationStats(label, streamed)
+
+    def finish(self, stats: GenerationStats, error: BaseException | None = None) -> GenerationStats:
+        stats.finished = time.perf_counter()
+        if error is not None:
+            stats.error = f"{type(error).__name__}: {error}"
+        with self._lock:
+            self.records.append(stats)
+        return stats
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = [r for r in self.records if r.error is None]
+            errors = len(self.records) - len(done)
+        ttft = [r.ttft for r in done if r.ttft is not None]
+        total = [r.total for r in done if r.total is not None]
+        return {
+            "requests": len(done),
+            "errors": errors,
+            "ttft_p50_s": percentile(ttft, 0.5),
+            "ttft_p95_s": percentile(ttft, 0.95),
+            "total_p50_s": percentile(total, 0.5),
+            "total_p95_s": percentile(total, 0.95),
+        }
+
+
+GENERATION_METRICS = GenerationMetrics()
+
+
+def _chunk_text(chunk: Any) -> str:
+    """AIMessageChunk (chat model) atau str (LLM / StrOutputParser)."""
+    content = getattr(chunk, "content", chunk)
+    return content if isinstance(content, str) else ""
+
+
+def response_cache_entry(chain: Any, inputs: dict) -> tuple[BaseCache, str, str] | None:
+    """
+    (cache, prompt, llm_string) untuk chain `prompt | chat_model` (model boleh
+    di-`bind`), dengan kunci yang sama seperti `_generate_with_cache` LangChain,
+    atau None kalau chain lain / model tanpa cache sendiri.
+    """
+    steps = getattr(chain, "steps", None)
+    if not steps or len(steps) != 2:
+        return None
+    prompt_template, model = steps
+    kwargs: dict = {}
+    if isinstance(model, RunnableBinding):
+        kwargs, model = dict(model.kwargs), model.bound
+    cache = getattr(model, "cache", None)
+    if not isinstance(cache, BaseCache) or not hasattr(model, "_get_llm_string"):
+        return None
+    messages = prompt_template.invoke(inputs).to_messages()
+    return cache, dumps(messages), model._get_llm_string(stop=None, **kwargs)
+
+
+def _cached_text(value: Any) -> str | None:
+    if isinstance(value, list) and value:
+        return value[0].text
+    return None
+
+
+def _cache_value(text: str) -> list[ChatGeneration]:
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+def stream_text(chain: Any, inputs: dict, stats: GenerationStats | None = None,
+                metrics: GenerationMetrics = GENERATION_METRICS) -> Iterator[str]:
+    """`stats` dari `metrics.start(...)` kalau pemanggil perlu membaca TTFT request ini."""
+    stats = stats or metrics.start()
+    parts: list[str] = []
+    try:
+        entry = response_cache_entry(chain, inputs)
+        cached = _cached_text(entry[0].lookup(entry[1], entry[2])) if entry else None
+        if cached is not None:
+            stats.on_chunk(cached)
+            if cached:
+                yield cached
+        else:
+            for chunk in chain.stream(inputs):
+                text = _chunk_text(chunk)
+                stats.on_chunk(text)
+                if text:
+                    parts.append(text)
+                    yield text
+            if entry is not None:
+                entry[0].update(entry[1], entry[2], _cache_value("".join(parts)))
+    except BaseException as e:
+        metrics.finish(stats, e)
+        raise
+    metrics.finish(stats)
+
+
+async def astream_text(chain: Any, inputs: dict, stats: GenerationStats | None = None,
+                       metrics: GenerationMetrics = GENERATION_METRICS) -> AsyncIterator[str]:
+    stats = stats or metrics.start()
+    parts: list[str] = []
+    try:
+        entry = response_cache_entry(chain, inputs)
+        cached = _cached_text(await entry[0].alookup(entry[1], entry[2])) if entry else None
+        if cached is not None:
+            stats.on_chunk(cached)
+            if cached:
+                yield cached
+        else:
+            async for chunk in chain.astream(inputs):
+                text = _chunk_text(chunk)
+                stats.on_chunk(text)
+                if text:
+                    parts.append(text)
+                    yield text
+            if entry is not None:
+                await entry[0].aupdate(entry[1], entry[2], _cache_value("".join(parts)))
+    except BaseException as e:
+        metrics.finish(stats, e)
+        raise
+    metrics.finish(stats)
+
+
+def invoke_text(chain: Any, inputs: dict, stats: GenerationStats | None = None,
+                metrics: GenerationMetrics = GENERATION_METRICS) -> str:
+    """`chain.invoke` (lewat cache respons) dengan total waktu tercatat."""
+    stats = stats or metrics.start(streamed=False)
+    try:
+        text = _chunk_text(chain.invoke(inputs))
+    except BaseException as e:
+        metrics.finish(stats, e)
+        raise
+    stats.on_chunk(text)
+    metrics.finish(stats)
+    return text
+
+
+async def ainvoke_text(chain: Any, inputs: dict, stats: GenerationStats | None = None,
+                       metrics: GenerationMetrics = GENERATION_METRICS) -> str:
+    stats = stats or metrics.start(streamed=False)
+    try:
+        text = _chunk_text(await chain.ainvoke(inputs))
+    except BaseException as e:
+        metrics.finish(stats, e)
+        raise
+    stats.on_chunk(text)
+    metrics.finish(stats)
+    return text
@@ -1,6 +1,5 @@
 # soal_generator.py
 import json
-import re
 from pathlib import Path
 from langchain.chains import LLMChain
 import sys
@@ -9,6 +8,7 @@ import os
 # Add current directory to path to import prompt
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from prompt.prompt import CREATE_SOAL_SKJ_PROMPT
+from core.json_repair import parse_llm_json
 
 class SoalGenerator:
     def __init__(self, llm):
@@ -30,18 +30,12 @@ class SoalGenerator:
             return []
     
     def parse_soal_output(self, text):
-        """Parse soal JSON output from LLM"""
-        try:
-            # Extract JSON array from text
-            json_match = re.search(r'\[.*\]', text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                return json.loads(json_str)
-            else:
-                raise ValueError("No JSON array found in LLM output")
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}")
+        """Parse soal JSON output from LLM (local repair, then one short fix-up re-prompt)"""
+        soal_data = parse_llm_json(text, kind="array", llm=self.llm, task="soal")
+        if soal_data is None:
+            print("JSON parsing error: no valid JSON array in LLM output")
             return []
+        return soal_data
     
     def save_soal(self, soal_data, filename):
         """Save generated questions to file"""
@@ -1,9 +1,8 @@
 # src/assessment_engine.py
 import json
 import os
-import re
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional
 
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
@@ -11,6 +10,83 @@ from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from core.context import ContextAssembler
+from core.journal import ResultJournal, journal_key
+from core.json_repair import JSON_REPAIR_STATS, parse_llm_json
+from core.lexical import store_lexical_index
+from core.rag import MultiIndexRetriever
+from core.result_parser import (
+    AssessmentResult, JSON_RESPONSE_FORMAT, json_mode_prompt, parse_assessment, summarize_results,
+)
+from src.chunk_metadata import tag_chunk
+from src.embedding_pipeline import EmbeddingPipeline
+from src.data_loader import iter_chunks
+from src.index_builder import build_index, incremental_index, save_index, stream_index
+from src.text_normalizer import preprocess_text
+
+
+ASSESSMENT_PROMPT = PromptTemplate(
+    input_variables=["context", "nama", "jabatan", "jawaban", "kompetensi", "level_target", "indicators"],
+    template="""
+            STANDAR PENILAIAN KOMPETENSI:
+            {context}
+
+            INDIKATOR PERILAKU LEVEL {level_target}:
+            {indicators}
+
+            DATA PENILAIAN:
+            - Nama: {nama}
+            - Jabatan: {jabatan}
+            - Kompetensi: {kompetensi} 
+            - Level Target: {level_target}
+            - Jawaban Peserta: {jawaban}
+
+            TUGAS PENILAIAN:
+            1. Beri skor 1-5 berdasarkan kesesuaian dengan indikator di atas
+            2. Analisis DETAIL kesesuaian dengan setiap indikator
+            3. Identifikasi kekuatan spesifik dalam jawaban
+            4. Berikan rekomendasi pengembangan yang actionable
+            5. Tentukan level pencapaian (1-4) berdasarkan skor
+
+            KRITERIA SKOR:
+            - 5: Sangat Baik (melebihi ekspektasi level)
+            - 4: Baik (memenuhi semua indikator level)  
+            - 3: Cukup (memenuhi sebagian besar indikator)
+            - 2: Perlu Perbaikan (hanya memenuhi beberapa indikator)
+            - 1: Tidak Memadai (tidak memenuhi indikator)
+
+            FORMAT OUTPUT:
+            ### HASIL PENILAIAN
+            #### SKOR: [1-5]
+            #### LEVEL PENCAPAIAN: [1-4]
+            #### ANALISIS INDIKATOR:
+            - [Indikator 1]: [Analisis kesesuaian dan evidence dari jawaban]
+            - [Indikator 2]: [Analisis kesesuaian dan evidence dari jawaban]
+            - [Indikator 3]: [Analisis kesesuaian dan evidence dari jawaban]
+            #### KEKUATAN:
+            - [Kekuatan 1 dengan contoh dari jawaban]
+            - [Kekuatan 2 dengan contoh dari jawaban]
+            #### AREA PERBAIKAN:
+            - [Area 1 yang perlu dikembangkan]
+            - [Area 2 yang perlu dikembangkan]
+            #### REKOMENDASI PENGEMBANGAN:
+            - [Rekomendasi 1 yang spesifik dan actionable]
+            - [Rekomendasi 2 yang spesifik dan actionable]
+
+            Gunakan Bahasa Indonesia profesional dan objektif.
+            """
+)
+
+# JSON-mode variant of ASSESSMENT_PROMPT (keys = the markdown labels above)
+ASSESSMENT_JSON_FORMAT = """FORMAT OUTPUT (WAJIB): HANYA satu objek JSON valid, tanpa teks lain:
+            {{"skor": <angka 1-5>, "level_pencapaian": <angka 1-4>, "analisis_indikator": ["..."], "kekuatan": ["..."], "area_perbaikan": ["..."], "rekomendasi_pengembangan": ["..."]}}"""
+ASSESSMENT_PROMPT_JSON = json_mode_prompt(ASSESSMENT_PROMPT, ASSESSMENT_JSON_FORMAT)
+
+ASSESSMENT_ERROR_TEXT = "### HASIL PENILAIAN\n#### ERROR: Terjadi kesalahan dalam penilaian"
+
+# Key wajib per item assess_batch
+BATCH_ITEM_FIELDS = ("nama", "jabatan", "jawaban", "kompetensi", "level_target")
+
 
 class JobCompetencyExtractor:
     def __init__(self, llm, embedding_model):
@@ -57,18 +133,14 @@ class JobCompetencyExtractor:
             response = self.llm.invoke(extraction_prompt)
             mapping_text = response.content
             
-            # Extract JSON from response
-            start_idx = mapping_text.find('{')
-            end_idx = mapping_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = mapping_text[start_idx:end_idx]
-                job_mapping = json.loads(json_str)
-                print(f"✅ LLM berhasil extract {len(job_mapping)} jabatan")
-                self.job_mapping = job_mapping
-                return job_mapping
-            else:
+            # Extract JSON from response (local repair, then a short fix-up re-prompt
+            # with only the broken fragment instead of re-sending the documents)
+            job_mapping = parse_llm_json(mapping_text, kind="object", llm=self.llm, task="job_mapping")
+            if job_mapping is None:
                 raise ValueError("JSON tidak ditemukan dalam response LLM")
+            print(f"✅ LLM berhasil extract {len(job_mapping)} jabatan")
+            self.job_mapping = job_mapping
+            return job_mapping
                 
         except Exception as e:
             print(f"❌ Error extracting with LLM: {e}")
@@ -172,40 +244,95 @@ class JobCompetencyExtractor:
             json.dump(self.job_mapping, f, indent=2, ensure_ascii=False)
         print(f"✅ Mapping disimpan: {filepath}")
 
-    def create_vector_store(self, documents: List[Document]) -> FAISS:
-        """Create vector store from documents"""
+    def create_vector_store(self, documents: List[Document], index_path: Optional[str] = None,
+                            incremental: bool = False,
+                            pipeline: Optional[EmbeddingPipeline] = None) -> FAISS:
+        """
+        Create vector store from documents.
+
+        With `incremental=True` the index at `index_path` (e.g. data/index/skj_index)
+        is updated in place: only chunks not yet embedded are embedded and appended,
+        chunks whose source documents disappeared are removed.
+        Embedding goes through `pipeline` (batch size, concurrency, 429 retry);
+        a default EmbeddingPipeline is used when not given.
+        """
         print("🏗️ Creating vector store from documents...")
-        
+        split_docs = self._split_documents(documents)
+        print(f"✅ Created {len(split_docs)} document chunks")
+
+        if incremental:
+            if index_path is None:
+                raise ValueError("index_path wajib diisi untuk mode incremental")
+            return incremental_index(split_docs, self.embedding_model, index_path, pipeline=pipeline)
+
+        vector_store = build_index(split_docs, self.embedding_model, pipeline=pipeline)
+        if index_path is not None:
+            save_index(vector_store, index_path)
+        return vector_store
+
+    def create_vector_store_streaming(self, documents: Iterable[Document], index_path: Optional[str] = None,
+                                      pipeline: Optional[EmbeddingPipeline] = None) -> FAISS:
+        """
+        Streaming variant of create_vector_store for large inputs
+        (e.g. `iter_skj_documents(folder)` or `iter_pdf_documents(pdf)`):
+        load -> preprocess -> split -> embed -> index, batch by batch.
+        """
+        print("🏗️ Creating vector store from document stream...")
+        chunks = iter_chunks(documents, preprocess=self._preprocess_text, chunk_size=1000, chunk_overlap=200)
+        return stream_index(chunks, self.embedding_model, index_path=index_path, pipeline=pipeline)
+
+    def _split_documents(self, documents: List[Document]) -> List[Document]:
+        """Preprocess and split documents into chunks"""
         # Preprocess documents
         for doc in documents:
             doc.page_content = self._preprocess_text(doc.page_content)
-        
+
         # Split documents
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
             chunk_overlap=200,
             length_function=len
         )
-        split_docs = text_splitter.split_documents(documents)
-        
-        print(f"✅ Created {len(split_docs)} document chunks")
-        return FAISS.from_documents(split_docs, self.embedding_model)
+        return [tag_chunk(chunk) for chunk in text_splitter.split_documents(documents)]
 
     def _preprocess_text(self, text: str) -> str:
-        """Preprocess text for better embedding"""
-        # Remove page number footers
-        text = re.sub(r'-\s*\d+\s*-', '', text)
-        # Normalize whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r'\n(?!\n)', ' ', text)
-        text = re.sub(r' +', ' ', text)
-        return text.strip().lower()
+        """Preprocess text for better embedding (see src/text_normalizer.py)"""
+        return preprocess_text(text)
 
 
 class RealAssessmentSystem:
-    def __init__(self, vector_db: FAISS, llm):
+    def __init__(self, vector_db: FAISS, llm, retrieval_mode: str = "dense", lexical_index=None,
+                 embed_timeout: Optional[float] = None, context_tokens: Optional[int] = 750,
+                 json_mode: bool = False, journal_path: Optional[str] = None):
+        """
+        `retrieval_mode`: "dense" (FAISS saja), "hybrid" (FAISS + BM25) atau "lexical"
+        (BM25 saja, tanpa panggilan embedding). `lexical_index` default untuk mode
+        non-dense: bm25.json yang disimpan saat ingest di folder `vector_db`
+        (load_lexical_index); hanya FAISS in-memory tanpa folder yang dibangun ulang
+        dari docstore. Kalau embedding gagal/lebih lama dari `embed_timeout` detik,
+        konteks diambil dari BM25. `context_tokens`: anggaran token konteks
+        (chunk overlap/duplikat dibuang, lihat core/context.py). `json_mode`: minta
+        output JSON (response_format json_object) alih-alih markdown berlabel.
+        `journal_path`: jurnal hasil per item (lihat core/journal.py); item yang sudah
+        ada di jurnal tidak dinilai ulang, jadi run yang crash bisa dilanjutkan.
+        """
         self.vector_db = vector_db
         self.llm = llm
+        if lexical_index is None and retrieval_mode != "dense":
+            lexical_index = store_lexical_index(vector_db)
+        self.retriever = MultiIndexRetriever(
+            {"skj": vector_db}, k=6, lexical={"skj": lexical_index},
+            mode=retrieval_mode, embed_timeout=embed_timeout,
+        )
+        self.context_assembler = ContextAssembler(max_tokens=context_tokens)
+        if json_mode:
+            self.assessment_chain = LLMChain(llm=llm.bind(response_format=JSON_RESPONSE_FORMAT),
+                                             prompt=ASSESSMENT_PROMPT_JSON)
+        else:
+            self.assessment_chain = LLMChain(llm=llm, prompt=ASSESSMENT_PROMPT)
+        self.journal = ResultJournal(journal_path, default=self._report_default) if journal_path else None
+        if self.journal is not None and self.journal.replayed:
+            print(f"⏩ Jurnal {journal_path}: {self.journal.replayed} hasil tersimpan")
         self.job_mapping = self._load_mapping()
 
     def _load_mapping(self) -> Dict[str, Any]:
@@ -323,98 +450,226 @@ class RealAssessmentSystem:
         - Kedalaman analisis dan solusi
         """
 
-    def assess_with_llm(self, nama: str, jabatan: str, jawaban: str, kompetensi: str, level_target: str) -> Dict[str, Any]:
-        """Use LLM to assess answers based on mapping"""
-        # Get relevant documents from vector DB
+    def _retrieve_context(self, jabatan: str, kompetensi: str, level_target: str):
+        """Retrieve standard context for a (jabatan, kompetensi, level) combination"""
         query = f"{kompetensi} {jabatan} level {level_target} indikator perilaku"
-        relevant_docs = self.vector_db.similarity_search(query, k=6)
-        context = "\n".join([doc.page_content[:500] for doc in relevant_docs])  # Limit context length
-
+        # Pre-filter ke chunk jabatan & kompetensi ini (fallback ke seluruh index kalau tidak ada)
+        filters = {"skj": {"jabatan": jabatan, "kompetensi": kompetensi}}
+        relevant_docs = self.retriever.search(query, filters=filters).get("skj", [])
+        # Dedup overlap antar chunk + anggaran token konteks
+        context = self.context_assembler.assemble(relevant_docs)
+        return context, relevant_docs
+
+    def _build_assessment_inputs(self, nama: str, jabatan: str, jawaban: str, kompetensi: str,
+                                 level_target: str, context: str) -> Dict[str, Any]:
+        """Build prompt variables for ASSESSMENT_PROMPT"""
         # Get indicators from mapping
         level_key = self._get_level_key(level_target)
         indicators = self.job_mapping[jabatan]["indikator_perilaku"].get(level_key, [])
-        
-        assessment_prompt = PromptTemplate(
-            input_variables=["context", "nama", "jabatan", "jawaban", "kompetensi", "level_target", "indicators"],
-            template="""
-            STANDAR PENILAIAN KOMPETENSI:
-            {context}
-
-            INDIKATOR PERILAKU LEVEL {level_target}:
-            {indicators}
 
-            DATA PENILAIAN:
-            - Nama: {nama}
-            - Jabatan: {jabatan}
-            - Kompetensi: {kompetensi} 
-            - Level Target: {level_target}
-            - Jawaban Peserta: {jawaban}
-
-            TUGAS PENILAIAN:
-            1. Beri skor 1-5 berdasarkan kesesuaian dengan indikator di atas
-            2. Analisis DETAIL kesesuaian dengan setiap indikator
-            3. Identifikasi kekuatan spesifik dalam jawaban
-            4. Berikan rekomendasi pengembangan yang actionable
-            5. Tentukan level pencapaian (1-4) berdasarkan skor
-
-            KRITERIA SKOR:
-            - 5: Sangat Baik (melebihi ekspektasi level)
-            - 4: Baik (memenuhi semua indikator level)  
-            - 3: Cukup (memenuhi sebagian besar indikator)
-            - 2: Perlu Perbaikan (hanya memenuhi beberapa indikator)
-            - 1: Tidak Memadai (tidak memenuhi indikator)
-
-            FORMAT OUTPUT:
-            ### HASIL PENILAIAN
-            #### SKOR: [1-5]
-            #### LEVEL PENCAPAIAN: [1-4]
-            #### ANALISIS INDIKATOR:
-            - [Indikator 1]: [Analisis kesesuaian dan evidence dari jawaban]
-            - [Indikator 2]: [Analisis kesesuaian dan evidence dari jawaban]
-            - [Indikator 3]: [Analisis kesesuaian dan evidence dari jawaban]
-            #### KEKUATAN:
-            - [Kekuatan 1 dengan contoh dari jawaban]
-            - [Kekuatan 2 dengan contoh dari jawaban]
-            #### AREA PERBAIKAN:
-            - [Area 1 yang perlu dikembangkan]
-            - [Area 2 yang perlu dikembangkan]
-            #### REKOMENDASI PENGEMBANGAN:
-            - [Rekomendasi 1 yang spesifik dan actionable]
-            - [Rekomendasi 2 yang spesifik dan actionable]
+        return {
+            "context": context,
+            "nama": nama,
+            "jabatan": jabatan,
+            "jawaban": jawaban,
+            "kompetensi": kompetensi,
+            "level_target": level_target,
+            "indicators": "\n".join([f"- {ind}" for ind in indicators])
+        }
 
-            Gunakan Bahasa Indonesia profesional dan objektif.
-            """
-        )
-        
+    def assess_with_llm(self, nama: str, jabatan: str, jawaban: str, kompetensi: str, level_target: str) -> Dict[str, Any]:
+        """Use LLM to assess answers based on mapping (journaled results are reused)"""
+        key = self._journal_key(nama, jabatan, jawaban, kompetensi, level_target)
+        if self.journal is not None and key in self.journal:
+            print(f"⏩ {nama} / {kompetensi}: hasil diambil dari jurnal")
+            return self._from_journal(self.journal.get(key))
         try:
-            assessment_chain = LLMChain(llm=self.llm, prompt=assessment_prompt)
-            
-            result = assessment_chain.invoke({
-                "context": context,
-                "nama": nama,
-                "jabatan": jabatan,
-                "jawaban": jawaban, 
-                "kompetensi": kompetensi,
-                "level_target": level_target,
-                "indicators": "\n".join([f"- {ind}" for ind in indicators])
-            })
-            
-            return {
+            context, relevant_docs = self._retrieve_context(jabatan, kompetensi, level_target)
+            inputs = self._build_assessment_inputs(nama, jabatan, jawaban, kompetensi, level_target, context)
+            result = self.assessment_chain.invoke(inputs)
+
+            assessment = {
                 "hasil": result['text'],
+                "parsed": parse_assessment(result['text']),
                 "sumber": relevant_docs,
                 "kompetensi": kompetensi,
                 "level_target": level_target
             }
-            
+            self._journal_result(key, assessment)
+            return assessment
+
         except Exception as e:
             print(f"❌ Error in assessment: {e}")
             return {
-                "hasil": "### HASIL PENILAIAN\n#### ERROR: Terjadi kesalahan dalam penilaian",
+                "hasil": ASSESSMENT_ERROR_TEXT,
+                "parsed": AssessmentResult(raw=ASSESSMENT_ERROR_TEXT),
                 "sumber": [],
                 "kompetensi": kompetensi,
                 "level_target": level_target
             }
 
+    def assess_batch(self, items: List[Dict[str, Any]], max_concurrency: int = 8,
+                     resume: bool = True) -> List[Dict[str, Any]]:
+        """
+        Assess many (nama, jabatan, jawaban, kompetensi, level_target) items at once.
+
+        Retrieval is done once per unique (jabatan, kompetensi, level_target),
+        LLM calls are fanned out with at most `max_concurrency` in flight.
+        Results are returned in input order; failed items carry an `error` message
+        instead of aborting the whole batch.
+
+        With a journal, each successful item is appended as soon as its LLM call
+        completes; `resume=True` replays journaled items and only submits the rest.
+        """
+        print(f"🚀 Batch assessment: {len(items)} item, max_concurrency={max_concurrency}")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        journal_keys: Dict[int, str] = {}
+        retrieval_keys: Dict[int, tuple] = {}
+        todo: List[int] = []
+        resumed = 0
+        for i, item in enumerate(items):
+            # Item yang tidak lengkap gagal sendiri, tidak menghentikan seluruh batch
+            try:
+                self._validate_batch_item(item)
+                journal_keys[i] = self._item_journal_key(item)
+                retrieval_keys[i] = self._retrieval_key(item)
+                record = self.journal.get(journal_keys[i]) if self.journal is not None and resume else None
+                if record is not None:
+                    results[i] = {**self._from_journal(record), "nama": item["nama"],
+                                  "jabatan": item["jabatan"], "error": None}
+                    resumed += 1
+                    continue
+            except Exception as e:
+                results[i] = self._batch_error_result(item, e)
+                continue
+            todo.append(i)
+        if resumed:
+            print(f"⏩ Resume: {resumed} item dari jurnal, {len(todo)} item dinilai")
+
+        # 1. Deduplicated retrieval
+        contexts: Dict[tuple, Any] = {}
+        for i in todo:
+            key = retrieval_keys[i]
+            if key in contexts:
+                continue
+            try:
+                contexts[key] = self._retrieve_context(*key)
+            except Exception as e:
+                contexts[key] = e
+        print(f"🔎 Retrieval: {len(contexts)} unique query untuk {len(todo)} item")
+
+        # 2. Build prompt inputs, collecting per-item errors
+        pending_idx: List[int] = []
+        pending_inputs: List[Dict[str, Any]] = []
+        for i in todo:
+            item = items[i]
+            retrieved = contexts[retrieval_keys[i]]
+            try:
+                if isinstance(retrieved, Exception):
+                    raise retrieved
+                context, _ = retrieved
+                inputs = self._build_assessment_inputs(
+                    item["nama"], item["jabatan"], item["jawaban"],
+                    item["kompetensi"], str(item["level_target"]), context
+                )
+            except Exception as e:
+                results[i] = self._batch_error_result(item, e)
+                continue
+            pending_idx.append(i)
+            pending_inputs.append(inputs)
+
+        # 3. Bounded-concurrency LLM fan-out, journaling each item as it completes
+        outputs = self.assessment_chain.batch_as_completed(
+            pending_inputs,
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        ) if pending_inputs else []
+
+        for j, output in outputs:
+            i = pending_idx[j]
+            item = items[i]
+            if isinstance(output, Exception):
+                results[i] = self._batch_error_result(item, output)
+                continue
+            results[i] = {
+                "nama": item["nama"],
+                "jabatan": item["jabatan"],
+                "hasil": output['text'],
+                "parsed": parse_assessment(output['text']),
+                "sumber": contexts[retrieval_keys[i]][1],
+                "kompetensi": item["kompetensi"],
+                "level_target": item["level_target"],
+                "error": None
+            }
+            self._journal_result(journal_keys[i], results[i])
+
+        if self.journal is not None:
+            self.journal.sync()
+        failed = sum(1 for r in results if r["error"])
+        print(f"✅ Batch selesai: {len(items) - failed} berhasil, {failed} gagal")
+        return results
+
+    @staticmethod
+    def _validate_batch_item(item: Any) -> None:
+        if not isinstance(item, dict):
+            raise TypeError(f"Item batch harus dict, bukan {type(item).__name__}")
+        missing = [field for field in BATCH_ITEM_FIELDS if item.get(field) is None]
+        if missing:
+            raise ValueError(f"Field wajib tidak ada: {', '.join(missing)}")
+
+    @staticmethod
+    def _retrieval_key(item: Dict[str, Any]) -> tuple:
+        """Items sharing (jabatan, kompetensi, level_target) share one retrieval"""
+        return (item["jabatan"], item["kompetensi"], str(item["level_target"]))
+
+    @staticmethod
+    def _journal_key(nama: str, jabatan: str, jawaban: str, kompetensi: str, level_target: Any) -> str:
+        return journal_key(nama, jabatan, kompetensi, level_target, jawaban)
+
+    def _item_journal_key(self, item: Dict[str, Any]) -> str:
+        return self._journal_key(item.get("nama"), item.get("jabatan"), item.get("jawaban"),
+                                 item.get("kompetensi"), item.get("level_target"))
+
+    def _journal_result(self, key: str, result: Dict[str, Any]) -> None:
+        """Append a successful result; `parsed` is rebuilt from `hasil` on replay"""
+        if self.journal is None:
+            return
+        self.journal.append(key, {k: v for k, v in result.items() if k not in ("parsed", "error")})
+
+    @staticmethod
+    def _from_journal(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Journal record -> the same result dict assess_with_llm returns"""
+        return {
+            **record,
+            "parsed": parse_assessment(record["hasil"]),
+            "sumber": [
+                Document(page_content=doc.get("content", ""), metadata=doc.get("metadata") or {})
+                if isinstance(doc, dict) else Document(page_content=str(doc))
+                for doc in record.get("sumber") or []
+            ],
+        }
+
+    def close_journal(self):
+        """Flush + fsync the journal (call at the end of a run)"""
+        if self.journal is not None:
+            self.journal.close()
+
+    def _batch_error_result(self, item: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Per-item error result for assess_batch"""
+        item = item if isinstance(item, dict) else {}
+        print(f"❌ Error in assessment ({item.get('nama')}, {item.get('kompetensi')}): {error}")
+        return {
+            "nama": item.get("nama"),
+            "jabatan": item.get("jabatan"),
+            "hasil": ASSESSMENT_ERROR_TEXT,
+            "parsed": AssessmentResult(raw=ASSESSMENT_ERROR_TEXT),
+            "sumber": [],
+            "kompetensi": item.get("kompetensi"),
+            "level_target": item.get("level_target"),
+            "error": f"{type(error).__name__}: {error}"
+        }
+
     def generate_comprehensive_report(self, assessment_data: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive assessment report"""
         print(f"\n📊 GENERATING REPORT: {assessment_data['nama_pegawai']}")
@@ -436,23 +691,16 @@ class RealAssessmentSystem:
             'detailed_results': results
         }
         
-        # Calculate average score
-        total_score = 0
-        count = 0
-        for kompetensi, result in results.items():
-            hasil_text = result['hasil']
-            # Simple score extraction (you might want to make this more robust)
-            if 'SKOR:' in hasil_text:
-                try:
-                    score_line = [line for line in hasil_text.split('\n') if 'SKOR:' in line][0]
-                    score = int(score_line.split('SKOR:')[1].strip().split()[0])
-                    total_score += score
-                    count += 1
-                except:
-                    continue
-        
-        if count > 0:
-            report['summary']['rata_rata_skor'] = round(total_score / count, 2)
+        # Average score from results parsed at assessment time (no string re-parsing)
+        parsed_results = [
+            result.get('parsed') or parse_assessment(result['hasil'])
+            for result in results.values()
+        ]
+        scores = summarize_results(parsed_results)
+        report['summary']['distribusi_level'] = scores['distribusi_level']
+
+        if scores['rata_rata_skor'] is not None:
+            report['summary']['rata_rata_skor'] = scores['rata_rata_skor']
             # Determine eligibility
             avg_score = report['summary']['rata_rata_skor']
             if avg_score >= 4.0:
@@ -471,11 +719,22 @@ class RealAssessmentSystem:
         report_file = os.path.join(reports_dir, filename)
         
         with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+            json.dump(report, f, indent=2, ensure_ascii=False, default=self._report_default)
+        if self.journal is not None:
+            self.journal.sync()
         
         print(f"✅ Report disimpan: {report_file}")
         return report
 
+    @staticmethod
+    def _report_default(obj: Any) -> Any:
+        """JSON fallback for report values: parsed results and retrieved documents"""
+        if isinstance(obj, AssessmentResult):
+            return obj.to_dict()
+        if isinstance(obj, Document):
+            return {"content": obj.page_content, "metadata": obj.metadata}
+        return str(obj)
+
     def get_system_status(self) -> Dict[str, Any]:
         """Get system status information"""
         return {
@@ -484,5 +743,7 @@ class RealAssessmentSystem:
             "job_mapping_loaded": len(self.job_mapping) > 0,
             "total_jobs": len(self.job_mapping),
             "available_jobs": list(self.job_mapping.keys()),
+            "json_repair": JSON_REPAIR_STATS.stats(),
+            "journal": self.journal.stats() if self.journal is not None else None,
             "timestamp": datetime.now().isoformat()
         }
\ No newline at end of file
@@ -0,0 +1,157 @@
+# src/chunk_metadata.py
+"""
+Chunk-level metadata for filtered retrieval: jabatan, kompetensi, level, source.
+
+- SKJ JSON documents get jabatan/kompetensi straight from the JSON (see
+  `src.data_loader.iter_skj_json_documents`)
+- SKJ .docx / text documents: parsed from the "Jabatan: ..." / "Kompetensi: ..." headers;
+  a document covering several kompetensi is split into one section per
+  "Kompetensi:" header on the raw text (before preprocessing lowercases it and
+  collapses newlines), so every chunk carries the single kompetensi of its section
+- every chunk: `level` = level numbers described in the chunk ("Level 3: ...")
+
+Tag an index built before chunk metadata existed (e.g. data/index/skj_index):
+    python -m src.chunk_metadata data/index/skj_index data/raw/skj
+"""
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from langchain.schema import Document
+
+_JABATAN_HEADER = re.compile(r'^\s*Jabatan\s*:\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+_KOMPETENSI_HEADER = re.compile(r'^\s*Kompetensi\s*:\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+# Works on raw and on preprocessed (lowercased, newline-collapsed) text
+_LEVEL_LINE = re.compile(r'\blevel\s*([1-5])\s*:', re.IGNORECASE)
+
+
+def source_name(source: str) -> str:
+    """File name of a source path (also for Windows paths stored in old indexes)"""
+    return re.split(r'[\\/]', str(source))[-1]
+
+
+def parse_headers(text: str) -> Dict[str, Any]:
+    """
+    jabatan / kompetensi from SKJ text headers. A text covering several kompetensi
+    gets a list (filters match any element), a single one a plain string.
+    """
+    jabatan = _JABATAN_HEADER.findall(text)
+    kompetensi = list(dict.fromkeys(_KOMPETENSI_HEADER.findall(text)))
+    return {
+        "jabatan": jabatan[0] if len(jabatan) == 1 else None,
+        "kompetensi": (kompetensi[0] if len(kompetensi) == 1 else kompetensi) or None,
+    }
+
+
+def chunk_levels(text: str) -> List[int]:
+    return sorted({int(level) for level in _LEVEL_LINE.findall(text)})
+
+
+def tag_document(doc: Document) -> Document:
+    """Fill jabatan/kompetensi from headers (keeps values the loader already set)"""
+    for key, value in parse_headers(doc.page_content).items():
+        if value and not doc.metadata.get(key):
+            doc.metadata[key] = value
+    return doc
+
+
+def split_sections(doc: Document) -> List[Document]:
+    """
+    One Document per "Kompetensi:" section of a raw (not yet preprocessed) document,
+    each with its own `kompetensi`. Text before the first header (e.g. "Jabatan: ...")
+    stays with the first section. Documents with at most one header are returned as is.
+    """
+    matches = list(_KOMPETENSI_HEADER.finditer(doc.page_content))
+    if len(matches) < 2:
+        return [doc]
+    text = doc.page_content
+    sections = []
+    for i, match in enumerate(matches):
+        start = 0 if i == 0 else match.start()
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections.append(Document(
+            page_content=text[start:end].strip(),
+            metadata={**doc.metadata, "kompetensi": match.group(1)},
+        ))
+    return sections
+
+
+def dominant_kompetensi(text: str, previous: Optional[str] = None) -> Optional[str]:
+    """
+    Kompetensi whose section covers most of a chunk (raw text). Text before the
+    first header continues `previous`. Used for chunks of old indexes that were
+    split across section boundaries.
+    """
+    matches = list(_KOMPETENSI_HEADER.finditer(text))
+    if not matches:
+        return previous
+    covered: Dict[str, int] = {}
+    if previous:
+        covered[previous] = matches[0].start()
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        covered[match.group(1)] = covered.get(match.group(1), 0) + end - match.start()
+    return max(covered, key=covered.get)
+
+
+def tag_chunk(chunk: Document) -> Document:
+    """Per-chunk metadata after splitting: levels described in this chunk"""
+    chunk.metadata["level"] = chunk_levels(chunk.page_content)
+    return chunk
+
+
+def skj_jabatan_by_file(skj_folder: str) -> Dict[str, str]:
+    """SKJ file name -> jabatan, from the SKJ JSON files"""
+    mapping = {}
+    for filename in sorted(os.listdir(skj_folder)):
+        if filename.endswith('.json'):
+            with open(os.path.join(skj_folder, filename), 'r', encoding='utf-8') as f:
+                mapping[filename] = json.load(f).get("jabatan")
+    return mapping
+
+
+def retag_chunks(chunks: Iterable[Document], jabatan_by_file: Optional[Dict[str, str]] = None) -> Iterator[Document]:
+    """
+    Tag chunks in index order. A chunk without its own "Kompetensi:" header is a
+    continuation of the previous chunk from the same source and inherits its kompetensi;
+    a chunk spanning two sections gets the one covering most of its text.
+    """
+    jabatan_by_file = jabatan_by_file or {}
+    # source -> kompetensi of the last section seen in that source
+    previous: Dict[str, Optional[str]] = {}
+    for chunk in chunks:
+        source = source_name(chunk.metadata.get("source", ""))
+        headers = parse_headers(chunk.page_content)
+        chunk.metadata["source"] = source
+        chunk.metadata["jabatan"] = jabatan_by_file.get(source) or headers["jabatan"] or chunk.metadata.get("jabatan")
+        existing = chunk.metadata.get("kompetensi")
+        fallback = previous.get(source) or (existing if isinstance(existing, str) else None)
+        chunk.metadata["kompetensi"] = dominant_kompetensi(chunk.page_content, fallback) or existing
+        last_header = _KOMPETENSI_HEADER.findall(chunk.page_content)
+        previous[source] = last_header[-1] if last_header else chunk.metadata["kompetensi"]
+        yield tag_chunk(chunk)
+
+
+def retag_index(index_path: str, skj_folder: Optional[str] = None) -> None:
+    """Add jabatan/kompetensi/level/source metadata to an existing index, in place (no re-embedding)"""
+    from langchain_community.embeddings import FakeEmbeddings
+    from langchain_community.vectorstores import FAISS
+
+    from core.lexical import faiss_documents
+    from src.index_builder import save_index
+
+    # Own index, trusted pickle; embeddings are not needed to rewrite metadata
+    vector_store = FAISS.load_local(index_path, FakeEmbeddings(size=1), allow_dangerous_deserialization=True)
+    jabatan_by_file = skj_jabatan_by_file(skj_folder) if skj_folder else {}
+    for chunk in retag_chunks(faiss_documents(vector_store), jabatan_by_file):
+        print(f"🏷️ {chunk.metadata['source']}: {chunk.metadata['jabatan']} / {chunk.metadata['kompetensi']} "
+              f"level {chunk.metadata['level']}")
+    save_index(vector_store, index_path)
+    print(f"✅ Metadata updated: {index_path}")
+
+
+if __name__ == "__main__":
+    retag_index(sys.argv[1] if len(sys.argv) > 1 else "data/index/skj_index",
+                sys.argv[2] if len(sys.argv) > 2 else "data/raw/skj")
@@ -1,31 +1,138 @@
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+
 from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
 from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-def load_pdf_documents(pdf_path):
-    """Load PDF documents"""
+from src.chunk_metadata import split_sections, tag_chunk, tag_document
+
+def iter_pdf_documents(pdf_path) -> Iterator[Document]:
+    """Yield PDF pages one by one (lazy, tidak memuat semua halaman sekaligus)"""
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-    
+
     loader = PyPDFLoader(pdf_path)
-    return loader.load()
+    yield from loader.lazy_load()
+
+def load_pdf_documents(pdf_path):
+    """Load PDF documents"""
+    return list(iter_pdf_documents(pdf_path))
+
+def _list_skj_files(skj_folder) -> List[str]:
+    """Sorted .docx filenames, so load order is deterministic"""
+    return sorted(f for f in os.listdir(skj_folder) if f.endswith('.docx'))
+
+def _load_skj_file(skj_folder, filename) -> List[Document]:
+    """
+    Parse one SKJ .docx (top-level function so it can run in a worker process).
+    Returns one Document per kompetensi section, tagged on the raw text.
+    """
+    loader = Docx2txtLoader(os.path.join(skj_folder, filename))
+    sections = []
+    for doc in loader.load():
+        doc.metadata['source'] = filename
+        doc.metadata['type'] = 'SKJ'
+        sections.extend(split_sections(tag_document(doc)))
+    return sections
+
+def iter_skj_documents(skj_folder) -> Iterator[Document]:
+    """Yield SKJ documents file by file from folder"""
+    if not os.path.exists(skj_folder):
+        print(f"⚠️ SKJ folder not found: {skj_folder}")
+        return
+
+    for filename in _list_skj_files(skj_folder):
+        yield from _load_skj_file(skj_folder, filename)
+        print(f"✅ Loaded: {filename}")
+
+def skj_kompetensi_text(jabatan: str, kompetensi: dict) -> str:
+    """Text of one kompetensi from an SKJ JSON file (same layout as the SKJ index)"""
+    lines = [
+        f"Jabatan: {jabatan}",
+        "",
+        f"Kompetensi: {kompetensi.get('nama_kompetensi', '')}",
+        f"Definisi: {kompetensi.get('definisi', '')}",
+        "",
+        "Indikator Perilaku:",
+        *[f"- {indikator}" for indikator in kompetensi.get('indikator_perilaku', [])],
+        "",
+        "Level Mapping:",
+        *[f"Level {level}: {desc}" for level, desc in sorted(kompetensi.get('level_mapping', {}).items())],
+    ]
+    return "\n".join(lines)
+
+def _load_skj_json_file(skj_folder, filename) -> List[Document]:
+    """One Document per kompetensi, with jabatan/kompetensi metadata from the JSON"""
+    with open(os.path.join(skj_folder, filename), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    jabatan = data.get('jabatan', '')
+    return [
+        Document(
+            page_content=skj_kompetensi_text(jabatan, kompetensi),
+            metadata={
+                'source': filename,
+                'type': 'SKJ',
+                'jabatan': jabatan,
+                'kompetensi': kompetensi.get('nama_kompetensi', ''),
+            },
+        )
+        for kompetensi in data.get('kompetensi', [])
+    ]
+
+def iter_skj_json_documents(skj_folder) -> Iterator[Document]:
+    """Yield SKJ documents (one per jabatan + kompetensi) from the SKJ JSON files in folder"""
+    if not os.path.exists(skj_folder):
+        print(f"⚠️ SKJ folder not found: {skj_folder}")
+        return
+
+    for filename in sorted(f for f in os.listdir(skj_folder) if f.endswith('.json')):
+        yield from _load_skj_json_file(skj_folder, filename)
+        print(f"✅ Loaded: {filename}")
+
+def load_skj_documents(skj_folder, max_workers: Optional[int] = None):
+    """
+    Load all SKJ documents from folder.
+
+    `max_workers` > 1 parses the .docx files in a process pool (CPU-bound);
+    output order is the same as the serial mode (sorted by filename).
+    """
+    if not max_workers or max_workers <= 1:
+        return list(iter_skj_documents(skj_folder))
 
-def load_skj_documents(skj_folder):
-    """Load all SKJ documents from folder"""
     if not os.path.exists(skj_folder):
         print(f"⚠️ SKJ folder not found: {skj_folder}")
         return []
-    
+
+    filenames = _list_skj_files(skj_folder)
     all_docs = []
-    for filename in os.listdir(skj_folder):
-        if filename.endswith('.docx'):
-            file_path = os.path.join(skj_folder, filename)
-            loader = Docx2txtLoader(file_path)
-            docs = loader.load()
-            for doc in docs:
-                doc.metadata['source'] = filename
-                doc.metadata['type'] = 'SKJ'
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # map() returns results in submission order -> deterministic
+        for filename, docs in zip(filenames, executor.map(_load_skj_file, [skj_folder] * len(filenames), filenames)):
             all_docs.extend(docs)
             print(f"✅ Loaded: {filename}")
-    
-    return all_docs
\ No newline at end of file
+
+    return all_docs
+
+def iter_chunks(documents: Iterable[Document], preprocess: Optional[Callable[[str], str]] = None,
+                chunk_size: int = 1000, chunk_overlap: int = 200) -> Iterator[Document]:
+    """
+    Streaming preprocess + split: setiap dokumen/halaman langsung dipecah jadi chunk
+    begitu dibaca, tanpa menunggu seluruh file selesai dimuat.
+    Dokumen dengan beberapa header "Kompetensi:" dipecah per seksi SEBELUM preprocess
+    (header masih utuh), jadi setiap chunk membawa kompetensi seksinya sendiri.
+    Setiap chunk mendapat metadata `level` (lihat src/chunk_metadata.py).
+    """
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len
+    )
+    for doc in documents:
+        for section in split_sections(doc):
+            if preprocess is not None:
+                section.page_content = preprocess(section.page_content)
+            for chunk in text_splitter.split_documents([section]):
+                yield tag_chunk(chunk)
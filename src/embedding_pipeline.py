@@ -0,0 +1,113 @@
+# src/embedding_pipeline.py
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from tqdm import tqdm
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    """True for HTTP 429 / RateLimitError from the embedding endpoint"""
+    if type(error).__name__ == "RateLimitError":
+        return True
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Retry-After header (seconds) if the server sent one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class EmbeddingPipeline:
+    """
+    Batched, parallel embedding for index construction.
+
+    Texts are split into batches of `batch_size`, at most `max_in_flight`
+    batches are sent concurrently, and 429 responses are retried with
+    exponential backoff (honouring Retry-After). Throughput of the last run
+    is kept in `last_report`.
+    """
+
+    def __init__(self, embedding_model, batch_size: int = 64, max_in_flight: int = 4,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 show_progress: bool = True):
+        self.embedding_model = embedding_model
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.show_progress = show_progress
+        self.last_report: Dict[str, Any] = {}
+        self._retries = 0
+        self._lock = threading.Lock()
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                return self.embedding_model.embed_documents(texts)
+            except Exception as e:
+                if not _is_rate_limit(e) or attempt >= self.max_retries:
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * (0.5 + random.random() / 2)
+                attempt += 1
+                with self._lock:
+                    self._retries += 1
+                print(f"⏳ Rate limited (429), retry {attempt}/{self.max_retries} dalam {delay:.1f}s")
+                time.sleep(delay)
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, returning vectors in input order"""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+        self._retries = 0
+        start = time.perf_counter()
+
+        progress = tqdm(total=len(texts), desc="Embedding", unit="chunk", disable=not self.show_progress)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            in_flight: Dict[Future, int] = {}
+            next_batch = 0
+            try:
+                while next_batch < len(batches) or in_flight:
+                    # Submit lazily so nothing new is embedded (and paid for) once a batch fails
+                    while next_batch < len(batches) and len(in_flight) < self.max_in_flight:
+                        in_flight[executor.submit(self._embed_batch, batches[next_batch])] = next_batch
+                        next_batch += 1
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i = in_flight.pop(future)
+                        results[i] = future.result()
+                        progress.update(len(batches[i]))
+            finally:
+                progress.close()
+
+        elapsed = time.perf_counter() - start
+        approx_tokens = sum(len(t) for t in texts) // 4  # kira-kira 4 karakter per token
+        self.last_report = {
+            "chunks": len(texts),
+            "batches": len(batches),
+            "retries": self._retries,
+            "seconds": round(elapsed, 2),
+            "chunks_per_s": round(len(texts) / elapsed, 1) if elapsed else 0.0,
+            "approx_tokens_per_s": round(approx_tokens / elapsed, 1) if elapsed else 0.0,
+        }
+        if self.show_progress:
+            r = self.last_report
+            print(f"📈 Embedding: {r['chunks']} chunks dalam {r['seconds']}s "
+                  f"({r['chunks_per_s']} chunks/s, ~{r['approx_tokens_per_s']} tokens/s, {r['retries']} retry)")
+
+        return [vector for batch in results for vector in batch]
@@ -0,0 +1,212 @@
+# src/index_builder.py
+import hashlib
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain.schema import Document
+
+from core.index_store import export_faiss
+from core.lexical import save_bm25
+from src.embedding_pipeline import EmbeddingPipeline
+
+
+def chunk_hash(doc: Document) -> str:
+    """Content hash of a chunk (source + text), used as its docstore id"""
+    source = str(doc.metadata.get("source", ""))
+    return hashlib.sha256(f"{source}\x00{doc.page_content}".encode("utf-8")).hexdigest()
+
+
+def save_index(vector_store: FAISS, index_path: str) -> None:
+    """Save FAISS index (for incremental updates), the pickle-free serving format and the BM25 index"""
+    vector_store.save_local(index_path)
+    export_faiss(vector_store, index_path)
+    save_bm25(vector_store, index_path)
+
+
+def _existing_hashes(vector_store: FAISS) -> Dict[str, str]:
+    """Map docstore id -> chunk hash for every chunk already in the index"""
+    existing = {}
+    for doc_id in vector_store.index_to_docstore_id.values():
+        doc = vector_store.docstore.search(doc_id)
+        if isinstance(doc, Document):
+            # Index lama (sebelum incremental) belum punya metadata chunk_hash
+            existing[doc_id] = doc.metadata.get("chunk_hash") or chunk_hash(doc)
+    return existing
+
+
+def build_index(chunks: List[Document], embedding_model, ids: Optional[List[str]] = None,
+                pipeline: Optional[EmbeddingPipeline] = None) -> FAISS:
+    """Build a new FAISS index, embedding chunks through the batched pipeline"""
+    pipeline = pipeline or EmbeddingPipeline(embedding_model)
+    texts = [doc.page_content for doc in chunks]
+    vectors = pipeline.embed_texts(texts)
+    return FAISS.from_embeddings(
+        list(zip(texts, vectors)),
+        embedding_model,
+        metadatas=[doc.metadata for doc in chunks],
+        ids=ids,
+    )
+
+
+def add_to_index(vector_store: FAISS, chunks: List[Document], ids: Optional[List[str]] = None,
+                 pipeline: Optional[EmbeddingPipeline] = None) -> List[str]:
+    """Append chunks to an existing FAISS index via the batched pipeline"""
+    pipeline = pipeline or EmbeddingPipeline(vector_store.embedding_function)
+    texts = [doc.page_content for doc in chunks]
+    vectors = pipeline.embed_texts(texts)
+    return vector_store.add_embeddings(
+        list(zip(texts, vectors)),
+        metadatas=[doc.metadata for doc in chunks],
+        ids=ids,
+    )
+
+
+def incremental_index(chunks: List[Document], embedding_model, index_path: str, prune: bool = True,
+                      pipeline: Optional[EmbeddingPipeline] = None) -> FAISS:
+    """
+    Incrementally sync a FAISS index on disk with `chunks`.
+
+    - chunks whose hash is already in the index are skipped (not re-embedded)
+    - only new/changed chunks are embedded and appended
+    - with `prune=True`, chunks no longer present (edited or removed source
+      documents) are deleted from the index
+
+    `chunks` must be the full, already preprocessed & split document set.
+    """
+    # Deduplicate by hash, keep first occurrence
+    new_chunks: Dict[str, Document] = {}
+    for doc in chunks:
+        h = chunk_hash(doc)
+        if h not in new_chunks:
+            doc.metadata["chunk_hash"] = h
+            new_chunks[h] = doc
+
+    if not os.path.exists(os.path.join(index_path, "index.faiss")):
+        print(f"🏗️ Index belum ada, membangun baru: {len(new_chunks)} chunks")
+        vector_store = build_index(
+            list(new_chunks.values()), embedding_model, ids=list(new_chunks.keys()), pipeline=pipeline
+        )
+        save_index(vector_store, index_path)
+        return vector_store
+
+    vector_store = FAISS.load_local(index_path, embedding_model, allow_dangerous_deserialization=True)
+    existing = _existing_hashes(vector_store)
+    existing_hash_set = set(existing.values())
+
+    to_add = {h: doc for h, doc in new_chunks.items() if h not in existing_hash_set}
+    to_delete = [doc_id for doc_id, h in existing.items() if h not in new_chunks] if prune else []
+
+    if to_delete:
+        vector_store.delete(to_delete)
+    if to_add:
+        add_to_index(vector_store, list(to_add.values()), ids=list(to_add.keys()), pipeline=pipeline)
+
+    print(
+        f"🔁 Incremental index: +{len(to_add)} baru, -{len(to_delete)} dihapus, "
+        f"{len(new_chunks) - len(to_add)} tetap (tidak di-embed ulang)"
+    )
+    if to_add or to_delete:
+        save_index(vector_store, index_path)
+    return vector_store
+
+
+_STREAM_DONE = object()
+# Producer re-checks the stop flag at this interval while the queue is full
+_PUT_TIMEOUT = 0.5
+
+
+def stream_index(chunks: Iterable[Document], embedding_model, index_path: Optional[str] = None,
+                 pipeline: Optional[EmbeddingPipeline] = None, batch_size: int = 256,
+                 prefetch: int = 2, on_progress: Optional[Callable[[int], None]] = None) -> FAISS:
+    """
+    Build a FAISS index from a chunk *stream* (e.g. `iter_chunks(iter_skj_documents(...))`).
+
+    A background thread pulls chunks (file I/O, preprocessing, splitting) into a
+    bounded queue of at most `prefetch` batches while the main thread embeds and
+    indexes the previous batch, so memory stays flat and the first chunks are
+    indexed before the last file is read.
+    `on_progress(total_chunks_indexed)` is called after every batch.
+    If the consumer fails (embedding error, reader error), the reader thread is
+    stopped and the chunk source closed instead of blocking on a full queue.
+    """
+    pipeline = pipeline or EmbeddingPipeline(embedding_model, show_progress=False)
+    batches: "queue.Queue" = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def _put(item) -> bool:
+        """Put into the bounded queue unless the consumer has stopped"""
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        source = iter(chunks)
+        try:
+            batch = []
+            for doc in source:
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    if not _put(batch):
+                        return
+                    batch = []
+            if batch:
+                _put(batch)
+        except Exception as e:
+            _put(e)
+        finally:
+            _put(_STREAM_DONE)
+            # Close generator sources (open files / loaders) when stopped early
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+
+    reader = threading.Thread(target=_produce, name="index-stream-reader", daemon=True)
+    reader.start()
+
+    vector_store: Optional[FAISS] = None
+    seen = set()
+    total = 0
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _STREAM_DONE:
+                break
+            if isinstance(batch, Exception):
+                raise batch
+
+            unique = []
+            for doc in batch:
+                h = chunk_hash(doc)
+                if h not in seen:
+                    seen.add(h)
+                    doc.metadata["chunk_hash"] = h
+                    unique.append(doc)
+            if not unique:
+                continue
+
+            ids = [doc.metadata["chunk_hash"] for doc in unique]
+            if vector_store is None:
+                vector_store = build_index(unique, embedding_model, ids=ids, pipeline=pipeline)
+            else:
+                add_to_index(vector_store, unique, ids=ids, pipeline=pipeline)
+            total += len(unique)
+            print(f"📦 Indexed {total} chunks ({pipeline.last_report.get('chunks_per_s', 0)} chunks/s batch terakhir)")
+            if on_progress is not None:
+                on_progress(total)
+    finally:
+        stop.set()
+        reader.join(timeout=_PUT_TIMEOUT * 4)
+
+    if vector_store is None:
+        raise ValueError("Tidak ada chunk untuk diindex")
+
+    if index_path is not None:
+        save_index(vector_store, index_path)
+    return vector_store
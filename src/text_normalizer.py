@@ -0,0 +1,74 @@
+# src/text_normalizer.py
+"""
+Text normalizer for SKJ / PermenPAN documents before chunking and embedding.
+
+Produces exactly the same output as the original four-pass
+`JobCompetencyExtractor._preprocess_text`:
+
+    text = re.sub(r'-\\s*\\d+\\s*-', '', text)   # page number footers "- 5 -"
+    text = re.sub(r'\\n\\s*\\n', '\\n\\n', text)
+    text = re.sub(r'\\n(?!\\n)', ' ', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip().lower()
+
+but with precompiled patterns, the newline pass done with str.replace and
+the space-collapsing pass only touching runs of 2+ spaces.
+
+Run `python -m src.text_normalizer [pdf]` to benchmark against the original
+on the PermenPAN PDF text.
+"""
+import re
+import sys
+import time
+
+_PAGE_NUMBER = re.compile(r'-\s*\d+\s*-')
+_BLANK_LINES = re.compile(r'\n\s*\n')
+_SINGLE_NEWLINE = re.compile(r'\n(?!\n)')
+# ' {2,}' instead of ' +': single spaces (every word gap) are left alone
+_MULTI_SPACES = re.compile(r' {2,}')
+_PARAGRAPH = '\x00'
+
+
+def preprocess_text(text: str) -> str:
+    """Remove page-number footers, normalize whitespace, strip and lowercase"""
+    text = _PAGE_NUMBER.sub('', text)
+    text = _BLANK_LINES.sub('\n\n', text)
+    if _PARAGRAPH in text:
+        text = _SINGLE_NEWLINE.sub(' ', text)
+    else:
+        # After _BLANK_LINES there is no "\n\n\n", so "\n(?!\n)" -> " " is:
+        # "\n\n" -> "\n ", every other "\n" -> " " (done with C-speed str.replace)
+        text = text.replace('\n\n', _PARAGRAPH).replace('\n', ' ').replace(_PARAGRAPH, '\n ')
+    text = _MULTI_SPACES.sub(' ', text)
+    return text.strip().lower()
+
+
+def _preprocess_text_reference(text: str) -> str:
+    """Original implementation, kept for equivalence checks and benchmarking"""
+    text = re.sub(r'-\s*\d+\s*-', '', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r'\n(?!\n)', ' ', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip().lower()
+
+
+def _benchmark(pdf_path: str, repeat: int = 20) -> None:
+    from pypdf import PdfReader
+
+    pages = [page.extract_text() or "" for page in PdfReader(pdf_path).pages]
+    size_mb = sum(len(p.encode("utf-8")) for p in pages) / 1e6
+
+    mismatches = sum(1 for p in pages if preprocess_text(p) != _preprocess_text_reference(p))
+    print(f"📄 {len(pages)} halaman, {size_mb:.2f} MB teks, output berbeda: {mismatches} halaman")
+
+    for name, func in (("reference", _preprocess_text_reference), ("precompiled", preprocess_text)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for page in pages:
+                func(page)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"⏱️ {name:12s}: {elapsed * 1000:8.2f} ms/run, {elapsed / size_mb * 1000:8.2f} ms/MB")
+
+
+if __name__ == "__main__":
+    _benchmark(sys.argv[1] if len(sys.argv) > 1 else "data/raw/permenpan/PERMENPAN NOMOR 38 TAHUN 2017.pdf")
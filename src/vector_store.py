@@ -74,8 +74,11 @@
 
 # src/vector_store.py - VERSION DENGAN CONFIG
 import os
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores import FAISS
+
+from core.clients import build_chat_model
+from core.embeddings import CachedEmbeddings, EmbeddingCache
+from core.index_store import load_index
+from core.llm_cache import TTLResponseCache
 
 try:
     from config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL, LLM_MODEL, EMBEDDING_MODEL
@@ -86,29 +89,28 @@ except ImportError:
     LLM_MODEL = "qwen/qwen-2.5-coder-7b-instruct:free"
     EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
-def setup_llm():
-    """Setup LLM for chat dengan OpenRouter"""
+def setup_llm(cache=None):
+    """
+    Setup LLM for chat dengan OpenRouter.
+    `cache`: TTLResponseCache untuk menyimpan respons (default: cache baru 1024 entri, TTL 24 jam).
+    """
     if OPENROUTER_API_KEY == "your-openrouter-api-key-here":
         print("❌ Please set your OpenRouter API key in config.py")
         print("💡 Get free API key from: https://openrouter.ai/keys")
         raise ValueError("OpenRouter API key not configured")
     
-    return ChatOpenAI(
-        base_url=OPENROUTER_BASE_URL,
-        api_key=OPENROUTER_API_KEY,
+    # Shared HTTP pool, timeouts, retries and headers (see core/clients.py)
+    return build_chat_model(
         model=LLM_MODEL,
+        api_key=OPENROUTER_API_KEY,
+        base_url=OPENROUTER_BASE_URL,
         temperature=0.7,
         max_tokens=512,
-        streaming=False,
-        timeout=60,
-        headers={
-            "HTTP-Referer": "http://localhost:3000",
-            "X-Title": "RAG Assessment System"
-        }
+        cache=cache if cache is not None else TTLResponseCache(),
     )
 
-def setup_embedding_model():
-    """Setup embedding model untuk OpenRouter compatibility"""
+def setup_embedding_model(cache_path=None, cache_size=2048):
+    """Setup embedding model untuk OpenRouter compatibility (dibungkus cache embedding)"""
     try:
         # Coba Hugging Face embeddings dulu
         from langchain_community.embeddings import HuggingFaceEmbeddings
@@ -126,7 +128,11 @@ def setup_embedding_model():
         
         if test_result and len(test_result) > 0:
             print(f"✅ Embeddings ready - dimension: {len(test_result)}")
-            return embeddings
+            return CachedEmbeddings(
+                embeddings,
+                model_name=EMBEDDING_MODEL,
+                cache=EmbeddingCache(max_entries=cache_size, disk_path=cache_path),
+            )
         else:
             raise ValueError("Empty embedding result")
             
@@ -143,11 +149,8 @@ def load_vector_store(vector_store_path):
         if not os.path.exists(vector_store_path):
             raise FileNotFoundError(f"Vector store not found: {vector_store_path}")
             
-        return FAISS.load_local(
-            vector_store_path,
-            embedding_model,
-            allow_dangerous_deserialization=True
-        )
+        # Format aman (mmap + SQLite); index lama (pickle) harus dikonversi dulu (core/index_store.py)
+        return load_index(vector_store_path, embedding_model)
     except Exception as e:
         print(f"❌ Error loading vector store: {e}")
         return None
\ No newline at end of file
@@ -0,0 +1,70 @@
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import FakeListChatModel
+
+from src.assessment_engine import RealAssessmentSystem
+
+OUTPUT = "### HASIL PENILAIAN\n#### SKOR: 4\n#### LEVEL PENCAPAIAN: 3\n#### REKOMENDASI PENGEMBANGAN: Mentoring"
+
+
+class CountingChatModel(FakeListChatModel):
+    calls: int = 0
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+        return super()._call(*args, **kwargs)
+
+
+def _system(journal_path=None):
+    vector_db = FAISS.from_texts(
+        ["Integritas level 3: melaporkan pelanggaran", "Kerjasama level 2: aktif dalam tim"],
+        DeterministicFakeEmbedding(size=8),
+        metadatas=[{"jabatan": "Analis", "kompetensi": "Integritas"},
+                   {"jabatan": "Analis", "kompetensi": "Kerjasama"}],
+    )
+    llm = CountingChatModel(responses=[OUTPUT])
+    system = RealAssessmentSystem(vector_db, llm, journal_path=journal_path)
+    system.job_mapping = {"Analis": {"indikator_perilaku": {}}}
+    return system, llm
+
+
+def _item(nama, **extra):
+    return {"nama": nama, "jabatan": "Analis", "jawaban": f"Jawaban {nama}",
+            "kompetensi": "Integritas", "level_target": 3, **extra}
+
+
+def test_batch_keeps_input_order_and_isolates_bad_items():
+    system, llm = _system()
+    items = [
+        _item("A"),
+        {"nama": "B", "jabatan": "Analis", "jawaban": "tanpa kompetensi"},
+        _item("C", kompetensi="Kerjasama", level_target=2),
+        "bukan dict",
+        _item("D", jabatan="Tidak Ada"),
+        _item("E"),
+    ]
+    results = system.assess_batch(items, max_concurrency=2)
+
+    assert [r["nama"] for r in results] == ["A", "B", "C", None, "D", "E"]
+    assert [r["error"] is None for r in results] == [True, False, True, False, False, True]
+    assert "kompetensi" in results[1]["error"] and "level_target" in results[1]["error"]
+    assert results[0]["parsed"].skor == 4
+    assert results[2]["kompetensi"] == "Kerjasama"
+    assert llm.calls == 3
+
+
+def test_batch_resume_from_journal(tmp_path):
+    journal = tmp_path / "jurnal.jsonl"
+    items = [_item("A"), _item("B"), {"nama": "X"}]
+    system, llm = _system(str(journal))
+    first = system.assess_batch(items)
+    system.close_journal()
+    assert llm.calls == 2
+
+    system, llm = _system(str(journal))
+    second = system.assess_batch(items + [_item("C")])
+    system.close_journal()
+    assert llm.calls == 1
+    assert [r["hasil"] for r in second[:2]] == [r["hasil"] for r in first[:2]]
+    assert second[2]["error"] is not None
+    assert second[3]["parsed"].level == 3
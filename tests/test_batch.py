@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+
+from core.batch import BatchRunner, load_checkpoint, row_key
+from core.data import SKJ_DATA
+from core.result_parser import AssessmentResult
+
+JABATAN = next(iter(SKJ_DATA))
+KOMPETENSI = next(iter(SKJ_DATA[JABATAN]["kompetensi"]))
+
+
+class FakeCore:
+    def __init__(self):
+        self.calls = 0
+
+    async def aassess_free(self, jabatan, kompetensi, kasus, jawaban, nama):
+        self.calls += 1
+        return AssessmentResult(level=3, skor=80, parsed=True), "", ""
+
+    async def aassess_structured(self, jabatan, kompetensi, id_soal, jawaban, nama):
+        raise ValueError(f"Soal {id_soal} tidak ditemukan")
+
+
+def _row(i, **extra):
+    return {"nama": f"P{i}", "nip": str(i), "jabatan": JABATAN, "kompetensi": KOMPETENSI,
+            "kasus": "kasus", "jawaban": f"jawaban {i}", **extra}
+
+
+def test_row_key_ignores_field_order_and_whitespace():
+    row = _row(1)
+    assert row_key(row) == row_key(dict(reversed(list(row.items()))))
+    assert row_key(row) == row_key({**row, "nama": " P1 ", "extra": "x"})
+    assert row_key(row) != row_key(_row(2))
+
+
+def test_load_checkpoint_skips_bad_lines(tmp_path):
+    output = tmp_path / "hasil.jsonl"
+    output.write_text(
+        '[1, 2]\n"teks"\n{"status": "ok"}\n{"key": "a", "status": "ok"}\n'
+        '{"key": "b", "status": "error"}\n{"key": "c", "status": "invalid"}\n{"key": "d", "sta',
+        encoding="utf-8",
+    )
+    assert load_checkpoint(output) == {"a", "c"}
+    assert load_checkpoint(tmp_path / "belum_ada.jsonl") == set()
+
+
+def test_resume_scores_only_unfinished_rows(tmp_path):
+    source = tmp_path / "jawaban.jsonl"
+    rows = [_row(i) for i in range(5)] + [_row(9, jabatan="Tidak Ada"), _row(10, id_soal="X-99")]
+    source.write_text(
+        "\n".join(json.dumps(row) for row in rows) + "\nbukan json\n" + json.dumps(rows[0]) + "\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "hasil.jsonl"
+
+    core = FakeCore()
+    summary = asyncio.run(BatchRunner(core, output, concurrency=3).run(source))
+    assert (summary["ok"], summary["invalid"], summary["skipped"]) == (5, 3, 1)
+    assert core.calls == 5
+    assert summary["ringkasan"]["rata_rata_skor"] == 80.0
+
+    # Baris terakhir terpotong (crash saat write) + run ulang: tidak ada yang dinilai lagi
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"key": "terpotong')
+    core = FakeCore()
+    summary = asyncio.run(BatchRunner(core, output, concurrency=3).run(source))
+    assert (summary["ok"], summary["invalid"], summary["skipped"]) == (0, 0, 9)
+    assert core.calls == 0
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()
+               if line.endswith("}")]
+    assert len(records) == 8
+    assert sum(record["key"].startswith("line-") for record in records) == 1
+
+
+def test_concurrency_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        BatchRunner(FakeCore(), tmp_path / "hasil.jsonl", concurrency=0)
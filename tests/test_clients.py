@@ -0,0 +1,36 @@
+import asyncio
+
+import httpx
+
+from core import clients
+
+
+def test_async_client_gets_a_pool_per_event_loop(monkeypatch):
+    transports = []
+
+    def new_client():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+        transports.append(transport)
+        return httpx.AsyncClient(transport=transport)
+
+    monkeypatch.setattr(clients, "_new_async_client", new_client)
+    monkeypatch.setattr(clients, "_async_client", None)
+    client = clients.get_async_http_client()
+    assert clients.get_async_http_client() is client
+
+    async def call(close):
+        response = await client.get("https://openrouter.ai/api/v1/models")
+        pools = client.open_loops()
+        if close:
+            await clients.aclose_async_http_client()
+        return response.json(), pools
+
+    assert asyncio.run(call(close=False)) == ({"ok": True}, 1)
+    # asyncio.run kedua: loop baru -> pool baru, pool loop lama (sudah ditutup) dilepas
+    assert asyncio.run(call(close=True)) == ({"ok": True}, 1)
+    assert len(transports) == 2
+    assert client.open_loops() == 0
+
+
+def test_normalize_base_url():
+    assert clients.normalize_base_url("https://x/api/v1/chat/completions/") == "https://x/api/v1"
@@ -0,0 +1,51 @@
+from langchain_core.documents import Document
+
+from core.context import CHARS_PER_TOKEN, ContextAssembler, approx_tokens
+
+PARAGRAPH = (
+    "Pegawai menunjukkan integritas dengan menolak gratifikasi dari pihak mana pun. "
+    "Pegawai melaporkan konflik kepentingan kepada atasan secara tertulis. "
+    "Pegawai menjadi teladan kejujuran bagi rekan kerja di unitnya. "
+)
+
+
+def _docs(*texts):
+    return [Document(page_content=text) for text in texts]
+
+
+def test_drops_near_duplicate_chunks():
+    assembler = ContextAssembler(max_tokens=None)
+    context = assembler.assemble(_docs(PARAGRAPH, PARAGRAPH + " Tambahan.", "Kerjasama antar unit berjalan baik."))
+    assert context.count("menolak gratifikasi") == 1
+    assert "Kerjasama antar unit" in context
+    assert assembler.last_stats["used_chunks"] == 2
+
+
+def test_strips_splitter_overlap():
+    first = PARAGRAPH
+    second = PARAGRAPH[len(PARAGRAPH) // 2:] + "Pegawai menjaga kerahasiaan data layanan publik dengan cermat."
+    context = ContextAssembler(max_tokens=None).assemble(_docs(first, second))
+    assert context.count("teladan kejujuran") == 1
+    assert "kerahasiaan data" in context
+
+
+def test_respects_token_budget_at_sentence_boundary():
+    assembler = ContextAssembler(max_tokens=30)
+    context = assembler.assemble(_docs(PARAGRAPH, "Chunk kedua tidak akan muat lagi di anggaran."))
+    assert approx_tokens(context) <= 30
+    assert context.endswith(".")
+    assert "Chunk kedua" not in context
+
+
+def test_hard_cuts_oversized_first_segment():
+    long_sentence = " ".join(f"kata{i}" for i in range(200))
+    context = ContextAssembler(max_tokens=10).assemble(_docs(long_sentence))
+    assert context
+    assert len(context) <= 10 * CHARS_PER_TOKEN
+    assert long_sentence.startswith(context)
+    assert context.split()[-1] in long_sentence.split()
+
+
+def test_no_budget_keeps_everything():
+    texts = ["Kalimat satu tentang integritas.", "Kalimat dua tentang kerjasama tim."]
+    assert ContextAssembler(max_tokens=None).assemble(_docs(*texts)).count("Kalimat") == 2
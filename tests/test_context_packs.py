@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from core.assessment import AssessmentCore, get_komp_info
+from core.context_packs import ContextPackStore
+from core.data import SKJ_DATA
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    folder = tmp_path / "skj_index"
+    folder.mkdir()
+    (folder / "vectors.npy").write_bytes(b"v1")
+    return folder
+
+
+def _store(tmp_path, index_dir, **kwargs):
+    return ContextPackStore(tmp_path / "packs.json", {"skj": index_dir}, **kwargs)
+
+
+def test_pack_invalidated_by_deskripsi_mode_budget_and_index(tmp_path, index_dir):
+    store = _store(tmp_path, index_dir)
+    store.put("J", "K", 3, "permenpan", "skj", deskripsi="deskripsi lama")
+    store.save()
+
+    assert _store(tmp_path, index_dir).get("J", "K", 3, "deskripsi lama")["context_skj"] == "skj"
+    assert _store(tmp_path, index_dir).get("J", "K", 3, "deskripsi baru") is None
+    assert _store(tmp_path, index_dir, retrieval_mode="dense").get("J", "K", 3, "deskripsi lama") is None
+    assert _store(tmp_path, index_dir, max_tokens=400).get("J", "K", 3, "deskripsi lama") is None
+
+    (index_dir / "vectors.npy").write_bytes(b"v2-lebih-panjang")
+    stale = _store(tmp_path, index_dir)
+    assert stale.get("J", "K", 3, "deskripsi lama") is None
+    assert stale.stats() == {"packs": 1, "valid": 0, "stale": 1}
+
+
+def test_save_merges_packs_from_other_processes(tmp_path, index_dir):
+    first = _store(tmp_path, index_dir)
+    second = _store(tmp_path, index_dir)
+    first.put("J", "K1", 2, "a", "b")
+    first.save()
+    second.put("J", "K2", 3, "c", "d")
+    second.save()
+
+    merged = _store(tmp_path, index_dir)
+    assert merged.get("J", "K1", 2) is not None
+    assert merged.get("J", "K2", 3) is not None
+    assert sorted(os.listdir(tmp_path)) == ["packs.json", "skj_index"]
+    assert len(json.loads((tmp_path / "packs.json").read_text(encoding="utf-8"))["packs"]) == 2
+
+
+def test_unreadable_file_starts_empty(tmp_path, index_dir):
+    (tmp_path / "packs.json").write_text("{rusak", encoding="utf-8")
+    assert _store(tmp_path, index_dir).packs == {}
+
+
+def test_async_pack_miss_saves_off_the_event_loop(tmp_path, index_dir):
+    jabatan = next(iter(SKJ_DATA))
+    kompetensi = next(iter(SKJ_DATA[jabatan]["kompetensi"]))
+    embedding = DeterministicFakeEmbedding(size=8)
+    retriever = FAISS.from_texts(
+        ["PermenPAN: standar kompetensi manajerial ASN", "Indikator perilaku level 3"],
+        embedding, metadatas=[{}, {"jabatan": jabatan, "kompetensi": kompetensi}],
+    ).as_retriever(search_kwargs={"k": 2})
+
+    class RecordingStore(ContextPackStore):
+        def save(self):
+            self.save_thread = threading.get_ident()
+            super().save()
+
+    store = RecordingStore(tmp_path / "packs.json", {"skj": index_dir})
+    core = AssessmentCore(retriever, retriever, context_packs=store, llm=object(), retrieval_mode="dense")
+
+    async def run():
+        contexts = await core.astructured_contexts(jabatan, kompetensi, get_komp_info(jabatan, kompetensi))
+        return contexts, threading.get_ident()
+
+    contexts, loop_thread = asyncio.run(run())
+    assert any(contexts)
+    assert store.save_thread != loop_thread
+    komp = get_komp_info(jabatan, kompetensi)
+    assert _store(tmp_path, index_dir).get(jabatan, kompetensi, komp["level_target"], komp["deskripsi"]) is not None
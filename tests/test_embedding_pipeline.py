@@ -0,0 +1,38 @@
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.embedding_pipeline import EmbeddingPipeline
+
+
+class FailingEmbedding(DeterministicFakeEmbedding):
+    """Gagal (non-429) pada pemanggilan ke-`fail_on`; mencatat setiap batch yang dikirim."""
+
+    fail_on: int = 0
+    batches: list = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        if len(self.batches) == self.fail_on:
+            raise RuntimeError(f"batch {self.fail_on} gagal")
+        return super().embed_documents(texts)
+
+
+def test_embed_texts_keeps_input_order():
+    embedding = FailingEmbedding(size=4, batches=[])
+    texts = [f"teks {i}" for i in range(7)]
+    vectors = EmbeddingPipeline(embedding, batch_size=2, max_in_flight=3, show_progress=False).embed_texts(texts)
+    assert vectors == DeterministicFakeEmbedding(size=4).embed_documents(texts)
+    assert len(embedding.batches) == 4
+
+
+@pytest.mark.parametrize("fail_on", [1, 3])
+def test_failed_batch_stops_remaining_batches(fail_on):
+    embedding = FailingEmbedding(size=4, fail_on=fail_on, batches=[])
+    pipeline = EmbeddingPipeline(embedding, batch_size=2, max_in_flight=1, show_progress=False)
+
+    with pytest.raises(RuntimeError, match=f"batch {fail_on} gagal"):
+        pipeline.embed_texts([f"teks {i}" for i in range(20)])
+
+    # 10 batch antre, tapi tidak ada yang dikirim setelah batch yang gagal
+    assert len(embedding.batches) == fail_on
+    assert embedding.batches[-1] == [f"teks {2 * fail_on - 2}", f"teks {2 * fail_on - 1}"]
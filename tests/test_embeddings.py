@@ -0,0 +1,75 @@
+import asyncio
+
+from langchain_core.embeddings import Embeddings
+
+from core.embeddings import CachedEmbeddings, EmbeddingCache
+
+
+class RecordingEmbeddings(Embeddings):
+    def __init__(self):
+        self.sent: list[str] = []
+
+    def embed_documents(self, texts):
+        self.sent.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_sends_original_text_and_dedupes_batch():
+    inner = RecordingEmbeddings()
+    embeddings = CachedEmbeddings(inner, "m")
+    vectors = embeddings.embed_documents(["Integritas  pegawai", "Integritas pegawai", "kerjasama"])
+    # Kunci ternormalisasi sama -> satu panggilan, teks asli (kemunculan pertama) yang dikirim
+    assert inner.sent == ["Integritas  pegawai", "kerjasama"]
+    assert vectors[0] == vectors[1]
+
+    assert embeddings.embed_query("kerjasama") == vectors[2]
+    assert inner.sent == ["Integritas  pegawai", "kerjasama"]
+    assert embeddings.stats()["hits"] == 1
+
+
+def test_memory_lru_eviction():
+    cache = EmbeddingCache(max_entries=2)
+    keys = [EmbeddingCache.make_key("m", text) for text in ("a", "b", "c")]
+    cache.put_many([(keys[0], [0.0]), (keys[1], [1.0])])
+    assert cache.get(keys[0]) == [0.0]
+    cache.put_many([(keys[2], [2.0])])
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == [0.0]
+
+
+def test_disk_tier_persists_and_is_capped(tmp_path):
+    path = tmp_path / "emb.sqlite"
+    cache = EmbeddingCache(max_entries=1, disk_path=path, max_disk_entries=3)
+    keys = [EmbeddingCache.make_key("m", str(i)) for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put_many([(key, [float(i)])])
+    assert cache.stats()["disk_entries"] == 3
+
+    reopened = EmbeddingCache(disk_path=path)
+    assert reopened.get(keys[4]) == [4.0]
+    assert reopened.get(keys[0]) is None
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_disk_ttl(tmp_path):
+    cache = EmbeddingCache(max_entries=1, disk_path=tmp_path / "emb.sqlite", disk_ttl=-1)
+    key = EmbeddingCache.make_key("m", "teks")
+    cache.put_many([(key, [1.0])])
+    assert EmbeddingCache(disk_path=tmp_path / "emb.sqlite", disk_ttl=-1).get(key) is None
+
+
+def test_async_path_uses_cache(tmp_path):
+    inner = RecordingEmbeddings()
+    embeddings = CachedEmbeddings(inner, "m", EmbeddingCache(disk_path=tmp_path / "emb.sqlite"))
+
+    async def run():
+        first = await embeddings.aembed_documents(["x", "x", "yy"])
+        second = await embeddings.aembed_query("yy")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert inner.sent == ["x", "yy"]
+    assert second == first[2]
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from core.index_store import load_index
+from src.embedding_pipeline import EmbeddingPipeline
+from src.index_builder import incremental_index, stream_index
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    embedded: list = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+def _chunk(name):
+    return Document(page_content=f"Isi {name}", metadata={"source": f"{name}.pdf"})
+
+
+def _contents(vector_store):
+    return sorted(doc.page_content for doc in vector_store.docstore._dict.values())
+
+
+def test_incremental_index_adds_new_and_prunes_removed(tmp_path):
+    index_path = str(tmp_path / "skj_index")
+    embedding = CountingEmbedding(size=8, embedded=[])
+    pipeline = EmbeddingPipeline(embedding, show_progress=False)
+
+    incremental_index([_chunk("a"), _chunk("b")], embedding, index_path, pipeline=pipeline)
+    assert sorted(embedding.embedded) == ["Isi a", "Isi b"]
+
+    # File b dihapus, file c ditambah: hanya c yang di-embed
+    embedding.embedded.clear()
+    vector_store = incremental_index([_chunk("a"), _chunk("c")], embedding, index_path, pipeline=pipeline)
+    assert embedding.embedded == ["Isi c"]
+    assert _contents(vector_store) == ["Isi a", "Isi c"]
+
+    reloaded = FAISS.load_local(index_path, embedding, allow_dangerous_deserialization=True)
+    assert _contents(reloaded) == ["Isi a", "Isi c"]
+    assert reloaded.index.ntotal == 2
+    assert len(load_index(index_path, embedding).docstore) == 2
+
+    # Tidak ada perubahan: tidak ada yang di-embed ulang
+    embedding.embedded.clear()
+    incremental_index([_chunk("c"), _chunk("a")], embedding, index_path, pipeline=pipeline)
+    assert embedding.embedded == []
+
+
+def test_stream_index_stops_reader_when_embedding_fails():
+    from tests.test_embedding_pipeline import FailingEmbedding
+
+    closed = []
+
+    def endless_chunks():
+        try:
+            i = 0
+            while True:
+                yield _chunk(f"dok{i}")
+                i += 1
+        finally:
+            closed.append(True)
+
+    embedding = FailingEmbedding(size=8, fail_on=2, batches=[])
+    with pytest.raises(RuntimeError, match="batch 2 gagal"):
+        stream_index(endless_chunks(), embedding, batch_size=4, prefetch=1,
+                     pipeline=EmbeddingPipeline(embedding, show_progress=False))
+
+    assert len(embedding.batches) == 2
+    assert closed == [True]
+    assert not [t for t in threading.enumerate() if t.name == "index-stream-reader" and t.is_alive()]
@@ -0,0 +1,60 @@
+import os
+import time
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import core.index_health as index_health
+from core.index_health import IndexRebuildJob, check_index
+
+
+def _documents():
+    return [
+        Document(page_content=f"Kompetensi Integritas level {i}: perilaku {i}", metadata={"source": f"skj{i}.pdf"})
+        for i in range(1, 4)
+    ]
+
+
+def _run_job(folder, load_documents):
+    job = IndexRebuildJob("permenpan", folder, load_documents, DeterministicFakeEmbedding(size=8)).start()
+    job._thread.join(timeout=60)
+    return job
+
+
+def test_stale_lock_is_taken_over(tmp_path):
+    folder = tmp_path / "permenpan_index"
+    job = IndexRebuildJob("permenpan", folder, _documents, None)
+    # Lock peninggalan worker yang mati: mtime tidak diperbarui lebih lama dari STALE_LOCK_SECONDS
+    job.lock_path.write_text("99999")
+    old = time.time() - index_health.STALE_LOCK_SECONDS - 10
+    os.utime(job.lock_path, (old, old))
+
+    job = _run_job(folder, _documents)
+
+    assert job.state == "done", job.error
+    assert job.documents_read == 3 and job.chunks_indexed == 3
+    assert check_index(folder)["status"] == "ok"
+    assert not job.lock_path.exists()
+
+
+def test_failed_rebuild_is_retried_after_delay(tmp_path, monkeypatch):
+    folder = tmp_path / "permenpan_index"
+
+    def broken():
+        yield _documents()[0]
+        raise OSError("PDF tidak bisa dibaca")
+
+    failed = _run_job(folder, broken)
+    assert failed.state == "failed"
+    assert "PDF tidak bisa dibaca" in failed.error
+    assert not failed.lock_path.exists()
+    assert check_index(folder)["status"] == "missing"
+    assert not failed.retry_due()
+
+    monkeypatch.setattr(index_health, "FAILED_RETRY_SECONDS", 0)
+    assert failed.retry_due()
+
+    retried = _run_job(folder, _documents)
+    assert retried.state == "done", retried.error
+    assert not retried.retry_due()
+    assert check_index(folder)["status"] == "ok"
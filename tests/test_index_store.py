@@ -0,0 +1,83 @@
+import faiss
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from core.index_store import (
+    FAISS_FILE, LegacyIndexError, MmapVectorStore, convert_faiss_folder, export_faiss, load_index,
+)
+from core.lexical import load_lexical_index
+
+TEXTS = [
+    "Integritas: bertindak jujur dan konsisten sesuai kode etik",
+    "Kerjasama: membangun tim yang efektif lintas unit",
+    "Komunikasi: menyampaikan informasi secara jelas dan santun",
+    "Orientasi pada hasil: menetapkan target kerja yang menantang",
+    "Pelayanan publik: memberikan layanan sesuai standar",
+    "Pengambilan keputusan: memilih alternatif berdasarkan data",
+]
+METADATAS = [{"kompetensi": text.split(":")[0], "row": i} for i, text in enumerate(TEXTS)]
+
+
+@pytest.fixture
+def embedding():
+    return DeterministicFakeEmbedding(size=16)
+
+
+@pytest.fixture
+def faiss_store(embedding):
+    return FAISS.from_texts(TEXTS, embedding, metadatas=METADATAS)
+
+
+def _ranked(results):
+    return [(doc.page_content, round(float(score), 4)) for doc, score in results]
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_mmap_store_matches_faiss(tmp_path, embedding, faiss_store, mmap):
+    export_faiss(faiss_store, tmp_path)
+    store = load_index(tmp_path, embedding, mmap=mmap)
+    assert isinstance(store, MmapVectorStore)
+    assert (store.index is not None) == mmap
+
+    for query in ("kode etik", "layanan publik", "keputusan berbasis data"):
+        assert _ranked(store.similarity_search_with_score(query, k=3)) == _ranked(
+            faiss_store.similarity_search_with_score(query, k=3)
+        )
+
+
+def test_metadata_filter(tmp_path, embedding, faiss_store):
+    export_faiss(faiss_store, tmp_path)
+    store = load_index(tmp_path, embedding)
+    docs = store.similarity_search("apa saja", k=4, filter={"kompetensi": "Komunikasi"})
+    assert [doc.metadata["row"] for doc in docs] == [2]
+
+
+def test_stale_faiss_file_falls_back_to_numpy(tmp_path, embedding, faiss_store):
+    export_faiss(faiss_store, tmp_path)
+    # index.faiss lain dengan jumlah baris sama tapi urutan berbeda
+    other = faiss.IndexFlatL2(16)
+    other.add(np.ascontiguousarray(np.asarray(embedding.embed_documents(TEXTS[::-1]), dtype=np.float32)))
+    faiss.write_index(other, str(tmp_path / FAISS_FILE))
+
+    store = load_index(tmp_path, embedding)
+    assert store.index is None
+    assert _ranked(store.similarity_search_with_score("kode etik", k=2)) == _ranked(
+        faiss_store.similarity_search_with_score("kode etik", k=2)
+    )
+
+
+def test_legacy_folder_requires_conversion(tmp_path, embedding, faiss_store):
+    faiss_store.save_local(str(tmp_path))
+    with pytest.raises(LegacyIndexError):
+        load_index(tmp_path, embedding)
+    with pytest.raises(LegacyIndexError):
+        load_lexical_index(tmp_path)
+    assert load_index(tmp_path, embedding, allow_legacy_pickle=True).index.ntotal == len(TEXTS)
+
+    convert_faiss_folder(tmp_path)
+    store = load_index(tmp_path, embedding)
+    assert isinstance(store, MmapVectorStore)
+    assert store.index is not None
+    assert len(load_lexical_index(tmp_path).bm25) == len(TEXTS)
@@ -0,0 +1,56 @@
+import threading
+
+from core.journal import ResultJournal, journal_key
+
+
+def test_key_is_stable():
+    assert journal_key("A", " jabatan ", None) == journal_key("A", "jabatan", "")
+    assert journal_key("A", 1) != journal_key("A", 2)
+
+
+def test_replay_after_reopen(tmp_path):
+    path = tmp_path / "jurnal.jsonl"
+    with ResultJournal(path) as journal:
+        journal.append("a", {"skor": 1})
+        journal.append("b", {"skor": 2})
+        journal.append("a", {"skor": 3})
+
+    journal = ResultJournal(path)
+    assert journal.replay() == {"a": {"skor": 3}, "b": {"skor": 2}}
+    assert journal.replayed == 2
+    assert "b" in journal
+    assert journal.missing(["a", "c", "b", "d"]) == ["c", "d"]
+    journal.close()
+
+
+def test_torn_last_line_is_ignored_and_not_glued(tmp_path):
+    path = tmp_path / "jurnal.jsonl"
+    with ResultJournal(path) as journal:
+        journal.append("a", {"skor": 1})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "b", "ts": 1, "rec')
+
+    with ResultJournal(path) as journal:
+        assert journal.replay() == {"a": {"skor": 1}}
+        journal.append("c", {"skor": 3})
+
+    with ResultJournal(path) as journal:
+        assert journal.replay() == {"a": {"skor": 1}, "c": {"skor": 3}}
+
+
+def test_default_serializer_and_threads(tmp_path):
+    path = tmp_path / "jurnal.jsonl"
+    with ResultJournal(path, fsync_every=4, default=str) as journal:
+        threads = [
+            threading.Thread(target=lambda i=i: journal.append(f"k{i}", {"obj": {i}}))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert journal.stats()["appended"] == 20
+
+    with ResultJournal(path) as journal:
+        assert len(journal.replay()) == 20
+        assert journal.get("k3") == {"obj": "{3}"}
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from core.json_repair import JsonRepairStats, parse_llm_json, repair_json
+
+
+@pytest.fixture
+def stats():
+    return JsonRepairStats()
+
+
+class FakeLLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return self.reply
+
+
+@pytest.mark.parametrize("broken, expected", [
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ("{'a': 'teks', b: True, c: None}", {"a": "teks", "b": True, "c": None}),
+    ('{“a”: “kutip miring”}', {"a": "kutip miring"}),
+    ('{"a": "baris\nbaru"}', {"a": "baris\nbaru"}),
+    ('{"soal": [{"id": 1, "teks": "terpotong', {"soal": [{"id": 1, "teks": "terpotong"}]}),
+    ('{"a": 1, "b":', {"a": 1, "b": None}),
+])
+def test_repair_json(broken, expected):
+    assert json.loads(repair_json(broken)) == expected
+
+
+def test_tiers(stats):
+    assert parse_llm_json('Hasil: {"a": 1}', task="t", stats=stats) == {"a": 1}
+    assert parse_llm_json('```json\n[{"a": 1},]\n```', kind="array", task="t", stats=stats) == [{"a": 1}]
+
+    llm = FakeLLM('{"a": 2}')
+    assert parse_llm_json("{a b c", llm=llm, task="t", stats=stats) == {"a": 2}
+    assert "{a b c" in llm.prompts[0]
+
+    assert parse_llm_json("tanpa json", task="t", stats=stats) is None
+    counts = stats.stats()["t"]
+    assert {tier: counts[tier] for tier in ("direct", "repaired", "reprompt", "failed")} == {
+        "direct": 1, "repaired": 1, "reprompt": 1, "failed": 1,
+    }
+    assert counts["saved"] == 2
+
+
+def test_wrong_kind_is_not_accepted(stats):
+    assert parse_llm_json("[1, 2]", kind="object", stats=stats) is None
@@ -0,0 +1,60 @@
+from langchain_core.documents import Document
+
+from core.lexical import BM25Index, LexicalIndex
+from core.rag import MultiIndexRetriever, fuse_results
+
+TEXTS = [
+    "pegawai menjaga integritas dan kejujuran dalam bekerja",
+    "tim bekerja sama menyelesaikan program kerja",
+    "pelayanan publik yang cepat dan ramah",
+]
+
+
+def test_bm25_ranks_matching_document_first():
+    bm25 = BM25Index.from_texts(TEXTS)
+    hits = bm25.search("integritas kejujuran", k=3)
+    assert hits[0][0] == 0
+    assert all(score > 0 for _, score in hits)
+
+
+def test_bm25_candidate_rows():
+    bm25 = BM25Index.from_texts(TEXTS)
+    assert [row for row, _ in bm25.search("bekerja", k=3, rows={1})] == [1]
+
+
+def test_bm25_empty_or_stopword_corpus():
+    assert BM25Index.from_texts([]).search("apa saja") == []
+    assert BM25Index.from_texts(["", "dan yang"]).search("dan yang") == []
+    # postings tanpa panjang dokumen (file bm25.json tidak konsisten) tidak membagi nol
+    assert BM25Index({"kompetensi": [[0, 1]]}, [0]).search("kompetensi")[0][0] == 0
+
+
+def test_bm25_save_load_roundtrip(tmp_path):
+    bm25 = BM25Index.from_texts(TEXTS)
+    bm25.save(tmp_path / "bm25.json")
+    loaded = BM25Index.load(tmp_path / "bm25.json")
+    assert loaded.search("pelayanan publik") == bm25.search("pelayanan publik")
+
+
+def _doc(name):
+    return Document(id=name, page_content=name)
+
+
+def test_rrf_prefers_documents_found_by_both():
+    dense = [(_doc("a"), 0.1), (_doc("b"), 0.2), (_doc("c"), 0.3)]
+    lexical = [(_doc("c"), 9.0), (_doc("a"), 5.0), (_doc("d"), 1.0)]
+    fused = fuse_results([dense, lexical], k=3)
+    assert [doc.id for doc, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] > fused[1][1] > fused[2][1]
+
+
+def test_lexical_mode_needs_no_embedding():
+    documents = [Document(page_content=text, metadata={"row": i}) for i, text in enumerate(TEXTS)]
+    index = LexicalIndex(
+        BM25Index.from_texts(TEXTS),
+        lambda rows: [documents[r] for r in rows],
+        lambda filter: [i for i, doc in enumerate(documents) if doc.metadata["row"] == filter["row"]],
+    )
+    retriever = MultiIndexRetriever({}, k=2, lexical={"skj": index}, mode="lexical")
+    assert retriever.search("pelayanan publik")["skj"][0].page_content == TEXTS[2]
+    assert [doc.metadata["row"] for doc in retriever.search("kerja", filters={"skj": {"row": 1}})["skj"]] == [1]
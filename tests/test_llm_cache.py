@@ -0,0 +1,32 @@
+import pytest
+from langchain_core.outputs import Generation
+
+from core.llm_cache import TTLResponseCache
+
+
+def test_hit_requires_same_prompt_and_llm_string():
+    cache = TTLResponseCache()
+    cache.update("prompt", "model-a", [Generation(text="hasil")])
+    assert cache.lookup("prompt", "model-a")[0].text == "hasil"
+    assert cache.lookup("prompt", "model-b") is None
+    assert cache.lookup("prompt lain", "model-a") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_lru_eviction_and_ttl():
+    cache = TTLResponseCache(maxsize=2)
+    for prompt in ("a", "b"):
+        cache.update(prompt, "m", [Generation(text=prompt)])
+    cache.lookup("a", "m")
+    cache.update("c", "m", [Generation(text="c")])
+    assert cache.lookup("b", "m") is None
+    assert cache.stats()["evictions"] == 1
+
+    expired = TTLResponseCache(ttl_seconds=0)
+    expired.update("a", "m", [Generation(text="a")])
+    assert expired.lookup("a", "m") is None
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        TTLResponseCache(maxsize=0)
@@ -0,0 +1,104 @@
+import time
+
+import httpx
+import pytest
+
+from core import rate_limit
+from core.rate_limit import (
+    RateLimiter, RateLimitedTransport, TokenBucket, estimate_tokens, limiter_for, parse_retry_after,
+)
+
+CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+def test_token_bucket_refills_linearly():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == pytest.approx(0.0)
+    # Cost lebih besar dari kapasitas dipotong ke kapasitas, tidak menunggu selamanya
+    assert bucket.wait_time(1000, now + 1.0) == pytest.approx(59.0)
+    assert TokenBucket(0).wait_time(10**6, now) == 0
+
+
+def test_aimd_concurrency():
+    limiter = RateLimiter("t", rpm=0, concurrency=8, max_concurrency=10)
+    limiter.on_response(429, httpx.Headers({"retry-after": "0"}))
+    assert limiter.limit == 4
+    # 429 beruntun dalam cooldown yang sama tidak menurunkan lagi
+    limiter.on_response(429, httpx.Headers())
+    assert limiter.limit == 4
+    # +1 kira-kira setiap `limit` sukses
+    for _ in range(5):
+        limiter.on_response(200, httpx.Headers())
+    assert 5 <= limiter.limit < 5.5
+    for _ in range(200):
+        limiter.on_response(200, httpx.Headers())
+    assert limiter.limit == 10
+    assert limiter.stats()["throttled"] == 2
+
+
+def test_429_blocks_until_retry_after():
+    limiter = RateLimiter("t", rpm=0, concurrency=2)
+    limiter.on_response(429, httpx.Headers({"retry-after": "0.2"}))
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.15
+    limiter.release()
+
+
+def test_concurrency_slot_is_held_until_release():
+    limiter = RateLimiter("t", rpm=0, concurrency=1, max_concurrency=1)
+    assert limiter._try_acquire(0) == 0
+    assert limiter._try_acquire(0) > 0
+    limiter.release()
+    assert limiter._try_acquire(0) == 0
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "3"}, 3.0),
+    ({"retry-after": "bukan angka"}, None),
+    ({}, None),
+])
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(httpx.Headers(headers)) == expected
+
+
+def test_parse_retry_after_reset_epoch_ms():
+    reset_ms = (time.time() + 10) * 1000
+    assert parse_retry_after(httpx.Headers({"x-ratelimit-reset": str(reset_ms)})) == pytest.approx(10, abs=1)
+
+
+def test_estimate_tokens():
+    chat = b'{"messages": [{"role": "user", "content": "' + b"a" * 400 + b'"}], "max_tokens": 50}'
+    assert estimate_tokens(chat) == 150
+    assert estimate_tokens(b'{"input": [[1, 2, 3], [4, 5]]}') == 5
+    assert estimate_tokens(b"bukan json") == 2
+
+
+def test_limiter_for_routes_by_path():
+    assert limiter_for(httpx.URL(CHAT_URL)).name == "chat"
+    assert limiter_for(httpx.URL("https://openrouter.ai/api/v1/embeddings")).name == "embeddings"
+    assert limiter_for(httpx.URL("https://openrouter.ai/api/v1/models")) is None
+
+
+def test_transport_feeds_limiter_and_releases_slot(monkeypatch):
+    limiter = RateLimiter("chat", rpm=0, concurrency=2)
+    monkeypatch.setitem(rate_limit.LIMITERS, "chat", limiter)
+    statuses = iter([429, 200])
+
+    def handler(request):
+        return httpx.Response(next(statuses), headers={"retry-after": "0"}, json={"ok": True})
+
+    with httpx.Client(transport=RateLimitedTransport(httpx.MockTransport(handler))) as client:
+        assert client.post(CHAT_URL, json={"messages": []}).status_code == 429
+        assert limiter.in_flight == 0
+        with client.stream("POST", CHAT_URL, json={"messages": []}) as response:
+            assert limiter.in_flight == 1
+            response.read()
+        assert limiter.in_flight == 0
+    assert limiter.stats()["throttled"] == 1
+    assert limiter.stats()["requests_sent"] == 2
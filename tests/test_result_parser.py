@@ -0,0 +1,50 @@
+from core.result_parser import AssessmentResult, parse_assessment, summarize_results
+
+
+def test_label_format():
+    result = parse_assessment(
+        "**LEVEL_PREDIKSI:** 3/nRINGKASAN_PERILAKU: Peserta melapor ke atasan\n"
+        "ALASAN: Sesuai indikator level 3\nGAP: 0\nREKOMENDASI: Pertahankan"
+    )
+    assert result.parsed
+    assert result.level == 3
+    assert result.ringkasan == "Peserta melapor ke atasan"
+    assert result.rekomendasi == "Pertahankan"
+
+
+def test_engine_markdown_format_first_label_wins():
+    result = parse_assessment(
+        "#### SKOR: 85\n#### LEVEL PENCAPAIAN: Level 4 (Mahir)\n"
+        "#### REKOMENDASI PENGEMBANGAN:\n- Mentoring\n\nSKOR: 10"
+    )
+    assert (result.skor, result.level) == (85, 4)
+    assert result.rekomendasi == "- Mentoring"
+
+
+def test_json_output():
+    result = parse_assessment('```json\n{"level_prediksi": "2", "skor": 70, "kekuatan": ["jujur", "tegas"]}\n```')
+    assert result.parsed
+    assert (result.level, result.skor) == (2, 70)
+    assert result.kekuatan == "- jujur\n- tegas"
+
+
+def test_unparsed_output_keeps_raw():
+    result = parse_assessment("Maaf, saya tidak bisa menilai jawaban ini.")
+    assert not result.parsed
+    assert result.level is None
+    assert result.to_dict(include_raw=True)["raw"].startswith("Maaf")
+
+
+def test_gap_levels_and_summary():
+    results = [
+        AssessmentResult(level=2, skor=60, parsed=True),
+        AssessmentResult(level=4, skor=90, parsed=True),
+        AssessmentResult(raw="rusak"),
+    ]
+    assert results[0].gap_levels("3") == -1
+    assert results[2].gap_levels(3) is None
+    summary = summarize_results(results)
+    assert summary["total"] == 3
+    assert summary["parsed"] == 2
+    assert summary["rata_rata_skor"] == 75.0
+    assert summary["distribusi_level"] == {2: 1, 4: 1}
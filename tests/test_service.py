@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.clients import aclose_async_http_client
+from core.data import SKJ_DATA
+from core.result_parser import AssessmentResult
+from core.service import AssessmentService, ServiceClient
+
+JABATAN = next(iter(SKJ_DATA))
+KOMPETENSI = next(iter(SKJ_DATA[JABATAN]["kompetensi"]))
+
+
+class FakeCore:
+    permenpan_retriever = None
+    skj_retriever = None
+    context_packs = None
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def aassess_free(self, jabatan, kompetensi, kasus, jawaban, nama):
+        self.calls += 1
+        await self.release.wait()
+        return AssessmentResult(level=3, skor=80, raw="### SKOR: 80", parsed=True), "perm", "skj"
+
+    async def aassess_structured(self, jabatan, kompetensi, id_soal, jawaban, nama):
+        raise ValueError(f"Soal {id_soal} tidak ditemukan")
+
+
+def _payload(**extra):
+    return {"jabatan": JABATAN, "kompetensi": KOMPETENSI, "kasus": "kasus", "jawaban": "jawaban", **extra}
+
+
+def _run(scenario, workers=1, queue_size=1):
+    async def main():
+        core = FakeCore()
+        service = AssessmentService(core, workers=workers, queue_size=queue_size)
+        await service.start_workers()
+        service._server = await asyncio.start_server(service._handle_connection, "127.0.0.1", 0)
+        port = service._server.sockets[0].getsockname()[1]
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+                return await scenario(service, core, client, port)
+        finally:
+            core.release.set()
+            await service.stop()
+
+    return asyncio.run(main())
+
+
+async def _wait_until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("kondisi tidak tercapai")
+
+
+def test_full_queue_returns_429_with_retry_after():
+    async def scenario(service, core, client, port):
+        running = asyncio.create_task(client.post("/assess/free", json=_payload(nama="A")))
+        await _wait_until(lambda: service.metrics.busy_workers == 1)
+        queued = asyncio.create_task(client.post("/assess/free", json=_payload(nama="B")))
+        await _wait_until(lambda: service.queue.qsize() == 1)
+
+        rejected = await client.post("/assess/free", json=_payload(nama="C"))
+        core.release.set()
+        return rejected, await running, await queued, service.stats()
+
+    rejected, first, second, stats = _run(scenario)
+    assert rejected.status_code == 429
+    assert int(rejected.headers["retry-after"]) >= 1
+    assert first.status_code == second.status_code == 200
+    assert first.json()["hasil"]["skor"] == 80
+    assert "context_permenpan" not in first.json()
+    assert stats["requests"]["rejected_429"] == 1
+    assert stats["requests"]["completed"] == 2
+
+
+def test_field_validation_returns_400():
+    async def scenario(service, core, client, port):
+        responses = [
+            await client.post("/assess/free", json={"jabatan": JABATAN, "kompetensi": KOMPETENSI}),
+            await client.post("/assess/free", json=_payload(jabatan="Tidak Ada")),
+            await client.post("/assess/free", json=[1, 2]),
+            await client.post("/assess/free", content=b"{bukan json"),
+            await client.post("/assess/structured", json={**_payload(), "id_soal": "X9"}),
+            await client.post("/assess/lain", json=_payload()),
+            await client.get("/assess/free"),
+        ]
+        return responses, core.calls
+
+    responses, calls = _run(scenario)
+    assert [r.status_code for r in responses] == [400, 400, 400, 400, 400, 404, 405]
+    assert "kasus" in responses[0].json()["error"] and "jawaban" in responses[0].json()["error"]
+    assert "X9" in responses[4].json()["error"]
+    assert calls == 0
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_bad_content_length_returns_400(length):
+    async def scenario(service, core, client, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /assess/free HTTP/1.1\r\nHost: x\r\nContent-Length: " + length + b"\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    response = _run(scenario)
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Connection: close" in response
+
+
+def test_metrics_reports_queue_workers_and_requests():
+    async def scenario(service, core, client, port):
+        core.release.set()
+        ok = await client.post("/assess/free", json=_payload(include_context=True))
+        await client.post("/assess/free", json={})
+        return ok, (await client.get("/metrics")).json()
+
+    ok, metrics = _run(scenario, workers=2, queue_size=4)
+    assert ok.json()["context_permenpan"] == "perm"
+    assert metrics["queue"] == {"depth": 0, "capacity": 4}
+    assert metrics["workers"] == {"total": 2, "busy": 0}
+    assert metrics["requests"]["accepted"] == metrics["requests"]["completed"] == 1
+    assert metrics["requests"]["failed"] == {"400": 1}
+    assert metrics["requests"]["processing_p50_s"] is not None
+    assert {"llm", "llm_cache", "http", "rate_limits", "indexes"} <= set(metrics)
+
+
+def test_service_client_matches_core_api():
+    async def scenario(service, core, client, port):
+        core.release.set()
+        remote = ServiceClient(f"http://127.0.0.1:{port}/")
+        hasil, ctx_perm, ctx_skj = await remote.aassess_free(JABATAN, KOMPETENSI, "kasus", "jawaban", "A")
+        with pytest.raises(ValueError, match="X9"):
+            await remote.aassess_structured(JABATAN, KOMPETENSI, "X9", "jawaban", "A")
+        # Seperti akhir BatchRunner.run: pool bersama ditutup sebelum server berhenti
+        await aclose_async_http_client()
+        return hasil, ctx_perm, ctx_skj
+
+    hasil, ctx_perm, ctx_skj = _run(scenario)
+    assert (hasil.level, hasil.skor, hasil.raw, hasil.parsed) == (3, 80, "### SKOR: 80", True)
+    assert ctx_perm == ctx_skj == ""
@@ -0,0 +1,91 @@
+import asyncio
+
+from langchain_core.language_models import FakeListChatModel
+
+from core.assessment import AssessmentCore
+from core.data import QUESTIONS_DATA
+from core.llm_cache import TTLResponseCache
+from core.streaming import GenerationMetrics, stream_text
+
+JABATAN = next(j for j in QUESTIONS_DATA if QUESTIONS_DATA[j])
+KOMPETENSI = next(iter(QUESTIONS_DATA[JABATAN]))
+SOAL_ID = QUESTIONS_DATA[JABATAN][KOMPETENSI][0]["id_soal"]
+
+
+class CountingChatModel(FakeListChatModel):
+    calls: int = 0
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+        return super()._call(*args, **kwargs)
+
+    def _stream(self, *args, **kwargs):
+        self.calls += 1
+        yield from super()._stream(*args, **kwargs)
+
+    async def _astream(self, *args, **kwargs):
+        self.calls += 1
+        async for chunk in super()._astream(*args, **kwargs):
+            yield chunk
+
+
+def _core(cache):
+    llm = CountingChatModel(responses=["LEVEL_PREDIKSI: 3\nSKOR: 80", "LEVEL_PREDIKSI: 1\nSKOR: 10"], cache=cache)
+    return AssessmentCore(None, None, llm=llm, output_mode="markdown"), llm
+
+
+def _stream(core, jawaban="Saya melapor ke atasan."):
+    stream, stats, _, _ = core.stream_structured(JABATAN, KOMPETENSI, SOAL_ID, jawaban, "Peserta")
+    return "".join(stream), stats
+
+
+def test_second_identical_stream_is_served_from_cache():
+    core, llm = _core(TTLResponseCache())
+    first, _ = _stream(core)
+    second, stats = _stream(core)
+    assert llm.calls == 1
+    assert second == first == "LEVEL_PREDIKSI: 3\nSKOR: 80"
+    assert stats.chunks == 1
+
+    # Jawaban lain -> prompt lain -> model dipanggil lagi
+    _stream(core, "Jawaban berbeda.")
+    assert llm.calls == 2
+
+
+def test_stream_and_invoke_share_cache_entries():
+    core, llm = _core(TTLResponseCache())
+    result, _, _ = core.assess_structured(JABATAN, KOMPETENSI, SOAL_ID, "Saya melapor ke atasan.", "Peserta")
+    text, _ = _stream(core)
+    assert llm.calls == 1
+    assert result.level == 3
+    assert text == result.raw
+
+
+def test_failed_or_abandoned_stream_is_not_cached():
+    cache = TTLResponseCache()
+    core, llm = _core(cache)
+    stream, _, _, _ = core.stream_structured(JABATAN, KOMPETENSI, SOAL_ID, "Jawaban.", "Peserta")
+    next(stream)
+    stream.close()
+    assert cache.stats()["entries"] == 0
+
+
+def test_async_stream_uses_cache():
+    core, llm = _core(TTLResponseCache())
+
+    async def run():
+        texts = []
+        for _ in range(2):
+            stream, _, _, _ = await core.astream_structured(JABATAN, KOMPETENSI, SOAL_ID, "Jawaban.", "Peserta")
+            texts.append("".join([chunk async for chunk in stream]))
+        return texts
+
+    assert asyncio.run(run()) == ["LEVEL_PREDIKSI: 3\nSKOR: 80"] * 2
+    assert llm.calls == 1
+
+
+def test_chain_without_cache_streams_directly():
+    llm = CountingChatModel(responses=["halo"])
+    metrics = GenerationMetrics()
+    assert "".join(stream_text(llm, "hai", metrics=metrics)) == "halo"
+    assert metrics.stats()["requests"] == 1
@@ -0,0 +1,26 @@
+import pytest
+
+from src.text_normalizer import _preprocess_text_reference, preprocess_text
+
+SAMPLES = {
+    "bullets": "Indikator Perilaku:\n• Jujur dalam bertindak\n● Konsisten\n- Taat aturan\n Bertanggung jawab",
+    "numbered_list": "Level 2:\n1) Mampu bekerja sama\n2) Menghargai pendapat\n\na. Aktif\nb. Terbuka",
+    "page_header": "- 5 -\nPERATURAN MENTERI PAN-RB\nNOMOR 38 TAHUN 2017\n\n-12-\nLampiran",
+    "page_footer_inline": "kompetensi teknis - 3 - dan manajerial -  14  - sesuai jabatan",
+    "hyphenated": "Sub-bagian Tata Usaha 2017-2018 dan e-government -- tanpa nomor",
+    "unicode_whitespace": "Nama Jabatan:\u00a0Analis\tKebijakan\u200b\n\u3000Ahli Muda\r\nEselon\x0cIV\u2003",
+    "blank_line_runs": "\n\n  Judul  \n \t \n\n\nParagraf satu\nbaris dua\n\n\n\nParagraf   dua  \n",
+    "crlf_paragraphs": "Kompetensi: Integritas\r\n\r\nDeskripsi:\r\nMenjaga kejujuran\r\n",
+    "paragraph_sentinel": "teks dengan \x00 null\n\nparagraf\nbaru",
+    "empty": "",
+    "only_whitespace": " \n\n\t \n ",
+}
+
+
+@pytest.mark.parametrize("text", SAMPLES.values(), ids=SAMPLES.keys())
+def test_matches_original_regex_chain(text):
+    assert preprocess_text(text) == _preprocess_text_reference(text)
+
+
+def test_removes_page_numbers_and_joins_lines():
+    assert preprocess_text("- 5 -\nKompetensi\nIntegritas\n\nLevel  3") == "kompetensi integritas\n level 3"